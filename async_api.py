@@ -0,0 +1,154 @@
+"""
+Asynchronous parsing and rendering for embedding Alkahest in an asyncio service.
+
+Parsing and rendering are CPU-bound, so AsyncConverter runs them on an executor instead of the event
+loop, and limits how many run at once so that a burst of requests queues up in the service rather
+than in the executor:
+
+    async with AsyncConverter(executor="process", max_concurrency=16) as converter:
+        sql = await converter.convert(dbml_string, "dbml", ["sql"])
+
+With threads, DBML parsers come from a shared ParserPool, one per running thread. With processes,
+each worker process keeps its own pool, and `convert` parses and renders in a single hop so the
+Database is never pickled between processes.
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from parse.dbml_lark import ParserPool, load_dbml
+from parse.sql_sqlparse import SQLtoAlkahest
+from translator import Translator
+
+# The DBML parsers of this process, shared by the threads of any executor running here.
+_parsers = ParserPool(size=os.cpu_count() or 1)
+
+def _load_dbml(dbml_string):
+    with _parsers.parser() as parser:
+        return load_dbml(dbml_string, parser)
+
+def _parse_sql(sql_string, default_schema):
+    parser = SQLtoAlkahest(sql_string, default_schema=default_schema)
+    parser.parse()
+    return parser.database
+
+def _render(database, output_format):
+    return Translator(database).render(output_format)
+
+def _convert(text, source_format, output_formats, default_schema):
+    database = _load_dbml(text) if source_format == "dbml" else _parse_sql(text, default_schema)
+    translator = Translator(database)
+    return {output_format: translator.render(output_format) for output_format in output_formats}
+
+def _warm_up():
+    # Builds a parser of this process's pool before the first request needs one.
+    with _parsers.parser():
+        pass
+
+class AsyncConverter:
+    """
+    Runs DBML and SQL parsing and Translator rendering on an executor, with a concurrency limit.
+
+    At most `max_concurrency` calls run on the executor at once; further calls wait for a slot
+    without blocking the event loop. Use as an async context manager, or call `close` when done.
+
+    Attributes:
+        executor (Executor): The executor the work runs on.
+        max_concurrency (int): The maximum number of calls running at once.
+        default_schema (str): The schema for unqualified SQL objects.
+    """
+    def __init__(self, executor="thread", max_workers=None, max_concurrency=None, default_schema="public"):
+        """
+        Initializes an AsyncConverter.
+
+        Args:
+            executor (Union[str, Executor], optional): "thread" or "process" to create an executor of
+                that kind, or an Executor to use, which is left open by `close`. Defaults to "thread".
+            max_workers (int, optional): The number of threads or processes of a created executor.
+                Defaults to the number of CPUs.
+            max_concurrency (int, optional): The maximum number of calls running at once. Defaults to
+                twice the number of workers, so each worker has its next call queued.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        self._owns_executor = not isinstance(executor, Executor)
+        if executor == "thread":
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="alkahest")
+        elif executor == "process":
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_up)
+        elif self._owns_executor:
+            raise ValueError(f"Unknown executor: {executor!r}")
+        self.executor = executor
+        self.max_concurrency = max_concurrency or 2 * max_workers
+        self.default_schema = default_schema
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Shuts down the executor, if the AsyncConverter created it, once its running calls finish.
+        """
+        if self._owns_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def _run(self, function, *args):
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def load_dbml(self, dbml_string):
+        """
+        Parses a DBML string into a Database.
+
+        Args:
+            dbml_string (str): The DBML to parse.
+
+        Returns:
+            Database: The parsed database.
+        """
+        return await self._run(_load_dbml, dbml_string)
+
+    async def parse_sql(self, sql_string, default_schema=None):
+        """
+        Parses a SQL string into a Database.
+
+        Args:
+            sql_string (str): The SQL to parse.
+            default_schema (str, optional): The schema for unqualified objects. Defaults to `default_schema`.
+
+        Returns:
+            Database: The parsed database.
+        """
+        return await self._run(_parse_sql, sql_string, default_schema or self.default_schema)
+
+    async def render(self, obj, output_format):
+        """
+        Renders a model object with the Translator.
+
+        Args:
+            obj: The Database or other model object to render.
+            output_format (str): "dbml", "sql" or "sqlalchemy".
+
+        Returns:
+            str: The rendered text.
+        """
+        return await self._run(_render, obj, output_format)
+
+    async def convert(self, text, source_format, output_formats, default_schema=None):
+        """
+        Parses DBML or SQL and renders it in each output format, as one call on the executor.
+
+        Args:
+            text (str): The DBML or SQL to convert.
+            source_format (str): "dbml" or "sql".
+            output_formats (List[str]): The formats to render.
+            default_schema (str, optional): The schema for unqualified SQL objects. Defaults to `default_schema`.
+
+        Returns:
+            Dict[str, str]: The rendered text by output format.
+        """
+        if source_format not in ("dbml", "sql"):
+            raise ValueError(f"Unknown source format: {source_format!r}")
+        return await self._run(_convert, text, source_format, list(output_formats), default_schema or self.default_schema)
@@ -0,0 +1,83 @@
+"""
+Load-tests AsyncConverter with many concurrent DBML to SQL conversion requests.
+
+Each request converts one generated DBML document. Requests arrive all at once, so latencies include
+the time spent queueing, and are served with the conversion run directly on the event loop, as a
+synchronous service would, and through AsyncConverter with a thread and a process executor. Reports
+the p50 and p99 request latency, the throughput, and the longest stall of a coroutine ticking every
+millisecond, which shows how long the event loop was blocked. On a single CPU the executors cannot
+raise throughput; they keep the event loop responsive while the work queues.
+
+Usage:
+    python benchmarks/bench_async.py [--requests 200] [--tables 50] [--workers 4] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from async_api import AsyncConverter
+from generator import generate_database, to_dbml
+from parse.dbml_lark import get_parser, load_dbml
+from translator import Translator
+
+async def ticker(stop, stalls):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - start - 0.001)
+
+async def load_test(documents, convert):
+    stop, stalls = asyncio.Event(), []
+    ticking = asyncio.create_task(ticker(stop, stalls))
+    await asyncio.sleep(0)
+    latencies = []
+    # Every request arrives at the start, so its latency includes the time it waited for a slot.
+    start = time.perf_counter()
+
+    async def request(document):
+        await convert(document)
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(request(document) for document in documents))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticking
+    return latencies, elapsed, max(stalls, default=0.0)
+
+def report(label, latencies, elapsed, stall):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{label:<22} {quantiles[49] * 1000:9.1f} {quantiles[98] * 1000:9.1f} {len(latencies) / elapsed:9.1f} {stall * 1000:11.1f}", flush=True)
+
+async def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--requests", type=int, default=200)
+    arg_parser.add_argument("--tables", type=int, default=50)
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    documents = [to_dbml(generate_database(seed=seed, schemas=1, tables=args.tables)) for seed in range(20)]
+    documents = [documents[i % len(documents)] for i in range(args.requests)]
+    get_parser(inline=True)
+
+    print(f"{args.requests} requests, {args.tables} tables each, {args.workers} workers, at most {args.concurrency} running")
+    print(f"{'':<22} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'max stall':>11}")
+
+    async def blocking(document):
+        Translator(load_dbml(document)).to_sql()
+    report("on the event loop", *await load_test(documents, blocking))
+
+    for executor in ("thread", "process"):
+        async with AsyncConverter(executor, max_workers=args.workers, max_concurrency=args.concurrency) as converter:
+            await asyncio.gather(*(converter.convert(document, "dbml", ["sql"]) for document in documents[:args.workers * 2]))
+            report(f"{executor} executor", *await load_test(documents, lambda document: converter.convert(document, "dbml", ["sql"])))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Compares the two-step DBML path (parse_dbml then transform_dbml) with the single-pass load_dbml.
+
+Reports wall time and tracemalloc peak for each path on a synthetic DBML project.
+
+Usage:
+    python benchmarks/bench_dbml_inline.py [--tables N] [--columns N]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parse.dbml_lark import DBMLTransformer, get_parser, load_dbml, parse_dbml, transform_dbml
+
+def make_dbml(tables, columns):
+    """
+    Builds a DBML project with the given number of tables and columns per table.
+    """
+    lines = ['Project "bench" {']
+    for t in range(tables):
+        lines.append(f'  Table public."table_{t}" {{')
+        lines.append('    "id" "integer" [pk, not null]')
+        for c in range(1, columns):
+            lines.append(f'    "column_{c}" "varchar"')
+        if t:
+            lines.append(f'    Ref: "table_{t}.column_1" < "table_{t - 1}.id"')
+        lines.append('  }')
+    lines.append('}')
+    return "\n".join(lines)
+
+def two_step(dbml_string):
+    return transform_dbml(parse_dbml(dbml_string, get_parser()), DBMLTransformer())
+
+def single_pass(dbml_string):
+    return load_dbml(dbml_string)
+
+def measure(function, dbml_string):
+    """
+    Returns the wall time and tracemalloc peak of one call, and its result.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = function(dbml_string)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    function(dbml_string)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=10000)
+    arg_parser.add_argument("--columns", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    dbml_string = make_dbml(args.tables, args.columns)
+    get_parser()
+    get_parser(inline=True)
+    results = []
+    for label, function in (("two-step", two_step), ("single-pass", single_pass)):
+        elapsed, peak, database = measure(function, dbml_string)
+        results.append(database)
+        print(f"{label:<12} {elapsed:8.3f} s   peak {peak / 2 ** 20:8.1f} MiB")
+    assert results[0] == results[1], "two-step and single-pass results differ"
+
+if __name__ == "__main__":
+    main()
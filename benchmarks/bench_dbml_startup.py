@@ -0,0 +1,76 @@
+"""
+Startup benchmark for the DBML parser.
+
+Reports how long it takes to obtain a parser in three situations:
+    cold:        a fresh process compiling the grammar with an empty cache directory.
+    warm-disk:   a fresh process loading the compiled parse tables from the on-disk cache.
+    in-process:  a repeat call to get_parser() in a process that already built one.
+
+Usage:
+    python benchmarks/bench_dbml_startup.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parse.dbml_lark import create_parser, get_parser
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+from parse.dbml_lark import create_parser
+start = time.perf_counter()
+create_parser(cache_dir={cache_dir!r})
+print(time.perf_counter() - start)
+"""
+
+def time_child(cache_dir):
+    """
+    Times creating a parser in a fresh interpreter, after the imports.
+    """
+    code = CHILD.format(root=ROOT, cache_dir=cache_dir)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return float(output)
+
+def time_cold(runs):
+    timings = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            timings.append(time_child(cache_dir))
+    return timings
+
+def time_warm_disk(runs):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        create_parser(cache_dir=cache_dir)
+        return [time_child(cache_dir) for _ in range(runs)]
+
+def time_in_process(runs):
+    get_parser()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        get_parser()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--runs", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    for label, timings in (
+        ("cold", time_cold(args.runs)),
+        ("warm-disk", time_warm_disk(args.runs)),
+        ("in-process", time_in_process(args.runs)),
+    ):
+        print(f"{label:<12} median {statistics.median(timings) * 1000:9.3f} ms   min {min(timings) * 1000:9.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmarks plan_creation in dependencies.py on generated schemas of growing size.
+
+The generator only references earlier tables, so --cycles foreign keys pointing at later tables are
+added to create reference cycles for the planner to break. Time per table should stay flat as the
+schema grows, since planning is linear in the number of tables and foreign keys.
+
+Usage:
+    python benchmarks/bench_dependencies.py [--sizes 1000 10000 50000] [--cycles 100]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from classes import Column, ForeignKey, intern_data_type
+from dependencies import plan_creation
+from generator import TYPES, generate_database
+
+def add_cycles(database, cycles, seed=0):
+    rng = random.Random(seed)
+    tables = [(schema.name, table) for schema in database.schemas.values() for table in schema.tables.values()]
+    id_type = intern_data_type(*TYPES[0])
+    for c in range(cycles):
+        i = rng.randrange(len(tables) - 1)
+        schema_name, table = tables[i]
+        target_schema, target = tables[rng.randrange(i + 1, len(tables))]
+        table.columns[f"back_{c}"] = Column(
+            name=f"back_{c}", data_type=id_type,
+            foreign_keys=[ForeignKey(tables=[f"{target_schema}.{target.name}"], columns=["id"])],
+        )
+    database.reindex()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    arg_parser.add_argument("--foreign-keys", type=int, default=3)
+    arg_parser.add_argument("--cycles", type=int, default=100)
+    args = arg_parser.parse_args()
+
+    print(f"{'tables':>8} {'ms':>9} {'us/table':>9} {'waves':>6} {'deferred':>9}")
+    for size in args.sizes:
+        database = generate_database(seed=0, schemas=4, tables=size, columns=6, foreign_keys=args.foreign_keys)
+        add_cycles(database, args.cycles)
+        # Collections scanning the large generated heap would otherwise dominate the growth.
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        plan = plan_creation(database)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        print(f"{size:>8} {elapsed * 1000:>9.1f} {elapsed * 1e6 / size:>9.2f} {len(plan.waves):>6} {len(plan.deferred):>9}")
+
+if __name__ == "__main__":
+    main()
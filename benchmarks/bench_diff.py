@@ -0,0 +1,86 @@
+"""
+Benchmarks diff_databases in diff.py, and checks that its script drops the views reading a changed
+table before altering it and recreates them afterwards, by running the script in SQLite.
+
+Usage:
+    python benchmarks/bench_diff.py [--tables N]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from classes import Column, Database, Table, View, intern_data_type
+from diff import CreateView, DropColumn, DropView, diff_databases
+from generator import generate_database
+from translator import Translator
+
+OLD_SQL = """
+CREATE TABLE "public"."accounts" ("id" integer PRIMARY KEY, "name" text, "legacy" text);
+CREATE TABLE "public"."notes" ("id" integer PRIMARY KEY, "body" text);
+CREATE VIEW "public"."account_names" AS SELECT id, legacy FROM accounts;
+CREATE VIEW "public"."named_accounts" AS SELECT id FROM account_names;
+CREATE VIEW "public"."note_bodies" AS SELECT body FROM notes;
+"""
+
+def accounts_database(legacy):
+    integer = intern_data_type(dbml="integer", sqlalchemy="Integer", sql="integer")
+    text = intern_data_type(dbml="text", sqlalchemy="Text", sql="text")
+    database = Database(name="accounts")
+    columns = [Column(name="id", data_type=integer, nullable=False, primary_key=True), Column(name="name", data_type=text)]
+    if legacy:
+        columns.append(Column(name="legacy", data_type=text))
+    database.add_table(Table(name="accounts", columns={column.name: column for column in columns}), "public")
+    database.add_table(Table(name="notes", columns={
+        "id": Column(name="id", data_type=integer, nullable=False, primary_key=True),
+        "body": Column(name="body", data_type=text),
+    }), "public")
+    database.add_view(View(name="account_names", sql="SELECT id, legacy FROM accounts" if legacy else "SELECT id, name FROM accounts"), "public")
+    database.add_view(View(name="named_accounts", sql="SELECT id FROM account_names"), "public")
+    database.add_view(View(name="note_bodies", sql="SELECT body FROM notes"), "public")
+    return database
+
+def check_view_order():
+    """
+    Drops a column read by a changed view, which another view reads in turn, and runs the script.
+    """
+    change_set = diff_databases(accounts_database(legacy=True), accounts_database(legacy=False))
+    steps = [(type(change).__name__, getattr(change, "view", None) and change.view.name) for change in change_set]
+    drop_column = next(i for i, change in enumerate(change_set) if isinstance(change, DropColumn))
+    assert steps[:drop_column] == [("DropView", "named_accounts"), ("DropView", "account_names")], steps
+    assert steps[drop_column + 1:] == [("CreateView", "account_names"), ("CreateView", "named_accounts")], steps
+    assert not any(isinstance(change, (DropView, CreateView)) and change.view.name == "note_bodies" for change in change_set)
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("ATTACH ':memory:' AS public")
+    connection.executescript(OLD_SQL)
+    connection.execute("INSERT INTO public.accounts VALUES (1, 'a', 'x')")
+    connection.executescript(Translator(change_set).to_sql())
+    assert connection.execute("SELECT * FROM public.account_names").fetchall() == [(1, "a")]
+    assert connection.execute("SELECT * FROM public.named_accounts").fetchall() == [(1,)]
+    connection.close()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--schemas", type=int, default=4)
+    arg_parser.add_argument("--tables", type=int, default=5000)
+    arg_parser.add_argument("--columns", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    check_view_order()
+    old = generate_database(seed=0, schemas=args.schemas, tables=args.tables, columns=args.columns)
+    new = generate_database(seed=1, schemas=args.schemas, tables=args.tables, columns=args.columns)
+    start = time.perf_counter()
+    change_set = diff_databases(old, new)
+    elapsed = time.perf_counter() - start
+    print(f"tables       {args.schemas * args.tables}")
+    print(f"changes      {len(change_set)}")
+    print(f"diff         {elapsed * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmarks Markdown documentation generation with markdown_docs.write_docs on a generated schema.
+
+Generates the documentation from scratch, regenerates it unchanged, then edits the notes of one
+table and regenerates it again, reporting the time and the number of pages written by each run.
+
+Usage:
+    python benchmarks/bench_markdown_docs.py [--tables 30000] [--schemas 10] [--jobs 4]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database
+from markdown_docs import write_docs
+
+def report(label, result):
+    print(f"{label:<28} {result.seconds:8.2f} s {len(result.written):8} written {len(result.removed):6} removed", flush=True)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=30000)
+    arg_parser.add_argument("--schemas", type=int, default=10)
+    arg_parser.add_argument("--jobs", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    database = generate_database(seed=0, schemas=args.schemas, tables=args.tables)
+    output_dir = tempfile.mkdtemp(prefix="alkahest-docs-")
+    try:
+        report("initial, 1 job", write_docs(database, output_dir))
+        shutil.rmtree(output_dir)
+        report(f"initial, {args.jobs} jobs", write_docs(database, output_dir, jobs=args.jobs))
+        report("unchanged", write_docs(database, output_dir, jobs=args.jobs))
+
+        schema = next(iter(database.schemas.values()))
+        table = list(schema.tables.values())[len(schema.tables) // 2]
+        table.notes = "Edited for the benchmark."
+        result = write_docs(database, output_dir, jobs=args.jobs)
+        report("one table's notes edited", result)
+        print(f"  {', '.join(result.written)}")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmarks the structural hashes in merkle.py on a generated schema parsed from both DBML and SQL.
+
+Compares rendering both models to SQL and comparing the text, which is what a docs-in-sync check
+would do otherwise, with hashing both models cold, comparing the cached roots, and finding a single
+edited column after invalidating it.
+
+Usage:
+    python benchmarks/bench_merkle.py [--tables 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database, to_dbml, to_sql
+from merkle import differences, structural_hash
+from parse.dbml_lark import load_dbml
+from parse.sql_sqlparse import SQLtoAlkahest
+from translator import Translator
+
+def timed(label, function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:10.3f} ms")
+    return result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    # One schema, since the generator's DBML does not qualify cross-schema references.
+    database = generate_database(seed=0, schemas=1, tables=args.tables)
+    documented = load_dbml(to_dbml(database))
+    parser = SQLtoAlkahest(to_sql(database))
+    parser.parse()
+    migrated = parser.database
+
+    same_text = timed("render both to SQL and compare", lambda: Translator(documented).to_sql() == Translator(migrated).to_sql())
+    print(f"  texts equal: {same_text}")
+    equal = timed("hash both, cold", lambda: structural_hash(documented) == structural_hash(migrated))
+    assert equal, "the DBML and SQL models should be structurally equal"
+    timed("compare roots, cached", lambda: structural_hash(documented) == structural_hash(migrated))
+
+    schema = next(iter(documented.schemas.values()))
+    table = list(schema.tables.values())[args.tables // 2]
+    column = next(iter(table.columns.values()))
+    column.default_value = "42"
+    qualified_name = f"{schema.name}.{table.name}.{column.name}"
+    documented.touch(qualified_name)
+    found = timed("rehash after one edit and narrow", lambda: differences(documented, migrated))
+    assert [difference.name for difference in found] == [qualified_name], found
+    found = timed("narrow again, cached", lambda: differences(documented, migrated))
+    print(f"found {', '.join(difference.name for difference in found)}")
+
+if __name__ == "__main__":
+    main()
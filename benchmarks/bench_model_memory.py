@@ -0,0 +1,86 @@
+"""
+Memory benchmark for the classes.py model.
+
+Loads a synthetic schema of N columns twice and reports the memory each copy holds:
+    baseline:  __dict__-based copies of the model classes, with one DataType and one set of
+               strings per column, as the parsers used to build it.
+    compact:   the __slots__ model, with interned DataTypes and names.
+
+Usage:
+    python benchmarks/bench_model_memory.py [--columns N] [--columns-per-table N]
+"""
+import argparse
+import dataclasses
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import classes
+from classes import intern_data_type
+
+TYPE_NAMES = [f"varchar({n})" for n in range(8, 256, 8)] + ["integer", "bigint", "text", "boolean", "timestamp", "uuid"]
+
+def without_slots(cls):
+    """
+    Returns a copy of a model dataclass that stores its fields in a per-instance __dict__.
+    """
+    namespace = {"__annotations__": {}}
+    for f in dataclasses.fields(cls):
+        namespace["__annotations__"][f.name] = f.type
+        namespace[f.name] = dataclasses.field(default=f.default, default_factory=f.default_factory)
+    return dataclasses.dataclass(type(cls.__name__, (), namespace))
+
+def fresh(string):
+    # Build a new string object with the same value, as a parser reading it from input would.
+    return "".join(list(string))
+
+def build(columns, columns_per_table, Column, Table, Schema, Database, data_type_for, name_for):
+    schema_name = "warehouse"
+    schema = Schema(name=schema_name)
+    for t in range(columns // columns_per_table):
+        table = Table(name=f"table_{t}", schema=name_for(schema_name))
+        for c in range(columns_per_table):
+            name = name_for(f"column_{c}")
+            table.columns[name] = Column(name=name, data_type=data_type_for(TYPE_NAMES[(t + c) % len(TYPE_NAMES)]))
+        schema.tables[table.name] = table
+    return Database(name="bench", schemas={schema_name: schema})
+
+def measure(build_model):
+    gc.collect()
+    tracemalloc.start()
+    model = build_model()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del model
+    return current
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--columns", type=int, default=1_000_000)
+    arg_parser.add_argument("--columns-per-table", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    DataType, Column, Table, Schema, Database = (
+        without_slots(cls) for cls in (classes.DataType, classes.Column, classes.Table, classes.Schema, classes.Database)
+    )
+    baseline = measure(lambda: build(
+        args.columns, args.columns_per_table, Column, Table, Schema, Database,
+        lambda name: DataType(dbml=fresh(name), sqlalchemy=fresh(""), sql=fresh("")),
+        fresh,
+    ))
+    compact = measure(lambda: build(
+        args.columns, args.columns_per_table, classes.Column, classes.Table, classes.Schema, classes.Database,
+        lambda name: intern_data_type(dbml=fresh(name), sqlalchemy="", sql=""),
+        lambda name: sys.intern(fresh(name)),
+    ))
+    print(f"columns      {args.columns}")
+    print(f"baseline     {baseline / 2 ** 20:10.1f} MiB   {baseline / args.columns:6.1f} bytes/column")
+    print(f"compact      {compact / 2 ** 20:10.1f} MiB   {compact / args.columns:6.1f} bytes/column")
+    print(f"saved        {(baseline - compact) / 2 ** 20:10.1f} MiB   {(baseline - compact) / baseline:6.1%}")
+
+if __name__ == "__main__":
+    main()
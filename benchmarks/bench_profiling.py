@@ -0,0 +1,83 @@
+"""
+Measures the overhead of the instrumentation in profiling.py.
+
+Times parsing a generated schema from DBML and SQL and rendering it back, with no Profile active,
+with a Profile active, and with a memory-tracing Profile active. The cost of the instrumentation
+while disabled is estimated from the per-call cost of an instrumented no-op times the number of
+instrumented calls, since the instrumented functions cannot be run without it.
+
+Usage:
+    python benchmarks/bench_profiling.py [--tables 1000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database, to_dbml, to_sql
+from parse.dbml_lark import get_parser, load_dbml
+from parse.sql_sqlparse import SQLtoAlkahest
+from profiling import Profile, instrumented
+from translator import Translator
+
+def workload(dbml_string, sql_string):
+    database = load_dbml(dbml_string)
+    Translator(database).to_sql()
+    parser = SQLtoAlkahest(sql_string)
+    parser.parse()
+    Translator(parser.database).to_dbml()
+
+def best_time(function, repeat, profile=None):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if profile is None:
+            function()
+        else:
+            with profile:
+                function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def wrapper_cost(calls=1_000_000):
+    """
+    Returns the extra seconds per call of an instrumented function while no Profile is active.
+    """
+    def noop():
+        pass
+    wrapped = instrumented("noop")(noop)
+    plain = best_time(lambda: [noop() for _ in range(calls)], 3)
+    disabled = best_time(lambda: [wrapped() for _ in range(calls)], 3)
+    return max(0.0, disabled - plain) / calls
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=1000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    database = generate_database(seed=0, schemas=2, tables=args.tables)
+    dbml_string, sql_string = to_dbml(database), to_sql(database)
+    get_parser(inline=True)
+    run = lambda: workload(dbml_string, sql_string)
+
+    disabled = best_time(run, args.repeat)
+    profile = Profile()
+    enabled = best_time(run, args.repeat, profile)
+    traced = best_time(run, 1, Profile(trace_memory=True))
+    calls = sum(stats.calls for stats in profile.phases.values()) // args.repeat
+    estimated = calls * wrapper_cost()
+
+    print(profile.report())
+    print()
+    print(f"disabled:           {disabled * 1000:9.1f} ms, of which about {estimated * 1000:.2f} ms "
+          f"({estimated / disabled:.3%}) is instrumentation ({calls} instrumented calls)")
+    print(f"enabled:            {enabled * 1000:9.1f} ms ({enabled / disabled - 1:+.1%})")
+    print(f"enabled, tracemalloc: {traced * 1000:7.1f} ms ({traced / disabled - 1:+.1%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmarks reflection.py against SQLite files holding a generated schema.
+
+The first schema is the main database and every further one an attached database file, attached on
+each new pooled connection. The batched reflect_database, with one worker and with one worker per
+schema, is compared with the per-table round trips of plain Inspector calls and with
+`MetaData.reflect` followed by `from_metadata`.
+
+Usage:
+    python benchmarks/bench_reflection.py [--tables 20000] [--schemas 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sqlalchemy
+from generator import generate_database
+from reflection import reflect_database
+from sqlalchemy_metadata import from_metadata, to_metadata
+
+def create_files(directory, tables, schemas):
+    paths = []
+    for index in range(schemas):
+        schema = next(iter(generate_database(seed=index, schemas=1, tables=tables // schemas).schemas.values()))
+        path = os.path.join(directory, f"schema_{index}.db")
+        engine = sqlalchemy.create_engine(f"sqlite:///{path}")
+        to_metadata(schema, default_schema=schema.name).create_all(engine)
+        engine.dispose()
+        paths.append(path)
+    return paths
+
+def create_engine(paths):
+    engine = sqlalchemy.create_engine(f"sqlite:///{paths[0]}")
+
+    @sqlalchemy.event.listens_for(engine, "connect")
+    def attach(connection, record):
+        for index, path in enumerate(paths[1:], 1):
+            connection.execute(f"ATTACH DATABASE '{path}' AS schema_{index}")
+    return engine
+
+def per_table(engine, schemas):
+    with engine.connect() as connection:
+        inspector = sqlalchemy.inspect(connection)
+        for schema in schemas:
+            for table in inspector.get_table_names(schema=schema):
+                inspector.get_columns(table, schema=schema)
+                inspector.get_pk_constraint(table, schema=schema)
+                inspector.get_foreign_keys(table, schema=schema)
+                inspector.get_unique_constraints(table, schema=schema)
+
+def metadata_reflect(engine, schemas):
+    metadata = sqlalchemy.MetaData()
+    with engine.connect() as connection:
+        for schema in schemas:
+            metadata.reflect(connection, schema=schema)
+    return from_metadata(metadata, default_schema="main")
+
+def timed(label, function, baseline=None):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.2f} s" + (f" ({baseline / elapsed:.1f}x)" if baseline else ""), flush=True)
+    return elapsed, result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=20000)
+    arg_parser.add_argument("--schemas", type=int, default=4)
+    arg_parser.add_argument("--skip-baselines", action="store_true", help="Only time reflect_database.")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = create_files(directory, args.tables, args.schemas)
+        engine = create_engine(paths)
+        schemas = [None] + [f"schema_{index}" for index in range(1, args.schemas)]
+        baseline = None
+        if not args.skip_baselines:
+            baseline, _ = timed("per-table Inspector calls", lambda: per_table(engine, schemas))
+            timed("MetaData.reflect + from_metadata", lambda: metadata_reflect(engine, schemas), baseline)
+        _, database = timed("reflect_database", lambda: reflect_database(engine), baseline)
+        timed(f"reflect_database, {args.schemas} workers", lambda: reflect_database(engine, workers=args.schemas), baseline)
+        engine.dispose()
+
+    tables = sum(len(schema.tables) for schema in database.schemas.values())
+    columns = sum(len(table.columns) for schema in database.schemas.values() for table in schema.tables.values())
+    print(f"{tables} tables, {columns} columns in {len(database.schemas)} schemas")
+
+if __name__ == "__main__":
+    main()
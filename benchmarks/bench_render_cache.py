@@ -0,0 +1,58 @@
+"""
+Benchmarks re-rendering a generated schema through a RenderCache after a one-column edit.
+
+For each output format, renders the database without a cache, then with a warm cache unchanged and
+after editing one column in place, which is followed by `Database.touch` on it.
+Reports the best of three runs.
+
+Usage:
+    python benchmarks/bench_render_cache.py [--tables 20000] [--columns 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database
+from render_cache import RenderCache
+from translator import Translator
+
+def timed(label, function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<36} {best * 1000:10.1f} ms", flush=True)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=20000)
+    arg_parser.add_argument("--columns", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    database = generate_database(seed=0, schemas=1, tables=args.tables, columns=args.columns)
+    schema = next(iter(database.schemas.values()))
+    table = list(schema.tables.values())[args.tables // 2]
+    column = next(iter(table.columns.values()))
+    edits = iter(range(10 ** 9))
+
+    def edit_and_render(cache, output_format):
+        column.default_value = str(next(edits))
+        database.touch(f"{schema.name}.{table.name}.{column.name}")
+        return Translator(database, cache).render(output_format)
+
+    for output_format in ("dbml", "sqlalchemy", "sql"):
+        timed(f"{output_format} uncached", lambda: Translator(database).render(output_format))
+        cache = RenderCache()
+        Translator(database, cache).render(output_format)
+        timed(f"{output_format} cached, unchanged", lambda: Translator(database, cache).render(output_format))
+        timed(f"{output_format} cached, one column edited", lambda: edit_and_render(cache, output_format))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Compares parsing a DBML file with loading its cached snapshot.
+
+Usage:
+    python benchmarks/bench_snapshot.py [--tables N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database, to_dbml
+from snapshot import load_dbml_file
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=10000)
+    arg_parser.add_argument("--columns", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, "schema.dbml")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(to_dbml(generate_database(tables=args.tables, columns=args.columns)))
+        cache_dir = os.path.join(directory, "cache")
+
+        start = time.perf_counter()
+        parsed = load_dbml_file(source_path, cache_dir)
+        miss = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = load_dbml_file(source_path, cache_dir)
+        hit = time.perf_counter() - start
+        assert parsed == loaded, "snapshot differs from the parsed database"
+        size = sum(entry.stat().st_size for entry in os.scandir(cache_dir))
+
+    print(f"tables       {args.tables}")
+    print(f"parse+save   {miss:8.3f} s")
+    print(f"load         {hit:8.3f} s")
+    print(f"snapshot     {size / 2 ** 20:8.1f} MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Equivalence check and benchmark for the regex DDL scanner in parse/ddl_scanner.py.
+
+Parses a corpus of hand-written DDL edge cases and generated pg_dump-style schemas twice, once with
+the scanner fast path and once with sqlparse alone, and fails if the resulting Databases differ.
+Then times both paths on a generated schema and reports how many statements fell back to sqlparse.
+
+Usage:
+    python benchmarks/bench_sql_scanner.py [--tables 2000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database, to_sql
+from parse.ddl_scanner import scan_statement
+from parse.sql_sqlparse import SQLtoAlkahest, split_statements
+
+CORPUS = [
+    # Statements that define nothing Alkahest models.
+    """
+    SET statement_timeout = 0;
+    SELECT pg_catalog.set_config('search_path', '', false);
+    CREATE SCHEMA sales;
+    CREATE EXTENSION IF NOT EXISTS pgcrypto WITH SCHEMA public;
+    CREATE SEQUENCE public.users_id_seq START WITH 1 INCREMENT BY 1;
+    CREATE UNIQUE INDEX users_email ON public.users USING btree (email);
+    ALTER TABLE ONLY public.users ADD CONSTRAINT users_pkey PRIMARY KEY (id);
+    COMMENT ON TABLE public.users IS 'CREATE TABLE in a string';
+    """,
+    # Enums, including quotes inside values and a composite type.
+    """
+    CREATE TYPE public.mood AS ENUM ('sad', 'o''k', 'happy');
+    CREATE TYPE status AS ENUM (
+        'active',
+        'archived'
+    );
+    CREATE TYPE public.pair AS (a integer, b integer);
+    CREATE TYPE "Quoted"."Type" AS ENUM ('a,b', '(c)');
+    """,
+    # Column types, defaults and inline constraints.
+    """
+    CREATE TABLE public.orgs (
+        id integer NOT NULL,
+        name character varying(255) DEFAULT 'x, y'::character varying NOT NULL,
+        amount numeric(12, 2) DEFAULT NULL CHECK (amount > 0),
+        created timestamp with time zone DEFAULT now() NOT NULL,
+        tags text[] DEFAULT '{}'::text[],
+        code "char" COLLATE pg_catalog."C" UNIQUE,
+        CONSTRAINT orgs_pkey PRIMARY KEY (id)
+    );
+    CREATE UNLOGGED TABLE IF NOT EXISTS "Mixed Case" ("Id" bigint PRIMARY KEY, "a""b" text);
+    CREATE TEMP TABLE scratch (id serial);
+    """,
+    # Foreign keys, inline and as table constraints.
+    """
+    CREATE TABLE public.users (
+        id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        org_id integer REFERENCES public.orgs(id) ON DELETE SET NULL ON UPDATE CASCADE NOT NULL,
+        manager_id bigint CONSTRAINT users_manager_fkey REFERENCES users (id) DEFERRABLE INITIALLY DEFERRED,
+        first_org integer,
+        second_org integer,
+        UNIQUE (first_org),
+        CONSTRAINT users_orgs_fkey FOREIGN KEY (first_org, second_org) REFERENCES public.orgs (id, id) MATCH FULL
+    );
+    """,
+    # Foreign keys without a column list reference the primary key of their target, or "id".
+    """
+    CREATE TABLE public.accounts (account_key integer PRIMARY KEY, name text);
+    CREATE TABLE public.invoices (
+        id integer,
+        account integer REFERENCES accounts ON DELETE CASCADE,
+        parent integer REFERENCES public.invoices,
+        external integer REFERENCES elsewhere,
+        PRIMARY KEY (id)
+    );
+    """,
+    # Statements the scanner leaves to sqlparse.
+    """
+    CREATE TABLE public.commented (
+        id integer, -- the key
+        /* a block comment */ name text
+    );
+    CREATE TABLE public.partitioned (id integer) PARTITION BY RANGE (id);
+    CREATE VIEW public.counts (n) AS SELECT count(*) FROM public.orgs;
+    CREATE MATERIALIZED VIEW public.totals AS SELECT sum(amount) FROM public.orgs WITH NO DATA;
+    CREATE VIEW public.commented_view AS SELECT 1 -- one
+    ;
+    """,
+    # Views.
+    """
+    CREATE VIEW public.active AS
+     SELECT users.id
+       FROM public.users
+      WHERE (users.org_id IS NOT NULL);
+    CREATE OR REPLACE VIEW "Quoted".v AS SELECT ';' AS semicolon;
+    CREATE TEMPORARY VIEW recent AS SELECT 1
+    """,
+]
+
+def parse(sql_string, fast):
+    parser = SQLtoAlkahest(sql_string, fast=fast)
+    parser.parse()
+    return parser.database
+
+def check_equivalence(corpus):
+    """
+    Returns the indexes of the corpus entries the two parse paths disagree on.
+    """
+    mismatches = []
+    for i, sql_string in enumerate(corpus):
+        if parse(sql_string, fast=True) != parse(sql_string, fast=False):
+            mismatches.append(i)
+    return mismatches
+
+def check_implicit_references():
+    """
+    Returns whether foreign keys without a column list point at the primary key of their target.
+    """
+    invoices = parse(CORPUS[4], fast=True).schemas["public"].tables["invoices"].columns
+    targets = {name: (column.foreign_keys[0].tables[0], column.foreign_keys[0].columns[0])
+               for name, column in invoices.items() if column.foreign_keys}
+    return targets == {"account": ("accounts", "account_key"), "parent": ("public.invoices", "id"), "external": ("elsewhere", "id")}
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    generated = [to_sql(generate_database(seed=seed, schemas=3, tables=200, columns=10, foreign_keys=2)) for seed in range(3)]
+    mismatches = check_equivalence(CORPUS + generated)
+    print(f"equivalence: {len(CORPUS) + len(generated) - len(mismatches)}/{len(CORPUS) + len(generated)} corpus entries match")
+    for i in mismatches:
+        print(f"  mismatch in {'corpus' if i < len(CORPUS) else 'generated'} entry {i}")
+    implicit = check_implicit_references()
+    print(f"implicit references: {'primary keys' if implicit else 'WRONG TARGETS'}")
+
+    sql_string = to_sql(generate_database(seed=0, schemas=4, tables=args.tables, columns=10, foreign_keys=2))
+    statements = list(split_statements(sql_string.splitlines(keepends=True)))
+    fallbacks = sum(scan_statement(statement) is None for statement in statements)
+    fast = best_time(lambda: parse(sql_string, fast=True), args.repeat)
+    slow = best_time(lambda: parse(sql_string, fast=False), args.repeat)
+    print(f"{len(statements)} statements, {fallbacks} fell back to sqlparse")
+    print(f"scanner:  {fast * 1000:10.1f} ms  {len(statements) / fast:10.0f} statements/s")
+    print(f"sqlparse: {slow * 1000:10.1f} ms  {len(statements) / slow:10.0f} statements/s")
+    print(f"speedup:  {slow / fast:10.1f}x")
+    sys.exit(1 if mismatches or not implicit else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares building SQLAlchemy MetaData in memory with sqlalchemy_metadata.py against generating a
+Python module and importing it.
+
+The output of `Translator.to_sqlalchemy` is a declarative sketch rather than an importable module,
+so the codegen route here writes the equivalent SQLAlchemy Core source, `Table(...)` declarations
+using the same types, to a temporary module and imports it without bytecode caching, as a first run
+would. The reverse direction is compared with rendering the MetaData to DDL and parsing it back.
+
+Usage:
+    python benchmarks/bench_sqlalchemy_metadata.py [--tables 2000] [--repeat 3]
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from generator import generate_database
+from parse.sql_sqlparse import SQLtoAlkahest
+from sqlalchemy_metadata import from_metadata, sqlalchemy_type, to_metadata
+
+def module_source(database, default_schema="public"):
+    lines = ["from sqlalchemy import *", "", "metadata = MetaData()", ""]
+    for schema in database.schemas.values():
+        schema_arg = None if schema.name == default_schema else schema.name
+        for table in schema.tables.values():
+            lines.append(f"Table({table.name!r}, metadata,")
+            for column in table.columns.values():
+                arguments = [repr(column.name), repr(sqlalchemy_type(column.data_type))]
+                for foreign_key in column.foreign_keys or ():
+                    for table_name, column_name in zip(foreign_key.tables, foreign_key.columns):
+                        qualified = table_name if "." in table_name else f"{schema.name}.{table_name}"
+                        arguments.append(f"ForeignKey({qualified + '.' + column_name!r})")
+                arguments.append(f"primary_key={column.primary_key}, nullable={column.nullable}")
+                lines.append(f"    Column({', '.join(arguments)}),")
+            lines.append(f"    schema={schema_arg!r})")
+    return "\n".join(lines) + "\n"
+
+def codegen_import(database, directory, index):
+    name = f"generated_metadata_{index}"
+    with open(os.path.join(directory, f"{name}.py"), "w") as fp:
+        fp.write(module_source(database))
+    importlib.invalidate_caches()
+    module = importlib.import_module(name)
+    del sys.modules[name]
+    return module.metadata
+
+def ddl_round_trip(metadata):
+    dialect = postgresql.dialect()
+    sql_string = ";\n".join(str(CreateTable(table).compile(dialect=dialect)) for table in metadata.tables.values()) + ";"
+    parser = SQLtoAlkahest(sql_string)
+    parser.parse()
+    return parser.database
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tables", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    database = generate_database(seed=0, schemas=4, tables=args.tables)
+    sys.dont_write_bytecode = True
+    with tempfile.TemporaryDirectory() as directory:
+        sys.path.insert(0, directory)
+        runs = iter(range(args.repeat))
+        codegen, generated = best_time(lambda: codegen_import(database, directory, next(runs)), args.repeat)
+        sys.path.remove(directory)
+    live, metadata = best_time(lambda: to_metadata(database), args.repeat)
+    assert sorted(metadata.tables) == sorted(generated.tables), "the two routes built different tables"
+    assert sum(len(table.columns) for table in metadata.tables.values()) == sum(len(table.columns) for table in generated.tables.values())
+
+    reverse, rebuilt = best_time(lambda: from_metadata(metadata), args.repeat)
+    through_ddl, _ = best_time(lambda: ddl_round_trip(metadata), args.repeat)
+    original = {(schema.name, table.name, tuple(table.columns)) for schema in database.schemas.values() for table in schema.tables.values()}
+    assert original == {(schema.name, table.name, tuple(table.columns)) for schema in rebuilt.schemas.values() for table in schema.tables.values()}
+
+    columns = sum(len(table.columns) for table in metadata.tables.values())
+    print(f"{args.tables} tables, {columns} columns")
+    print(f"model -> MetaData, codegen + import: {codegen * 1000:9.1f} ms")
+    print(f"model -> MetaData, to_metadata:      {live * 1000:9.1f} ms ({codegen / live:.1f}x faster)")
+    print(f"MetaData -> model, DDL + parse:      {through_ddl * 1000:9.1f} ms")
+    print(f"MetaData -> model, from_metadata:    {reverse * 1000:9.1f} ms ({through_ddl / reverse:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
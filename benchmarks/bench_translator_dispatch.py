@@ -0,0 +1,82 @@
+"""
+Microbenchmark for Translator per-node dispatch.
+
+Compares the cost of choosing a writer with the former isinstance ladder against the exact-type
+registry lookup, for each node type. Writers are replaced by no-ops so only dispatch is measured;
+both the ladder and write_node columns include the call to the no-op writer, and write_node runs
+with the format bound by a `write` call, as it is when nodes are rendered.
+
+Usage:
+    python benchmarks/bench_translator_dispatch.py [--calls N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from classes import DataType, Column, Table, Schema, Database, View, Enum
+from translator import Translator
+
+LADDER = (DataType, Column, Table, Schema, Database, View, Enum)
+
+def noop(translator, obj, fp):
+    pass
+
+def ladder_dispatch(translator, obj, fp):
+    # The shape of the isinstance chains the to_* methods used before the registry.
+    if isinstance(obj, DataType):
+        return noop(translator, obj, fp)
+    elif isinstance(obj, Column):
+        return noop(translator, obj, fp)
+    elif isinstance(obj, Table):
+        return noop(translator, obj, fp)
+    elif isinstance(obj, Schema):
+        return noop(translator, obj, fp)
+    elif isinstance(obj, Database):
+        return noop(translator, obj, fp)
+    elif isinstance(obj, View):
+        return noop(translator, obj, fp)
+    elif isinstance(obj, Enum):
+        return noop(translator, obj, fp)
+    else:
+        raise TypeError("Unsupported type for translation")
+
+def registry_dispatch(obj, registry={node_type: i for i, node_type in enumerate(LADDER)}):
+    return registry[type(obj)]
+
+def make_nodes():
+    data_type = DataType(dbml="integer", sqlalchemy="Integer", sql="INTEGER")
+    column = Column(name="id", data_type=data_type)
+    table = Table(name="t", columns={"id": column})
+    return {
+        DataType: data_type,
+        Column: column,
+        Table: table,
+        Schema: Schema(name="s", tables={"t": table}),
+        Database: Database(name="d"),
+        View: View(name="v", sql="SELECT 1"),
+        Enum: Enum(name="e", values=["a"]),
+    }
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--calls", type=int, default=1_000_000)
+    args = arg_parser.parse_args()
+
+    nodes = make_nodes()
+    Translator.writers["bench"] = {node_type: noop for node_type in LADDER}
+    translator = Translator(nodes[Database])
+    translator.write("bench", None)
+
+    print(f"{'node':<10} {'ladder ns':>10} {'registry ns':>12} {'write_node ns':>14}")
+    for node_type, node in nodes.items():
+        ladder = timeit.timeit(lambda: ladder_dispatch(translator, node, None), number=args.calls) / args.calls * 1e9
+        registry = timeit.timeit(lambda: registry_dispatch(node), number=args.calls) / args.calls * 1e9
+        write_node = timeit.timeit(lambda: translator.write_node("bench", node, None), number=args.calls) / args.calls * 1e9
+        print(f"{node_type.__name__:<10} {ladder:10.1f} {registry:12.1f} {write_node:14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures how long the Watcher in watch.py takes to resync a tree after a one-file edit.
+
+Writes --files generated schema files (alternately DBML and SQL) to a temporary directory, runs the
+initial sync, then edits one file at a time and times the scan plus the incremental sync. First
+checks that deleting one of two files defining the same table keeps the other file's copy.
+
+Usage:
+    python benchmarks/bench_watch.py [--files 2000] [--tables 5] [--edits 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database, to_dbml, to_sql
+from watch import Watcher
+
+def check_shared_definitions():
+    """
+    Deletes one of two files that define the same table, and checks the other file's copy remains.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = os.path.join(directory, "first.sql"), os.path.join(directory, "second.sql")
+        with open(first, "w", encoding="utf-8") as f:
+            f.write("CREATE TABLE public.shared (id integer PRIMARY KEY, name text);\n")
+        with open(second, "w", encoding="utf-8") as f:
+            f.write("CREATE TABLE public.shared (id integer PRIMARY KEY);\nCREATE TABLE public.own (id integer);\n")
+        watcher = Watcher([first, second], ["dbml"], output_dir=os.path.join(directory, "out"))
+        watcher.sync()
+        owner, other = (first, second) if list(watcher.databases)[-1] == first else (second, first)
+        os.remove(owner)
+        result = watcher.sync()
+        assert result.removed == [owner], result
+        shared = watcher.database.schemas["public"].tables.get("shared")
+        assert shared is watcher.databases[other].schemas["public"].tables["shared"], shared
+        assert watcher.database.lookup("public.shared") is shared
+        assert ("own" in watcher.database.schemas["public"].tables) == (other == second)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--files", type=int, default=2000)
+    arg_parser.add_argument("--tables", type=int, default=5)
+    arg_parser.add_argument("--edits", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    check_shared_definitions()
+    with tempfile.TemporaryDirectory() as directory:
+        source_dir = os.path.join(directory, "src")
+        os.makedirs(source_dir)
+        paths = []
+        for i in range(args.files):
+            database = generate_database(seed=i, tables=args.tables, enums=1, views=1)
+            suffix, text = (".dbml", to_dbml(database)) if i % 2 else (".sql", to_sql(database))
+            paths.append(os.path.join(source_dir, f"service_{i}{suffix}"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(text)
+
+        watcher = Watcher([source_dir], ["sql", "dbml"], output_dir=os.path.join(directory, "out"))
+        result = watcher.sync()
+        print(f"initial sync: {len(result.changed)} files, {len(result.written)} outputs in {result.seconds:.2f} s")
+
+        timings = []
+        for edit in range(args.edits):
+            path = paths[edit * len(paths) // args.edits]
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+            start = time.perf_counter()
+            result = watcher.sync()
+            timings.append(time.perf_counter() - start)
+            assert result.changed == [path] and not result.failed, result
+        print(f"one-file edit: median {statistics.median(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms "
+              f"(scan + parse + {len(result.written)} outputs)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Seeded synthetic schema generator for benchmarks.
+
+Builds a Database with a configurable number of schemas, tables, columns, foreign keys, enums and
+views, and writes it out as DBML (in the dialect parse/dbml_lark.py reads) and as PostgreSQL DDL.
+The same arguments and seed always produce the same schema.
+
+Usage:
+    python benchmarks/generator.py --tables 1000 --dbml out.dbml --sql out.sql
+"""
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from classes import Database, Table, Column, ForeignKey, Enum, View, intern_data_type
+
+# (dbml, sqlalchemy, sql) for the column types the generator draws from.
+TYPES = [
+    ("integer", "Integer", "integer"),
+    ("bigint", "BigInteger", "bigint"),
+    ("text", "Text", "text"),
+    ("boolean", "Boolean", "boolean"),
+    ("timestamp", "DateTime", "timestamp"),
+    ("numeric(12,2)", "Numeric(12, 2)", "numeric(12,2)"),
+    ("varchar(255)", "String(255)", "varchar(255)"),
+    ("uuid", "Uuid", "uuid"),
+]
+
+def generate_database(seed=0, schemas=1, tables=100, columns=10, foreign_keys=1, enums=5, views=5, enum_values=4):
+    """
+    Generates a synthetic Database.
+
+    Args:
+        seed (int): The random seed.
+        schemas (int): The number of schemas.
+        tables (int): The total number of tables, spread evenly over the schemas.
+        columns (int): The number of columns per table, including the "id" primary key.
+        foreign_keys (int): The number of foreign key columns per table, each referencing an earlier table.
+        enums (int): The number of enums per schema.
+        views (int): The number of views per schema.
+        enum_values (int): The number of values per enum.
+
+    Returns:
+        Database: The generated database.
+    """
+    rng = random.Random(seed)
+    database = Database(name="bench")
+    schema_names = [f"schema_{s}" for s in range(schemas)]
+    id_type = intern_data_type(*TYPES[0])
+    created = []
+    for t in range(tables):
+        schema_name = schema_names[t % schemas]
+        table = Table(name=f"table_{t}")
+        table.columns["id"] = Column(name="id", data_type=id_type, nullable=False, primary_key=True)
+        for c in range(1, columns):
+            data_type = intern_data_type(*rng.choice(TYPES))
+            table.columns[f"column_{c}"] = Column(name=f"column_{c}", data_type=data_type, nullable=rng.random() < 0.7)
+        for f in range(min(foreign_keys, len(created))):
+            target_schema, target = rng.choice(created)
+            table.columns[f"fk_{f}"] = Column(
+                name=f"fk_{f}", data_type=id_type,
+                foreign_keys=[ForeignKey(tables=[f"{target_schema}.{target}"], columns=["id"])],
+            )
+        database.add_table(table, schema_name)
+        created.append((schema_name, table.name))
+    for schema_name in schema_names:
+        for e in range(enums):
+            database.add_enum(Enum(name=f"enum_{e}", values=[f"value_{v}" for v in range(enum_values)]), schema_name)
+        schema_tables = list(database.schemas[schema_name].tables)
+        for v in range(views if schema_tables else 0):
+            table_name = rng.choice(schema_tables)
+            view = View(name=f"view_{v}", sql=f"SELECT id FROM {schema_name}.{table_name}")
+            database.add_view(view, schema_name)
+    return database
+
+def to_dbml(database):
+    """
+    Writes a Database as DBML that parse/dbml_lark.py can read.
+
+    Args:
+        database (Database): The database to write.
+
+    Returns:
+        str: The DBML text.
+    """
+    lines = [f'Project "{database.name}" {{']
+    for schema in database.schemas.values():
+        for table in schema.tables.values():
+            lines.append(f'  Table {schema.name}."{table.name}" {{')
+            refs = []
+            for column in table.columns.values():
+                settings = [setting for setting, on in (("pk", column.primary_key), ("not null", not column.nullable)) if on]
+                settings_dbml = f' [{", ".join(settings)}]' if settings else ''
+                lines.append(f'    "{column.name}" "{column.data_type.dbml}"{settings_dbml}')
+                for fk in column.foreign_keys or ():
+                    for ref_table, ref_column in zip(fk.tables, fk.columns):
+                        refs.append(f'    Ref: "{table.name}.{column.name}" < "{ref_table}.{ref_column}"')
+            lines.extend(refs)
+            lines.append('  }')
+        for enum in schema.enums.values():
+            values_dbml = ", ".join(f'"{value}"' for value in enum.values)
+            lines.append(f'  Enum "{schema.name}.{enum.name}" {{{values_dbml}}}')
+        for view in schema.views.values():
+            lines.append(f"  View \"{schema.name}.{view.name}\" As SQL '''{view.sql}''' End")
+    lines.append('}')
+    return "\n".join(lines) + "\n"
+
+def to_sql(database):
+    """
+    Writes a Database as schema-qualified PostgreSQL DDL, in the style of pg_dump --schema-only.
+
+    Args:
+        database (Database): The database to write.
+
+    Returns:
+        str: The SQL text.
+    """
+    statements = []
+    for schema in database.schemas.values():
+        for enum in schema.enums.values():
+            values_sql = ", ".join(f"'{value}'" for value in enum.values)
+            statements.append(f"CREATE TYPE {schema.name}.{enum.name} AS ENUM (\n    {values_sql}\n);")
+        for table in schema.tables.values():
+            column_lines = []
+            for column in table.columns.values():
+                line = f"    {column.name} {column.data_type.sql}"
+                if not column.nullable:
+                    line += " NOT NULL"
+                if column.primary_key:
+                    line += " PRIMARY KEY"
+                for fk in column.foreign_keys or ():
+                    for ref_table, ref_column in zip(fk.tables, fk.columns):
+                        line += f" REFERENCES {ref_table}({ref_column})"
+                column_lines.append(line)
+            statements.append(f"CREATE TABLE {schema.name}.{table.name} (\n" + ",\n".join(column_lines) + "\n);")
+        for view in schema.views.values():
+            statements.append(f"CREATE VIEW {schema.name}.{view.name} AS\n {view.sql};")
+    return "\n\n".join(statements) + "\n"
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--schemas", type=int, default=1)
+    arg_parser.add_argument("--tables", type=int, default=100)
+    arg_parser.add_argument("--columns", type=int, default=10)
+    arg_parser.add_argument("--foreign-keys", type=int, default=1)
+    arg_parser.add_argument("--enums", type=int, default=5)
+    arg_parser.add_argument("--views", type=int, default=5)
+    arg_parser.add_argument("--dbml", help="Path to write the DBML to.")
+    arg_parser.add_argument("--sql", help="Path to write the SQL to.")
+    args = arg_parser.parse_args()
+
+    database = generate_database(args.seed, args.schemas, args.tables, args.columns, args.foreign_keys, args.enums, args.views)
+    for path, write in ((args.dbml, to_dbml), (args.sql, to_sql)):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(write(database))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark harness for the parsers and the Translator.
+
+For each size tier, generates a synthetic schema with benchmarks/generator.py, then measures the
+wall time (best of --repeat runs) and tracemalloc peak of:
+    dbml.parse          parse_dbml
+    dbml.transform      transform_dbml
+    sql.parse           SQLtoAlkahest(...).parse()
+    sql.parse_sqlparse  SQLtoAlkahest(..., fast=False).parse()
+    translator.to_*     Translator(database).to_dbml / to_sql / to_sqlalchemy
+
+Results are written as JSON, tagged with the current git commit, so two runs can be compared:
+
+Usage:
+    python benchmarks/run_benchmarks.py [--tiers small medium] [--output results.json]
+    python benchmarks/run_benchmarks.py --compare before.json after.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import generate_database, to_dbml, to_sql
+from parse.dbml_lark import DBMLTransformer, get_parser, parse_dbml, transform_dbml
+from parse.sql_sqlparse import SQLtoAlkahest
+from translator import Translator
+
+TIERS = {
+    "small": dict(schemas=1, tables=10, columns=8),
+    "medium": dict(schemas=4, tables=1000, columns=10),
+    "large": dict(schemas=8, tables=10000, columns=12),
+}
+
+def sql_parse(sql_string, fast=True):
+    parser = SQLtoAlkahest(sql_string, fast=fast)
+    parser.parse()
+    return parser.database
+
+def benchmarks_for(database):
+    """
+    Returns the (name, function) pairs to measure for a generated database.
+    """
+    dbml_string = to_dbml(database)
+    sql_string = to_sql(database)
+    parser = get_parser()
+    tree = parse_dbml(dbml_string, parser)
+    translator = Translator(database)
+    return [
+        ("dbml.parse", lambda: parse_dbml(dbml_string, parser)),
+        ("dbml.transform", lambda: transform_dbml(tree, DBMLTransformer())),
+        ("sql.parse", lambda: sql_parse(sql_string)),
+        ("sql.parse_sqlparse", lambda: sql_parse(sql_string, fast=False)),
+        ("translator.to_dbml", translator.to_dbml),
+        ("translator.to_sql", translator.to_sql),
+        ("translator.to_sqlalchemy", translator.to_sqlalchemy),
+    ]
+
+def measure(function, repeat):
+    """
+    Returns the best wall time over `repeat` runs and the tracemalloc peak of one more run.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+def run(tiers, repeat, seed):
+    results = []
+    for tier in tiers:
+        database = generate_database(seed=seed, **TIERS[tier])
+        for name, function in benchmarks_for(database):
+            result = {"tier": tier, "benchmark": name}
+            try:
+                seconds, peak = measure(function, repeat)
+                result.update(status="ok", seconds=seconds, peak_bytes=peak)
+            except Exception as e:
+                result.update(status="error", error=f"{type(e).__name__}: {e}")
+            results.append(result)
+            print(format_result(result), flush=True)
+    return results
+
+def format_result(result):
+    if result["status"] != "ok":
+        return f"{result['tier']:<8} {result['benchmark']:<26} {result['error']}"
+    return f"{result['tier']:<8} {result['benchmark']:<26} {result['seconds'] * 1000:10.2f} ms {result['peak_bytes'] / 2 ** 20:9.2f} MiB"
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(before_path, after_path):
+    """
+    Prints the time and memory ratio of each benchmark between two result files.
+    """
+    with open(before_path, encoding="utf-8") as f:
+        before = {(r["tier"], r["benchmark"]): r for r in json.load(f)["results"]}
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+    print(f"{'tier':<8} {'benchmark':<26} {'time':>8} {'memory':>8}")
+    for result in after:
+        old = before.get((result["tier"], result["benchmark"]))
+        if old is None or old["status"] != "ok" or result["status"] != "ok":
+            continue
+        time_ratio = result["seconds"] / old["seconds"]
+        memory_ratio = result["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("nan")
+        print(f"{result['tier']:<8} {result['benchmark']:<26} {time_ratio:7.2f}x {memory_ratio:7.2f}x")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="Path to write the JSON results to.")
+    arg_parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files.")
+    args = arg_parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    results = run(args.tiers, args.repeat, args.seed)
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "tiers": {tier: TIERS[tier] for tier in args.tiers},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
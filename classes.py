@@ -1,11 +1,16 @@
+import sys
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
-@dataclass
+# All model classes use __slots__, so instances carry no per-object __dict__.
+@dataclass(slots=True, frozen=True)
 class DataType:
     """
     Represents the data type of a column in a database table.
 
+    DataTypes are immutable, so a single instance can be shared by every column of that type.
+    Use `intern_data_type` to get the shared instance.
+
     Attributes:
         dbml: The data type in DBML format.
         sqlalchemy: The data type in SQLAlchemy format.
@@ -17,7 +22,11 @@ class DataType:
     sql: str
     notes: Optional[str] = None
 
-@dataclass
+    def __reduce__(self):
+        # Unpickled DataTypes rejoin the intern pool instead of duplicating the shared instances.
+        return intern_data_type, (self.dbml, self.sqlalchemy, self.sql, self.notes)
+
+@dataclass(slots=True)
 class Column:
     """
     Represents a column in a database table.
@@ -39,15 +48,17 @@ class Column:
     data_type: DataType
     nullable: bool = True
     primary_key: bool = False
-    default_value = None
+    default_value: Optional[str] = None
     unique: bool = False
     check: str = None
     exclude: str = None
-    foreign_keys: Optional[List[ForeignKey]] = None
-    table: 'Table' = None 
+    foreign_keys: Optional[List['ForeignKey']] = None
+    table: 'Table' = None
     notes: Optional[str] = None
+    _merkle: tuple = field(default=None, init=False, repr=False, compare=False)
+    _fingerprint: tuple = field(default=None, init=False, repr=False, compare=False)
 
-@dataclass
+@dataclass(slots=True)
 class Relationship:
     """
     Represents a relationship between two tables in a database.
@@ -64,10 +75,10 @@ class Relationship:
     table2: str
     column1: str = None
     column2: str = None
-    foreign_keys: List[ForeignKey]
+    foreign_keys: List['ForeignKey'] = None
     notes: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Table:
     """
     Represents a table in a database.
@@ -80,12 +91,25 @@ class Table:
         notes (Optional[str], default=None): Markdown notes about the table.
     """
     name: str
-    columns: Dict[str, Column]
+    columns: Dict[str, Column] = field(default_factory=dict)
     relationships: List[Relationship] = None
-    schema: str
+    schema: str = None
     notes: Optional[str] = None
+    _merkle: bytes = field(default=None, init=False, repr=False, compare=False)
+    _fingerprint: bytes = field(default=None, init=False, repr=False, compare=False)
+
+    def invalidate(self):
+        """
+        Discards the cached structural hashes and render fingerprints of the table and its columns.
+
+        Call after editing the table or its columns in place. In a Database, use `Database.touch`,
+        which also discards the hashes of the schema and database holding the table.
+        """
+        self._merkle = self._fingerprint = None
+        for column in self.columns.values():
+            column._merkle = column._fingerprint = None
 
-@dataclass
+@dataclass(slots=True)
 class ForeignKey:
     """
     Represents a foreign key constraint in a database table.
@@ -99,7 +123,7 @@ class ForeignKey:
     columns: List[Column] = None
     notes: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Enum:
     """
     Represents an enumeration in a database.
@@ -111,7 +135,7 @@ class Enum:
     name: str
     values: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class View:
     """
     Represents a view in a database.
@@ -119,39 +143,320 @@ class View:
     Attributes:
         name: The name of the view.
         columns: The columns in the view.
-        query: The SQL query that defines the view.
+        sql: The SQL query that defines the view.
         notes (Optional[str], default=None): Markdown notes about the view.
     """
     name: str
     columns: List[Column] = field(default_factory=list)
-    query: str
+    sql: str = None
     notes: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Schema:
     """
     Represents a schema in a database.
 
     Attributes:
         name: The name of the schema.
-        tables: The tables in the schema.
+        tables: A dictionary mapping table names to Table objects.
+        enums: A dictionary mapping enumeration names to Enum objects.
+        views: A dictionary mapping view names to View objects.
         notes (Optional[str], default=None): Markdown notes about the schema.
     """
     name: str
-    tables: List[Table] = field(default_factory=list)
+    tables: Dict[str, Table] = field(default_factory=dict)
+    enums: Dict[str, Enum] = field(default_factory=dict)
+    views: Dict[str, View] = field(default_factory=dict)
     notes: Optional[str] = None
+    _merkle: object = field(default=None, init=False, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Database:
     """
     Represents a database.
 
+    The database maintains two indexes over its contents: one from qualified names ("schema.table",
+    "schema.table.column", "schema.enum", "schema.view") to objects, and one from each referenced
+    column to the columns whose foreign keys point at it. They are kept up to date by the `add_*`
+    and `remove_*` methods. Call `reindex` after changing the `schemas` dictionaries directly.
+
+    The model objects also cache their structural hashes (see merkle.py) and render fingerprints
+    (see render_cache.py), which the `add_*` and `remove_*` methods and `reindex` discard for the
+    database and the schemas they change. Call `touch` after editing an object in place.
+
     Attributes:
         name: The name of the database.
-        schemas: The schemas in the database.
+        schemas: A dictionary mapping schema names to Schema objects.
         notes (Optional[str], default=None): Markdown notes about the database.
     """
-    name: str
-    schemas: List[Schema] = field(default_factory=list)
-    notes: Optional[str] = None
\ No newline at end of file
+    name: str = None
+    schemas: Dict[str, Schema] = field(default_factory=dict)
+    notes: Optional[str] = None
+    _objects: Dict[str, object] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _referrers: Dict[str, Dict[str, Column]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _merkle: bytes = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.reindex()
+
+    def reindex(self):
+        """
+        Rebuilds the name and foreign key indexes from the schemas.
+        """
+        self._objects.clear()
+        self._referrers.clear()
+        self._merkle = None
+        for schema in self.schemas.values():
+            schema._merkle = None
+            self._index_schema(schema)
+
+    def lookup(self, qualified_name):
+        """
+        Returns the Table, Column, Enum or View with the given qualified name, or None.
+
+        Args:
+            qualified_name: A name such as "schema.table" or "schema.table.column".
+        """
+        return self._objects.get(qualified_name)
+
+    def referencing_columns(self, qualified_name):
+        """
+        Returns the qualified names of the columns whose foreign keys reference a column or table.
+
+        Args:
+            qualified_name: The qualified name of a column, or of a table to include references to any of its columns.
+
+        Returns:
+            List[str]: The qualified names of the referencing columns.
+        """
+        target = self._objects.get(qualified_name)
+        if isinstance(target, Table):
+            referrers = {}
+            for column_name in target.columns:
+                referrers.update(self._referrers.get(f"{qualified_name}.{column_name}", {}))
+            return list(referrers)
+        return list(self._referrers.get(qualified_name, {}))
+
+    @staticmethod
+    def foreign_key_target(schema_name, table_name):
+        """
+        Resolves a table named in a foreign key to its schema and name.
+
+        An unqualified table is in the schema of the referencing table. Every part of the model that
+        follows foreign keys resolves them with this method, so they all agree on the target.
+
+        Args:
+            schema_name: The schema of the referencing table, or None if it is not known.
+            table_name: The table as named in the foreign key, such as "users" or "auth.users".
+
+        Returns:
+            Tuple[Optional[str], str]: The schema name, None only for an unqualified table in an unknown
+            schema, and the table name.
+        """
+        target_schema, _, target_table = table_name.rpartition(".")
+        return target_schema or schema_name, target_table
+
+    def touch(self, qualified_name=None):
+        """
+        Discards the cached hashes and render fingerprints of an object edited in place.
+
+        The structural hashes of the schema and database holding the object are updated along the one
+        path from the object to the root, so touching after each edit is cheap even in a large schema.
+        The name and foreign key indexes are not updated; call `reindex` after editing foreign keys.
+
+        Args:
+            qualified_name (str, optional): The qualified name of the edited table, column, enum or
+                view, or of a schema. Defaults to None, to discard every cached hash in the database.
+        """
+        self._merkle = None
+        if qualified_name is None:
+            for schema in self.schemas.values():
+                schema._merkle = None
+                for table in schema.tables.values():
+                    table.invalidate()
+            return
+        parts = qualified_name.split(".")
+        schema = self.schemas.get(parts[0])
+        if schema is None:
+            return
+        obj = self.lookup(".".join(parts[:2])) if len(parts) > 1 else None
+        if obj is None:
+            schema._merkle = None
+            return
+        if isinstance(obj, Table):
+            obj.invalidate()
+        if schema._merkle is not None:
+            # merkle.py imports this module, so it is imported on first use.
+            from merkle import update_object_hash
+            if not update_object_hash(schema, obj):
+                schema._merkle = None
+
+    def add_schema(self, schema):
+        """
+        Adds a schema and everything in it, replacing any schema with the same name.
+
+        Returns:
+            Schema: The added schema.
+        """
+        if schema.name in self.schemas:
+            self.remove_schema(schema.name)
+        self.schemas[schema.name] = schema
+        self._merkle = None
+        self._index_schema(schema)
+        return schema
+
+    def remove_schema(self, schema_name):
+        """
+        Removes a schema and everything in it.
+
+        Returns:
+            Schema: The removed schema.
+        """
+        schema = self.schemas.pop(schema_name)
+        self._merkle = None
+        for table in schema.tables.values():
+            self._unindex_table(schema_name, table)
+        for name in (*schema.enums, *schema.views):
+            self._objects.pop(f"{schema_name}.{name}", None)
+        return schema
+
+    def add_table(self, table, schema_name=None):
+        """
+        Adds a table to a schema, creating the schema if needed and replacing any table with the same name.
+
+        Args:
+            table: The table to add.
+            schema_name (Optional[str], default=None): The schema to add it to. Defaults to `table.schema`.
+        """
+        schema = self._schema_for(schema_name or table.schema)
+        if table.name in schema.tables:
+            self.remove_table(schema.name, table.name)
+        if table.schema != schema.name:
+            # Foreign keys are hashed relative to the table's schema, and renderings include it.
+            table.invalidate()
+        table.schema = schema.name
+        schema.tables[table.name] = table
+        self._changed(schema)
+        self._index_table(schema.name, table)
+
+    def remove_table(self, schema_name, table_name):
+        """
+        Removes a table from a schema.
+
+        Returns:
+            Table: The removed table.
+        """
+        table = self.schemas[schema_name].tables.pop(table_name)
+        self._changed(self.schemas[schema_name])
+        self._unindex_table(schema_name, table)
+        return table
+
+    def add_enum(self, enum, schema_name):
+        """
+        Adds an enumeration to a schema, creating the schema if needed.
+        """
+        schema = self._schema_for(schema_name)
+        schema.enums[enum.name] = enum
+        self._objects[f"{schema.name}.{enum.name}"] = enum
+        self._changed(schema)
+
+    def remove_enum(self, schema_name, enum_name):
+        """
+        Removes an enumeration from a schema.
+
+        Returns:
+            Enum: The removed enumeration.
+        """
+        self._objects.pop(f"{schema_name}.{enum_name}", None)
+        self._changed(self.schemas[schema_name])
+        return self.schemas[schema_name].enums.pop(enum_name)
+
+    def add_view(self, view, schema_name):
+        """
+        Adds a view to a schema, creating the schema if needed.
+        """
+        schema = self._schema_for(schema_name)
+        schema.views[view.name] = view
+        self._objects[f"{schema.name}.{view.name}"] = view
+        self._changed(schema)
+
+    def remove_view(self, schema_name, view_name):
+        """
+        Removes a view from a schema.
+
+        Returns:
+            View: The removed view.
+        """
+        self._objects.pop(f"{schema_name}.{view_name}", None)
+        self._changed(self.schemas[schema_name])
+        return self.schemas[schema_name].views.pop(view_name)
+
+    def _changed(self, schema):
+        schema._merkle = None
+        self._merkle = None
+
+    def _schema_for(self, schema_name):
+        schema = self.schemas.get(schema_name)
+        if schema is None:
+            schema = self.schemas[schema_name] = Schema(name=schema_name)
+        return schema
+
+    def _index_schema(self, schema):
+        for table in schema.tables.values():
+            self._index_table(schema.name, table)
+        for name, obj in (*schema.enums.items(), *schema.views.items()):
+            self._objects[f"{schema.name}.{name}"] = obj
+
+    def _index_table(self, schema_name, table):
+        table_name = f"{schema_name}.{table.name}"
+        self._objects[table_name] = table
+        for column in table.columns.values():
+            column_name = f"{table_name}.{column.name}"
+            self._objects[column_name] = column
+            for target in _foreign_key_targets(schema_name, column):
+                self._referrers.setdefault(target, {})[column_name] = column
+
+    def _unindex_table(self, schema_name, table):
+        table_name = f"{schema_name}.{table.name}"
+        self._objects.pop(table_name, None)
+        for column in table.columns.values():
+            column_name = f"{table_name}.{column.name}"
+            self._objects.pop(column_name, None)
+            for target in _foreign_key_targets(schema_name, column):
+                referrers = self._referrers.get(target)
+                if referrers is not None:
+                    referrers.pop(column_name, None)
+                    if not referrers:
+                        del self._referrers[target]
+
+def _foreign_key_targets(schema_name, column):
+    # Qualified names of the columns a column references.
+    for foreign_key in column.foreign_keys or ():
+        for table_name, column_name in zip(foreign_key.tables, foreign_key.columns):
+            target_schema, target_table = Database.foreign_key_target(schema_name, table_name)
+            yield f"{target_schema}.{target_table}.{column_name}"
+
+_data_types = {}
+
+def intern_data_type(dbml, sqlalchemy, sql, notes=None):
+    """
+    Returns the shared DataType with the given fields, creating it on first use.
+
+    A real schema has only a few dozen distinct types, so columns share a handful of instances
+    instead of each owning its own. The type strings are interned as well.
+
+    Args:
+        dbml: The data type in DBML format.
+        sqlalchemy: The data type in SQLAlchemy format.
+        sql: The data type in SQL format.
+        notes (Optional[str], default=None): Markdown notes about the data type.
+
+    Returns:
+        DataType: The shared DataType.
+    """
+    key = (dbml, sqlalchemy, sql, notes)
+    data_type = _data_types.get(key)
+    if data_type is None:
+        data_type = _data_types[key] = DataType(dbml=sys.intern(dbml), sqlalchemy=sys.intern(sqlalchemy), sql=sys.intern(sql), notes=notes)
+    return data_type
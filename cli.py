@@ -0,0 +1,493 @@
+"""
+Command line interface for Alkahest.
+
+    convert     Parse .dbml and .sql files and write them out in other formats.
+    watch       Convert, then keep the outputs in sync as the sources change.
+    reflect     Read the schema of a live database and write it out in other formats.
+    check       Compare the structure of two sets of sources, such as DBML docs and SQL migrations.
+    docs        Write Markdown documentation with a page per schema and table, rewriting only changed pages.
+
+Sources are files, glob patterns (** matches any number of directories) or directories, which are
+searched recursively. Outputs that are newer than their source are skipped unless --force is given.
+
+Usage:
+    python cli.py convert schemas/ "services/**/*.dbml" --to sql sqlalchemy --output-dir out --jobs 8
+    python cli.py watch schemas/ --to sql --output-dir out
+    python cli.py reflect sqlite:///app.db --to dbml --output-dir docs --name app
+    python cli.py check docs/ --against migrations/
+    python cli.py docs schemas/ --output-dir docs/schema --jobs 8
+"""
+import argparse
+import glob
+import itertools
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from classes import Database
+from parse import dbml_lark, sql_sqlparse
+from profiling import Profile
+from translator import Translator
+
+SOURCE_SUFFIXES = (".dbml", ".sql")
+OUTPUT_SUFFIXES = {"dbml": ".dbml", "sql": ".sql", "sqlalchemy": ".py"}
+
+class ConversionError(Exception):
+    """
+    Raised when a source file cannot be converted, with the message of the underlying error.
+
+    Parser exceptions hold references that cannot be pickled back from a worker process, so workers
+    report failures as this instead.
+    """
+
+def find_sources(patterns):
+    """
+    Expands files, glob patterns and directories into the .dbml and .sql files they name.
+
+    Args:
+        patterns (List[str]): The files, glob patterns and directories.
+
+    Returns:
+        List[Tuple[str, str]]: The path of each source file and its path relative to the directory it
+        was found in, or to the directory a glob pattern starts matching in, without duplicates.
+    """
+    sources = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith(SOURCE_SUFFIXES):
+                        path = os.path.normpath(os.path.join(dirpath, filename))
+                        sources.setdefault(path, os.path.relpath(path, pattern))
+        else:
+            base = _glob_base(pattern)
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path) and path.endswith(SOURCE_SUFFIXES):
+                    sources.setdefault(os.path.normpath(path), os.path.relpath(path, base))
+    return list(sources.items())
+
+def _glob_base(pattern):
+    # The deepest directory of a pattern that holds no wildcards.
+    directory = os.path.dirname(pattern)
+    while glob.has_magic(directory):
+        directory = os.path.dirname(directory)
+    return directory or os.curdir
+
+def output_path(source, relative, output_format, output_dir=None):
+    """
+    Returns the path an output format of a source file is written to.
+
+    Args:
+        source (str): The path of the source file.
+        relative (str): The path of the source file relative to where it was found.
+        output_format (str): The output format.
+        output_dir (str, optional): The directory to write outputs to. Defaults to next to the source.
+
+    Returns:
+        str: The output path.
+    """
+    suffix = OUTPUT_SUFFIXES.get(output_format, f".{output_format}")
+    if output_dir is None:
+        return os.path.splitext(source)[0] + suffix
+    return os.path.join(output_dir, os.path.splitext(relative)[0] + suffix)
+
+def is_up_to_date(source, output):
+    """
+    Returns whether an output file exists and is at least as new as its source.
+    """
+    try:
+        return os.path.getmtime(output) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+def plan_conversions(sources, output_formats, output_dir=None, force=False):
+    """
+    Works out which outputs of which source files need to be written.
+
+    An output that would overwrite one of the source files, such as users.sql converted from a
+    users.dbml next to it, is never written.
+
+    Args:
+        sources (List[Tuple[str, str]]): The source files, as returned by `find_sources`.
+        output_formats (List[str]): The output formats.
+        output_dir (str, optional): The directory to write outputs to. Defaults to next to each source.
+        force (bool, optional): Whether to rewrite outputs that are up to date. Defaults to False.
+
+    Returns:
+        Tuple[List[Tuple[str, Dict[str, str]]], int]: Each source with stale outputs and the paths of
+        those outputs by format, and the number of outputs skipped as up to date.
+
+    Raises:
+        ValueError: If two source files would be written to the same output, such as users.sql and
+            users.dbml both converted to users.py.
+    """
+    source_paths = {os.path.abspath(source) for source, _ in sources}
+    writers = {}
+    conversions = []
+    skipped = 0
+    for source, relative in sources:
+        outputs = {}
+        for output_format in output_formats:
+            path = output_path(source, relative, output_format, output_dir)
+            absolute = os.path.abspath(path)
+            if absolute in source_paths:
+                continue
+            other = writers.setdefault(absolute, source)
+            if other != source:
+                raise ValueError(f"{other} and {source} would both be written to {path}")
+            if not force and is_up_to_date(source, path):
+                skipped += 1
+            else:
+                outputs[output_format] = path
+        if outputs:
+            conversions.append((source, outputs))
+    return conversions, skipped
+
+def load_source(path, default_schema="public"):
+    """
+    Parses a .dbml or .sql file into a Database.
+
+    Args:
+        path (str): The path of the source file.
+        default_schema (str, optional): The schema for unqualified SQL objects. Defaults to "public".
+
+    Returns:
+        Database: The parsed database.
+    """
+    if path.endswith(".sql"):
+        return sql_sqlparse.parse_sql_stream(path, default_schema=default_schema)
+    with open(path, encoding="utf-8") as f:
+        return dbml_lark.load_dbml(f.read())
+
+def load_sources(patterns, default_schema="public"):
+    """
+    Parses the .dbml and .sql files named by files, glob patterns and directories into one Database.
+
+    Args:
+        patterns (List[str]): The files, glob patterns and directories.
+        default_schema (str, optional): The schema for unqualified SQL objects. Defaults to "public".
+
+    Returns:
+        Database: The objects of all the files. Later files replace objects of the same name.
+    """
+    database = Database()
+    for path, _ in find_sources(patterns):
+        for schema in load_source(path, default_schema).schemas.values():
+            for table in list(schema.tables.values()):
+                database.add_table(table, schema.name)
+            for enum in schema.enums.values():
+                database.add_enum(enum, schema.name)
+            for view in schema.views.values():
+                database.add_view(view, schema.name)
+    return database
+
+def write_outputs(database, outputs, cache=None):
+    """
+    Writes a Database in each output format.
+
+    Each output is written to a uniquely named temporary file next to it and moved into place, so an
+    interrupted run never leaves a partial output that looks up to date.
+
+    Args:
+        database (Database): The database to write.
+        outputs (Dict[str, str]): The output paths by output format.
+        cache (RenderCache, optional): A cache of rendered fragments to reuse. Defaults to None.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    translator = Translator(database, cache=cache)
+    written = 0
+    for output_format, path in outputs.items():
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+            try:
+                translator.write(output_format, f)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        try:
+            os.replace(f.name, path)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+        written += os.path.getsize(path)
+    return written
+
+def convert_file(source, outputs, default_schema="public"):
+    """
+    Parses a source file once and writes each of its outputs.
+
+    Args:
+        source (str): The path of the source file.
+        outputs (Dict[str, str]): The output paths by output format.
+        default_schema (str, optional): The schema for unqualified SQL objects. Defaults to "public".
+
+    Returns:
+        Tuple[int, int]: The number of bytes read and written.
+    """
+    written = write_outputs(load_source(source, default_schema), outputs)
+    return os.path.getsize(source), written
+
+def _convert_file(source, outputs, default_schema, trace_memory=None):
+    # Returns the result of convert_file and, unless trace_memory is None, the phases it profiled.
+    try:
+        if trace_memory is None:
+            return convert_file(source, outputs, default_schema), None
+        with Profile(trace_memory=trace_memory) as profile:
+            result = convert_file(source, outputs, default_schema)
+        return result, profile.phases
+    except Exception as e:
+        raise ConversionError(f"{type(e).__name__}: {e}") from None
+
+def run_conversions(conversions, jobs=1, default_schema="public", max_in_flight=None, profile=None):
+    """
+    Converts source files, in a pool of worker processes when `jobs` is more than one.
+
+    At most `max_in_flight` files are submitted to the pool at a time, so the work queued in the
+    pool and the results waiting to be collected stay bounded however many files there are.
+
+    Args:
+        conversions (Iterable[Tuple[str, Dict[str, str]]]): The sources and their outputs.
+        jobs (int, optional): The number of worker processes. Defaults to 1.
+        default_schema (str, optional): The schema for unqualified SQL objects. Defaults to "public".
+        max_in_flight (int, optional): The maximum number of submitted files. Defaults to twice `jobs`.
+        profile (Profile, optional): Collects the phases of every conversion, including those run in
+            worker processes. Defaults to None.
+
+    Yields:
+        Tuple[str, Union[Tuple[int, int], ConversionError]]: Each source and the result of
+        `convert_file`, or the error it failed with, in order of completion. Failures of the pool
+        itself, such as a worker process dying, are reported as a ConversionError as well. A broken
+        pool cannot run anything more, so every file not converted by then is reported as failed.
+    """
+    trace_memory = None if profile is None else profile.trace_memory
+    if jobs == 1:
+        for source, outputs in conversions:
+            try:
+                result, phases = _convert_file(source, outputs, default_schema, trace_memory)
+            except ConversionError as e:
+                yield source, e
+                continue
+            if phases is not None:
+                profile.merge(phases)
+            yield source, result
+        return
+    pending = iter(conversions)
+    in_flight = {}
+    broken = None
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        while True:
+            for source, outputs in itertools.islice(pending, 0 if broken else (max_in_flight or jobs * 2) - len(in_flight)):
+                try:
+                    in_flight[executor.submit(_convert_file, source, outputs, default_schema, trace_memory)] = source
+                except BrokenProcessPool as e:
+                    broken = ConversionError(f"{type(e).__name__}: {e}")
+                    yield source, broken
+                    break
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = in_flight.pop(future)
+                try:
+                    result, phases = future.result()
+                except Exception as e:
+                    error = e if isinstance(e, ConversionError) else ConversionError(f"{type(e).__name__}: {e}")
+                    if isinstance(e, BrokenProcessPool):
+                        broken = error
+                    yield source, error
+                    continue
+                if phases is not None:
+                    profile.merge(phases)
+                yield source, result
+    if broken is not None:
+        for source, outputs in pending:
+            yield source, broken
+
+def convert(args):
+    """
+    Runs the convert command and prints a throughput summary.
+
+    Returns:
+        int: The exit status, 1 if any file failed to convert.
+    """
+    sources = find_sources(args.sources)
+    if not sources:
+        print("No .dbml or .sql files found.", file=sys.stderr)
+        return 1
+    try:
+        conversions, skipped = plan_conversions(sources, args.to, args.output_dir, args.force)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.jobs > 1 and any(source.endswith(".dbml") for source, _ in conversions):
+        # Build the parser before forking, so the workers inherit it instead of each loading the grammar.
+        dbml_lark.get_parser(inline=True)
+
+    profile = Profile(trace_memory=args.profile_memory) if args.profile or args.profile_memory else None
+    start = time.perf_counter()
+    converted = failed = written = read = 0
+    for source, result in run_conversions(conversions, args.jobs, args.default_schema, profile=profile):
+        if isinstance(result, ConversionError):
+            failed += 1
+            print(f"{source}: {result}", file=sys.stderr)
+        else:
+            converted += 1
+            read += result[0]
+            written += result[1]
+            if args.verbose:
+                print(source)
+    elapsed = time.perf_counter() - start
+
+    outputs = sum(len(outputs) for source, outputs in conversions)
+    print(f"{converted} files converted, {failed} failed, {skipped} outputs up to date, {outputs} outputs planned")
+    if converted:
+        print(f"{elapsed:.2f} s, {converted / elapsed:.1f} files/s, {read / 2 ** 20 / elapsed:.2f} MiB/s read, {written / 2 ** 20:.2f} MiB written")
+    if profile is not None:
+        print()
+        print(profile.report())
+    return 1 if failed else 0
+
+def watch(args):
+    """
+    Runs the watch command until interrupted, printing what each synchronisation did.
+
+    Returns:
+        int: The exit status.
+    """
+    from watch import Watcher
+
+    def report(result):
+        for source, error in result.failed.items():
+            print(f"{source}: {type(error).__name__}: {error}", file=sys.stderr)
+        print(f"{len(result.changed)} changed, {len(result.removed)} removed, {len(result.failed)} failed, "
+              f"{len(result.written)} outputs written in {result.seconds * 1000:.1f} ms", flush=True)
+
+    watcher = Watcher(args.sources, args.to, args.output_dir, args.default_schema, args.interval, args.debounce)
+    try:
+        watcher.run(on_sync=report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def reflect(args):
+    """
+    Runs the reflect command and prints what was read.
+
+    Returns:
+        int: The exit status.
+    """
+    from reflection import reflect_database
+
+    start = time.perf_counter()
+    database = reflect_database(args.url, args.schemas, args.name, args.default_schema, args.workers)
+    outputs = {output_format: os.path.join(args.output_dir, args.name + OUTPUT_SUFFIXES[output_format]) for output_format in args.to}
+    write_outputs(database, outputs)
+    tables = sum(len(schema.tables) for schema in database.schemas.values())
+    print(f"{tables} tables in {len(database.schemas)} schemas reflected in {time.perf_counter() - start:.2f} s")
+    return 0
+
+def check(args):
+    """
+    Runs the check command and prints the objects that differ.
+
+    Returns:
+        int: The exit status, 1 if the sources differ.
+    """
+    from merkle import differences
+
+    found = differences(load_sources(args.sources, args.default_schema), load_sources(args.against, args.default_schema))
+    for difference in found:
+        marker = "+" if difference.old is None else "-" if difference.new is None else "~"
+        print(f"{marker} {difference.name}")
+    print(f"{len(found)} differences" if found else "In sync.")
+    return 1 if found else 0
+
+def docs(args):
+    """
+    Runs the docs command and prints how many pages were written.
+
+    Returns:
+        int: The exit status.
+    """
+    from markdown_docs import write_docs
+
+    result = write_docs(load_sources(args.sources, args.default_schema), args.output_dir, args.jobs)
+    if args.verbose:
+        for path in result.written:
+            print(f"wrote {path}")
+        for path in result.removed:
+            print(f"removed {path}")
+    print(f"{result.pages} pages, {len(result.written)} written, {len(result.removed)} removed in {result.seconds:.2f} s")
+    return 0
+
+def _jobs(value):
+    # The argparse type of --jobs.
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {jobs}")
+    return jobs
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog="alkahest", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser("convert", help="Convert .dbml and .sql files to other formats.")
+    convert_parser.add_argument("sources", nargs="+", help="Files, glob patterns or directories.")
+    convert_parser.add_argument("--to", nargs="+", required=True, choices=list(OUTPUT_SUFFIXES), help="The output formats.")
+    convert_parser.add_argument("--output-dir", help="Write outputs here instead of next to each source.")
+    convert_parser.add_argument("--jobs", "-j", type=_jobs, default=os.cpu_count() or 1, help="The number of worker processes.")
+    convert_parser.add_argument("--force", action="store_true", help="Rewrite outputs that are up to date.")
+    convert_parser.add_argument("--default-schema", default="public", help="The schema for unqualified SQL objects.")
+    convert_parser.add_argument("--verbose", "-v", action="store_true", help="Print each converted file.")
+    convert_parser.add_argument("--profile", action="store_true", help="Print the time spent in each phase.")
+    convert_parser.add_argument("--profile-memory", action="store_true", help="Like --profile, with tracemalloc peaks (slow).")
+    convert_parser.set_defaults(run=convert)
+
+    watch_parser = commands.add_parser("watch", help="Keep outputs in sync with .dbml and .sql files as they change.")
+    watch_parser.add_argument("sources", nargs="+", help="Files, glob patterns or directories.")
+    watch_parser.add_argument("--to", nargs="+", required=True, choices=list(OUTPUT_SUFFIXES), help="The output formats.")
+    watch_parser.add_argument("--output-dir", help="Write outputs here instead of next to each source.")
+    watch_parser.add_argument("--default-schema", default="public", help="The schema for unqualified SQL objects.")
+    watch_parser.add_argument("--interval", type=float, default=0.5, help="Seconds between polls of the sources.")
+    watch_parser.add_argument("--debounce", type=float, default=0.1, help="Seconds the sources have to be unchanged before syncing.")
+    watch_parser.set_defaults(run=watch)
+
+    reflect_parser = commands.add_parser("reflect", help="Write the schema of a live database in other formats.")
+    reflect_parser.add_argument("url", help="The SQLAlchemy connection URL, such as sqlite:///app.db.")
+    reflect_parser.add_argument("--to", nargs="+", required=True, choices=list(OUTPUT_SUFFIXES), help="The output formats.")
+    reflect_parser.add_argument("--output-dir", default=".", help="The directory to write the outputs to.")
+    reflect_parser.add_argument("--name", default="database", help="The database name, also used for the output file names.")
+    reflect_parser.add_argument("--schemas", nargs="+", help="The schemas to read. Defaults to all but the system schemas.")
+    reflect_parser.add_argument("--default-schema", default="public", help="The name for the connection's default schema.")
+    reflect_parser.add_argument("--workers", type=int, default=4, help="The number of schemas to read concurrently.")
+    reflect_parser.set_defaults(run=reflect)
+
+    check_parser = commands.add_parser("check", help="Compare the structure of two sets of .dbml and .sql files.")
+    check_parser.add_argument("sources", nargs="+", help="Files, glob patterns or directories.")
+    check_parser.add_argument("--against", nargs="+", required=True, help="The files, glob patterns or directories to compare with.")
+    check_parser.add_argument("--default-schema", default="public", help="The schema for unqualified SQL objects.")
+    check_parser.set_defaults(run=check)
+
+    docs_parser = commands.add_parser("docs", help="Write Markdown documentation for .dbml and .sql files.")
+    docs_parser.add_argument("sources", nargs="+", help="Files, glob patterns or directories.")
+    docs_parser.add_argument("--output-dir", required=True, help="The documentation root.")
+    docs_parser.add_argument("--jobs", "-j", type=_jobs, default=os.cpu_count() or 1, help="The number of worker processes.")
+    docs_parser.add_argument("--default-schema", default="public", help="The schema for unqualified SQL objects.")
+    docs_parser.add_argument("--verbose", "-v", action="store_true", help="Print each written and removed page.")
+    docs_parser.set_defaults(run=docs)
+
+    args = arg_parser.parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
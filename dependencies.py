@@ -0,0 +1,210 @@
+import dataclasses
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
+from classes import Database, ForeignKey, Table, Enum, View
+
+# Identifiers and schema-qualified identifiers mentioned in a view's query.
+_VIEW_NAMES = re.compile(r'"?([A-Za-z_][A-Za-z0-9_$]*)"?(?:\s*\.\s*"?([A-Za-z_][A-Za-z0-9_$]*)"?)?')
+
+@dataclass(slots=True)
+class DeferredForeignKey:
+    """
+    A foreign key left out of its table's CREATE TABLE because it closes a cycle of references.
+
+    Attributes:
+        schema: The name of the schema of the referencing table.
+        table: The name of the referencing table.
+        column: The name of the referencing column.
+        target_table: The referenced table, as named in the foreign key.
+        target_column: The name of the referenced column.
+        target_schema: The name of the schema the referenced table was resolved to by
+            `Database.foreign_key_target`.
+    """
+    schema: str
+    table: str
+    column: str
+    target_table: str
+    target_column: str
+    target_schema: str
+
+@dataclass(slots=True)
+class CreationPlan:
+    """
+    The enums, tables and views of a database in an order they can be created in.
+
+    Every object depends only on objects in earlier waves, so the objects of one wave can be created in
+    any order, or in parallel over several connections. Tables with deferred foreign keys appear as
+    copies without them. Translate a CreationPlan with `Translator(plan).to_sql()` to get the script.
+
+    Attributes:
+        waves: Lists of (schema name, object) pairs, in creation order.
+        deferred: The foreign keys to add once all tables exist.
+    """
+    waves: List[List[Tuple[str, object]]] = field(default_factory=list)
+    deferred: List[DeferredForeignKey] = field(default_factory=list)
+
+    def __iter__(self):
+        for wave in self.waves:
+            yield from wave
+
+    def steps(self):
+        """
+        Splits the plan into one plan per wave, followed by one holding the deferred foreign keys.
+
+        Returns:
+            List[CreationPlan]: The steps, each of which can be applied as one script.
+        """
+        steps = [CreationPlan(waves=[wave]) for wave in self.waves]
+        if self.deferred:
+            steps.append(CreationPlan(deferred=self.deferred))
+        return steps
+
+def _schemas(obj):
+    if isinstance(obj, Database):
+        return obj.schemas.items()
+    return [(obj.name, obj)]
+
+def _resolve(nodes, name, schema_name, default_schema):
+    # The node an object name refers to. Like PostgreSQL's search path, an unqualified name is looked
+    # up in the default schema first, then in the schema of the object naming it.
+    if "." in name:
+        return name
+    qualified = f"{default_schema}.{name}"
+    return qualified if qualified in nodes else f"{schema_name}.{name}"
+
+def _nodes(obj):
+    nodes = {}
+    for schema_name, schema in _schemas(obj):
+        for kind in (schema.enums, schema.tables, schema.views):
+            for name, item in kind.items():
+                nodes[f"{schema_name}.{name}"] = (schema_name, item)
+    return nodes
+
+def _view_targets(nodes, node, schema_name, view, default_schema):
+    # The qualified names of the enums, tables and views a view's query names, other than itself.
+    mentioned = {_resolve(nodes, f"{first}.{second}" if second else first, schema_name, default_schema) for first, second in _VIEW_NAMES.findall(view.sql)}
+    return [target for target in mentioned if target in nodes and target != node]
+
+def view_references(obj, default_schema="public"):
+    """
+    Finds the enums, tables and views each view of a Database or Schema reads.
+
+    Names are resolved as in `plan_creation`.
+
+    Args:
+        obj (Union[Database, Schema]): The database or schema.
+        default_schema (str, optional): The schema unqualified names refer to first. Defaults to "public".
+
+    Returns:
+        Dict[str, List[str]]: The qualified names of the objects each view reads, by qualified view name.
+    """
+    nodes = _nodes(obj)
+    return {node: _view_targets(nodes, node, schema_name, item, default_schema) for node, (schema_name, item) in nodes.items() if isinstance(item, View)}
+
+def plan_creation(obj, default_schema="public"):
+    """
+    Orders the enums, tables and views of a Database or Schema by their dependencies.
+
+    A table depends on the tables its foreign keys reference and the enums its columns use, and a
+    view on the tables and views its query names. The dependency graph is walked once depth first to
+    find the foreign keys that close cycles, which are deferred, and the remaining acyclic graph is
+    then layered into waves, so the whole plan takes time linear in the number of objects and
+    dependencies. A table referencing itself needs no deferral. Foreign keys are resolved with
+    `Database.foreign_key_target`. Unqualified names of enums, and of the tables and views a view
+    reads, are looked up in `default_schema` before the schema of the object naming them.
+
+    Args:
+        obj (Union[Database, Schema]): The database or schema.
+        default_schema (str, optional): The schema unqualified names refer to first. Defaults to "public".
+
+    Returns:
+        CreationPlan: The plan.
+    """
+    nodes = _nodes(obj)
+
+    # Each edge is (dependency, column name, referenced table, referenced column), the last three
+    # only for foreign keys, which are the only edges that can be deferred.
+    edges = {}
+    for node, (schema_name, item) in nodes.items():
+        node_edges = edges[node] = []
+        if isinstance(item, Table):
+            for column in item.columns.values():
+                type_name = _resolve(nodes, column.data_type.sql.replace('"', "").removesuffix("[]"), schema_name, default_schema)
+                if type_name in nodes and isinstance(nodes[type_name][1], Enum):
+                    node_edges.append((type_name, None, None, None))
+                for foreign_key in column.foreign_keys or ():
+                    for table_name, column_name in zip(foreign_key.tables, foreign_key.columns):
+                        target = "%s.%s" % Database.foreign_key_target(schema_name, table_name)
+                        if target in nodes and target != node:
+                            node_edges.append((target, column.name, table_name, column_name))
+        elif isinstance(item, View):
+            node_edges.extend((target, None, None, None) for target in _view_targets(nodes, node, schema_name, item, default_schema))
+
+    cyclic = _back_edges(nodes, edges)
+    dependents = {node: [] for node in nodes}
+    waiting = dict.fromkeys(nodes, 0)
+    deferred = {}
+    for node, node_edges in edges.items():
+        for i, (target, column_name, table_name, target_column) in enumerate(node_edges):
+            if (node, i) in cyclic:
+                if column_name is not None:
+                    schema_name, table = nodes[node]
+                    deferred.setdefault(node, []).append(DeferredForeignKey(schema_name, table.name, column_name, table_name, target_column, nodes[target][0]))
+                continue
+            dependents[target].append(node)
+            waiting[node] += 1
+
+    plan = CreationPlan()
+    wave = [node for node, count in waiting.items() if count == 0]
+    while wave:
+        plan.waves.append([(nodes[node][0], _without_deferred(nodes[node][1], deferred[node])) if node in deferred else nodes[node] for node in wave])
+        next_wave = []
+        for node in wave:
+            for dependent in dependents[node]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    next_wave.append(dependent)
+        wave = next_wave
+    plan.deferred = [foreign_key for foreign_keys in deferred.values() for foreign_key in foreign_keys]
+    return plan
+
+def _back_edges(nodes, edges):
+    # The (node, edge index) pairs of the edges that point back into the current depth-first path.
+    # Removing them leaves the graph acyclic.
+    state = dict.fromkeys(nodes, 0)  # 0: unvisited, 1: on the current path, 2: finished
+    back = set()
+    for root in nodes:
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, 0)]
+        while stack:
+            node, i = stack[-1]
+            if i == len(edges[node]):
+                state[node] = 2
+                stack.pop()
+                continue
+            stack[-1] = (node, i + 1)
+            target = edges[node][i][0]
+            if state[target] == 0:
+                state[target] = 1
+                stack.append((target, 0))
+            elif state[target] == 1:
+                back.add((node, i))
+    return back
+
+def _without_deferred(table, deferred):
+    # A copy of the table whose columns leave out the deferred foreign keys.
+    removed = {(fk.column, fk.target_table, fk.target_column) for fk in deferred}
+    columns = {}
+    for name, column in table.columns.items():
+        if any(key[0] == name for key in removed):
+            foreign_keys = []
+            for foreign_key in column.foreign_keys:
+                pairs = [pair for pair in zip(foreign_key.tables, foreign_key.columns) if (name, *pair) not in removed]
+                if pairs:
+                    foreign_keys.append(ForeignKey(tables=[pair[0] for pair in pairs], columns=[pair[1] for pair in pairs], notes=foreign_key.notes))
+            column = dataclasses.replace(column, foreign_keys=foreign_keys or None)
+        columns[name] = column
+    return dataclasses.replace(table, columns=columns)
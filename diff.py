@@ -0,0 +1,530 @@
+import dataclasses
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import List, Tuple
+from classes import Column, Database, Table, Schema, Enum, View
+from dependencies import plan_creation, view_references
+from render_cache import fingerprint
+from translator import Translator
+
+@dataclass(slots=True)
+class CreateSchema:
+    """
+    A schema present only in the new database.
+
+    Attributes:
+        schema: The name of the schema.
+    """
+    schema: str
+
+@dataclass(slots=True)
+class DropSchema:
+    """
+    A schema present only in the old database.
+
+    Attributes:
+        schema: The name of the schema.
+    """
+    schema: str
+
+@dataclass(slots=True)
+class CreateTable:
+    """
+    A table present only in the new database.
+
+    Attributes:
+        schema: The name of the schema.
+        table: The new table.
+    """
+    schema: str
+    table: Table
+
+@dataclass(slots=True)
+class DropTable:
+    """
+    A table present only in the old database.
+
+    Attributes:
+        schema: The name of the schema.
+        table: The old table.
+    """
+    schema: str
+    table: Table
+
+@dataclass(slots=True)
+class AddColumn:
+    """
+    A column present only in the new version of a table.
+
+    Attributes:
+        schema: The name of the schema.
+        table: The name of the table.
+        column: The new column.
+    """
+    schema: str
+    table: str
+    column: Column
+
+@dataclass(slots=True)
+class DropColumn:
+    """
+    A column present only in the old version of a table.
+
+    Attributes:
+        schema: The name of the schema.
+        table: The name of the table.
+        column: The old column.
+    """
+    schema: str
+    table: str
+    column: Column
+
+@dataclass(slots=True)
+class AlterColumn:
+    """
+    A column whose definition differs between the old and new versions of a table.
+
+    Attributes:
+        schema: The name of the schema.
+        table: The name of the table.
+        old: The old column.
+        new: The new column.
+    """
+    schema: str
+    table: str
+    old: Column
+    new: Column
+
+@dataclass(slots=True)
+class CreateEnum:
+    """
+    An enumeration present only in the new database.
+
+    Attributes:
+        schema: The name of the schema.
+        enum: The new enumeration.
+    """
+    schema: str
+    enum: Enum
+
+@dataclass(slots=True)
+class DropEnum:
+    """
+    An enumeration present only in the old database, or the renamed old version of a replaced one.
+
+    Attributes:
+        schema: The name of the schema.
+        enum: The old enumeration.
+    """
+    schema: str
+    enum: Enum
+
+@dataclass(slots=True)
+class AddEnumValues:
+    """
+    An enumeration whose new version only appends values to the old one.
+
+    Attributes:
+        schema: The name of the schema.
+        enum: The name of the enumeration.
+        values: The appended values.
+    """
+    schema: str
+    enum: str
+    values: List[str]
+
+@dataclass(slots=True)
+class ReplaceEnum:
+    """
+    An enumeration whose values were reordered or removed, which cannot be altered in place.
+
+    The old type is renamed to `old.name`, the new one is created under its name, and the existing
+    columns using it are converted through text. The renamed old type is dropped by a DropEnum with
+    the other drops, once no column uses it.
+
+    Attributes:
+        schema: The name of the schema.
+        old: The old enumeration, renamed.
+        new: The new enumeration.
+        columns: The schema and table names and new versions of the existing columns using it.
+    """
+    schema: str
+    old: Enum
+    new: Enum
+    columns: List[Tuple[str, str, Column]] = field(default_factory=list)
+
+@dataclass(slots=True)
+class CreateView:
+    """
+    A view present only in the new database, or one recreated after it or what it reads changed.
+
+    Attributes:
+        schema: The name of the schema.
+        view: The new view.
+        replace: Whether the view already exists and is being replaced.
+    """
+    schema: str
+    view: View
+    replace: bool = False
+
+@dataclass(slots=True)
+class DropView:
+    """
+    A view present only in the old database, or one dropped until it or what it reads has changed.
+
+    Attributes:
+        schema: The name of the schema.
+        view: The old view.
+    """
+    schema: str
+    view: View
+
+@dataclass(slots=True)
+class ChangeSet:
+    """
+    The changes that turn one Database into another, in the order they are to be applied.
+
+    Dropped and changed views, and the views reading a table, enum or view that is altered, replaced
+    or dropped, are dropped first, each before the views it reads, and recreated last from their new
+    versions, each after the views it reads. Replaced enums come next, so that created tables and
+    columns use the new types. Created tables come after the tables they reference, and foreign keys
+    closing a reference cycle among them are added by AlterColumn changes afterwards. Drops come after
+    creates and alters so that data can still be migrated between them, and dropped tables come before
+    the tables they reference. Translate a ChangeSet with `Translator(change_set).to_sql()` to get the
+    migration script.
+
+    The script is a starting point to review, not one guaranteed to apply: a renamed table or column
+    shows up as a drop and a create, losing its data, a type change relies on PostgreSQL's implicit
+    cast, and removed constraints are only listed in comments, since their names are not recorded.
+
+    Attributes:
+        changes: The changes, in application order.
+    """
+    changes: list = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+# The column fields that affect its DDL; notes are documentation only.
+_column_definition = attrgetter("data_type.sql", "nullable", "primary_key", "default_value", "unique", "check", "exclude")
+
+def _foreign_key_targets(column):
+    return [(table, name) for fk in column.foreign_keys or () for table, name in zip(fk.tables, fk.columns)]
+
+def _same_column(old, new):
+    return _column_definition(old) == _column_definition(new) and _foreign_key_targets(old) == _foreign_key_targets(new)
+
+def _type_name(schema_name, column):
+    # The qualified name of the type a column uses, or of its element type for an array.
+    name = column.data_type.sql.replace('"', "").removesuffix("[]")
+    return name if "." in name else f"{schema_name}.{name}"
+
+def diff_databases(old, new):
+    """
+    Computes the changes that turn one Database into another.
+
+    Objects are matched by qualified name, and matched tables are only compared column by column when
+    their content fingerprints differ, so the cost is linear in the size of the two databases. The
+    fingerprints cover every field `_same_column` compares.
+
+    Args:
+        old (Database): The current database.
+        new (Database): The desired database.
+
+    Returns:
+        ChangeSet: The ordered changes.
+    """
+    drop_views, replaces, creates, alters, drops, drop_schemas, create_views = [], [], [], [], [], [], []
+    replaced = {}
+    for schema_name in {**old.schemas, **new.schemas}:
+        old_schema = old.schemas.get(schema_name) or Schema(name=schema_name)
+        new_schema = new.schemas.get(schema_name)
+        if new_schema is None:
+            drop_schemas.append(DropSchema(schema_name))
+            new_schema = Schema(name=schema_name)
+        elif schema_name not in old.schemas:
+            creates.append(CreateSchema(schema_name))
+
+        for name, view in old_schema.views.items():
+            new_view = new_schema.views.get(name)
+            if new_view is None or view.sql != new_view.sql:
+                drop_views.append(DropView(schema_name, view))
+            if new_view is not None and view.sql != new_view.sql:
+                create_views.append(CreateView(schema_name, new_view))
+        for name, view in new_schema.views.items():
+            if name not in old_schema.views:
+                create_views.append(CreateView(schema_name, view))
+
+        for name, enum in new_schema.enums.items():
+            old_enum = old_schema.enums.get(name)
+            if old_enum is None:
+                creates.append(CreateEnum(schema_name, enum))
+            elif list(old_enum.values) != list(enum.values):
+                if list(enum.values[:len(old_enum.values)]) == list(old_enum.values):
+                    alters.append(AddEnumValues(schema_name, name, list(enum.values[len(old_enum.values):])))
+                else:
+                    renamed = dataclasses.replace(old_enum, name=f"{name}_old")
+                    replaced[f"{schema_name}.{name}"] = change = ReplaceEnum(schema_name, renamed, enum)
+                    replaces.append(change)
+                    drops.append(DropEnum(schema_name, renamed))
+        for name, enum in old_schema.enums.items():
+            if name not in new_schema.enums:
+                drops.append(DropEnum(schema_name, enum))
+
+        for name, table in new_schema.tables.items():
+            old_table = old_schema.tables.get(name)
+            if old_table is None:
+                creates.append(CreateTable(schema_name, table))
+            elif fingerprint(old_table) != fingerprint(table):
+                alters.extend(_diff_columns(schema_name, old_table, table))
+        for name, table in old_schema.tables.items():
+            if name not in new_schema.tables:
+                drops.append(DropTable(schema_name, table))
+    if replaced:
+        _find_enum_columns(old, new, replaced)
+    changed = {f"{change.schema}.{change.view.name}" for change in drop_views}
+    for change in alters + drops + replaces:
+        if isinstance(change, (AlterColumn, DropColumn)):
+            changed.add(f"{change.schema}.{change.table}")
+        elif isinstance(change, DropTable):
+            changed.add(f"{change.schema}.{change.table.name}")
+        elif isinstance(change, DropEnum):
+            changed.add(f"{change.schema}.{change.enum.name}")
+        elif isinstance(change, ReplaceEnum):
+            changed.add(f"{change.schema}.{change.new.name}")
+            changed.update(f"{schema_name}.{table_name}" for schema_name, table_name, _ in change.columns)
+    if changed and any(schema.views for schema in old.schemas.values()):
+        _drop_dependent_views(old, new, changed, drop_views, create_views)
+    _order_views(old, new, drop_views, create_views)
+    alters[:0] = _order_creates(new, creates)
+    _order_drops(old, drops)
+    return ChangeSet(drop_views + replaces + creates + alters + drops + drop_schemas + create_views)
+
+def _find_enum_columns(old, new, replaced):
+    """
+    Fills in the columns of existing tables that use a replaced enum in both databases.
+    """
+    for schema_name, schema in old.schemas.items():
+        new_schema = new.schemas.get(schema_name)
+        if new_schema is None:
+            continue
+        for table_name, table in schema.tables.items():
+            new_table = new_schema.tables.get(table_name)
+            if new_table is None:
+                continue
+            for column_name, column in table.columns.items():
+                change = replaced.get(_type_name(schema_name, column))
+                new_column = new_table.columns.get(column_name)
+                if change is not None and new_column is not None and _type_name(schema_name, new_column) == _type_name(schema_name, column):
+                    change.columns.append((schema_name, table_name, new_column))
+
+def _drop_dependent_views(old, new, changed, drop_views, create_views):
+    """
+    Drops and recreates the old views that read a changed object, directly or through other views,
+    adding each to `changed` in turn.
+    """
+    readers = {}
+    for view, targets in view_references(old).items():
+        for target in targets:
+            readers.setdefault(target, []).append(view)
+    pending = list(changed)
+    while pending:
+        for reader in readers.get(pending.pop(), ()):
+            if reader in changed:
+                continue
+            changed.add(reader)
+            pending.append(reader)
+            schema_name, _, name = reader.partition(".")
+            drop_views.append(DropView(schema_name, old.schemas[schema_name].views[name]))
+            new_schema = new.schemas.get(schema_name)
+            new_view = new_schema.views.get(name) if new_schema is not None else None
+            if new_view is not None:
+                create_views.append(CreateView(schema_name, new_view))
+
+def _order_views(old, new, drop_views, create_views):
+    """
+    Sorts dropped views so that each comes before the views it reads, and created views so that each
+    comes after them.
+    """
+    if len(drop_views) > 1:
+        position = {(schema_name, item.name): index for index, (schema_name, item) in enumerate(plan_creation(old))}
+        drop_views.sort(key=lambda change: -position[change.schema, change.view.name])
+    if len(create_views) > 1:
+        position = {(schema_name, item.name): index for index, (schema_name, item) in enumerate(plan_creation(new))}
+        create_views.sort(key=lambda change: position[change.schema, change.view.name])
+
+def _order_drops(old, drops):
+    """
+    Sorts dropped tables so that each comes before the tables it references, the reverse of the order
+    they would be created in, followed by the dropped enums, which they may use.
+    """
+    if sum(isinstance(change, DropTable) for change in drops) > 1:
+        position = {(schema_name, item.name): index for index, (schema_name, item) in enumerate(plan_creation(old))}
+        drops.sort(key=lambda change: (isinstance(change, DropEnum), 0 if isinstance(change, DropEnum) else -position[change.schema, change.table.name]))
+    else:
+        drops.sort(key=lambda change: isinstance(change, DropEnum))
+
+def _order_creates(new, creates):
+    """
+    Sorts created schemas, enums and tables so everything comes after what it depends on.
+
+    Created tables whose foreign keys close a cycle are created without them. Returns the AlterColumn
+    changes that add those foreign keys once the tables exist.
+    """
+    created = {(change.schema, change.table.name): change for change in creates if isinstance(change, CreateTable)}
+    if not created:
+        return []
+    plan = plan_creation(new)
+    position = {}
+    planned = {}
+    for index, (schema_name, item) in enumerate(plan):
+        position[schema_name, item.name] = index
+        planned[schema_name, item.name] = item
+    adds = {}
+    for foreign_key in plan.deferred:
+        change = created.get((foreign_key.schema, foreign_key.table))
+        if change is None or (foreign_key.schema, foreign_key.table, foreign_key.column) in adds:
+            continue
+        table = new.schemas[foreign_key.schema].tables[foreign_key.table]
+        copy = change.table = planned[foreign_key.schema, foreign_key.table]
+        column = foreign_key.column
+        adds[foreign_key.schema, foreign_key.table, column] = AlterColumn(foreign_key.schema, table.name, copy.columns[column], table.columns[column])
+
+    def key(change):
+        if isinstance(change, CreateSchema):
+            return 0, 0
+        if isinstance(change, CreateEnum):
+            return 1, 0
+        return 2, position[change.schema, change.table.name]
+    creates.sort(key=key)
+    return list(adds.values())
+
+def _diff_columns(schema_name, old_table, new_table):
+    changes = []
+    for name, column in new_table.columns.items():
+        old_column = old_table.columns.get(name)
+        if old_column is None:
+            changes.append(AddColumn(schema_name, new_table.name, column))
+        elif not _same_column(old_column, column):
+            changes.append(AlterColumn(schema_name, new_table.name, old_column, column))
+    for name, column in old_table.columns.items():
+        if name not in new_table.columns:
+            changes.append(DropColumn(schema_name, new_table.name, column))
+    return changes
+
+def _qualified(schema, name):
+    return f'"{schema}"."{name}"'
+
+def _references(schema_name, table_name, column_name):
+    # The target of a foreign key of a table in `schema_name`.
+    return f'{_qualified(*Database.foreign_key_target(schema_name, table_name))}("{column_name}")'
+
+@Translator.register("sql", ChangeSet)
+def _change_set_to_sql(translator, obj, fp):
+    translator.write_joined("sql", obj.changes, "\n", fp)
+
+@Translator.register("sql", CreateSchema)
+def _create_schema_to_sql(translator, obj, fp):
+    fp.write(f'CREATE SCHEMA "{obj.schema}";')
+
+@Translator.register("sql", DropSchema)
+def _drop_schema_to_sql(translator, obj, fp):
+    fp.write(f'DROP SCHEMA "{obj.schema}";')
+
+@Translator.register("sql", CreateTable)
+def _create_table_to_sql(translator, obj, fp):
+    table = obj.table if obj.table.schema == obj.schema else dataclasses.replace(obj.table, schema=obj.schema)
+    translator.write_node("sql", table, fp)
+
+@Translator.register("sql", DropTable)
+def _drop_table_to_sql(translator, obj, fp):
+    fp.write(f'DROP TABLE {_qualified(obj.schema, obj.table.name)};')
+
+@Translator.register("sql", AddColumn)
+def _add_column_to_sql(translator, obj, fp):
+    fp.write(f'ALTER TABLE {_qualified(obj.schema, obj.table)} ADD COLUMN ')
+    # A column on its own does not know its schema, so its foreign keys are resolved here.
+    translator.write_node("sql", dataclasses.replace(obj.column, foreign_keys=None), fp)
+    fp.write(''.join(f' REFERENCES {_references(obj.schema, table, name)}' for table, name in _foreign_key_targets(obj.column)))
+    fp.write(';')
+
+@Translator.register("sql", DropColumn)
+def _drop_column_to_sql(translator, obj, fp):
+    fp.write(f'ALTER TABLE {_qualified(obj.schema, obj.table)} DROP COLUMN "{obj.column.name}";')
+
+@Translator.register("sql", AlterColumn)
+def _alter_column_to_sql(translator, obj, fp):
+    old, new = obj.old, obj.new
+    column = f'"{new.name}"'
+    actions = []
+    if old.data_type.sql != new.data_type.sql:
+        actions.append(f'ALTER COLUMN {column} TYPE {new.data_type.sql}')
+    if old.nullable != new.nullable:
+        actions.append(f'ALTER COLUMN {column} {"DROP" if new.nullable else "SET"} NOT NULL')
+    if old.default_value != new.default_value:
+        actions.append(f'ALTER COLUMN {column} DROP DEFAULT' if new.default_value is None else f'ALTER COLUMN {column} SET DEFAULT {new.default_value}')
+    if new.unique and not old.unique:
+        actions.append(f'ADD UNIQUE ({column})')
+    if new.primary_key and not old.primary_key:
+        actions.append(f'ADD PRIMARY KEY ({column})')
+    if new.check and new.check != old.check:
+        actions.append(f'ADD CHECK ({new.check})')
+    old_targets = _foreign_key_targets(old)
+    for table, name in _foreign_key_targets(new):
+        if (table, name) not in old_targets:
+            actions.append(f'ADD FOREIGN KEY ({column}) REFERENCES {_references(obj.schema, table, name)}')
+    removed = []
+    if old.unique and not new.unique:
+        removed.append("UNIQUE")
+    if old.primary_key and not new.primary_key:
+        removed.append("PRIMARY KEY")
+    if old.check and old.check != new.check:
+        removed.append("CHECK")
+    new_targets = _foreign_key_targets(new)
+    if any(target not in new_targets for target in old_targets):
+        removed.append("FOREIGN KEY")
+    table = _qualified(obj.schema, obj.table)
+    lines = [f'ALTER TABLE {table} ' + ', '.join(actions) + ';'] if actions else []
+    # The model does not record constraint names, so dropping a constraint cannot be scripted.
+    lines.extend(f'-- Drop the {label} constraint on {table}.{column} by name.' for label in removed)
+    fp.write("\n".join(lines))
+
+@Translator.register("sql", CreateEnum)
+def _create_enum_to_sql(translator, obj, fp):
+    values_sql = ", ".join(f"'{value}'" for value in obj.enum.values)
+    fp.write(f'CREATE TYPE {_qualified(obj.schema, obj.enum.name)} AS ENUM ({values_sql});')
+
+@Translator.register("sql", DropEnum)
+def _drop_enum_to_sql(translator, obj, fp):
+    fp.write(f'DROP TYPE {_qualified(obj.schema, obj.enum.name)};')
+
+@Translator.register("sql", ReplaceEnum)
+def _replace_enum_to_sql(translator, obj, fp):
+    fp.write(f'ALTER TYPE {_qualified(obj.schema, obj.new.name)} RENAME TO "{obj.old.name}";\n')
+    translator.write_node("sql", CreateEnum(obj.schema, obj.new), fp)
+    for schema_name, table_name, column in obj.columns:
+        name = f'"{column.name}"'
+        data_type = column.data_type.sql
+        cast = "text[]" if data_type.endswith("[]") else "text"
+        actions = [f'ALTER COLUMN {name} TYPE {data_type} USING {name}::{cast}::{data_type}']
+        if column.default_value is not None:
+            # The old default has the old type, which cannot be converted along with the column.
+            actions = [f'ALTER COLUMN {name} DROP DEFAULT', *actions, f'ALTER COLUMN {name} SET DEFAULT {column.default_value}']
+        fp.write(f'\nALTER TABLE {_qualified(schema_name, table_name)} ' + ', '.join(actions) + ';')
+
+@Translator.register("sql", AddEnumValues)
+def _add_enum_values_to_sql(translator, obj, fp):
+    enum = _qualified(obj.schema, obj.enum)
+    fp.write("\n".join(f"ALTER TYPE {enum} ADD VALUE '{value}';" for value in obj.values))
+
+@Translator.register("sql", CreateView)
+def _create_view_to_sql(translator, obj, fp):
+    create = "CREATE OR REPLACE VIEW" if obj.replace else "CREATE VIEW"
+    fp.write(f'{create} {_qualified(obj.schema, obj.view.name)} AS {obj.view.sql.strip().rstrip(";")};')
+
+@Translator.register("sql", DropView)
+def _drop_view_to_sql(translator, obj, fp):
+    fp.write(f'DROP VIEW {_qualified(obj.schema, obj.view.name)};')
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+from translator import Translator, markdown_page
+
+# The file in the documentation root recording the content hash of every page written.
+MANIFEST = ".alkahest-docs.json"
+
+# Bump when pages change for the same database, so a regeneration rewrites every page.
+MANIFEST_VERSION = 1
+
+@dataclass(slots=True)
+class DocsResult:
+    """
+    What one run of `write_docs` did.
+
+    Attributes:
+        pages: The number of pages in the documentation.
+        written: The pages that were written because they are new or their content changed.
+        removed: The pages that were deleted because their table or schema no longer exists.
+        seconds: The wall time of the run.
+    """
+    pages: int = 0
+    written: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+# The state each worker renders its shards from, set by _start_worker. Forked workers inherit it
+# instead of receiving the database pickled.
+_database = None
+_manifest = None
+_output_dir = None
+
+def _start_worker(database, manifest, output_dir):
+    global _database, _manifest, _output_dir
+    _database, _manifest, _output_dir = database, manifest, output_dir
+
+def _write_page(path, text):
+    # Writes a page if its content hash differs from the manifest's, returning (path, hash, written).
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    full_path = os.path.join(_output_dir, path)
+    if _manifest.get(path) == digest and os.path.exists(full_path):
+        return path, digest, False
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    _replace(full_path, text)
+    return path, digest, True
+
+def _replace(path, text):
+    # Writes a uniquely named temporary file next to `path` and moves it into place, so concurrent
+    # writers never share a temporary file and an interrupted write leaves none behind.
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+        try:
+            f.write(text)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    try:
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+def _table_page(schema_name, table):
+    text = Translator(table).to_markdown()
+    referrers = sorted(_database.referencing_columns(f"{schema_name}.{table.name}"))
+    if referrers:
+        lines = []
+        for referrer in referrers:
+            referrer_schema, referrer_table, column = referrer.rsplit(".", 2)
+            lines.append(f"- [{referrer_schema}.{referrer_table}](../{markdown_page(referrer_schema, referrer_table)}) `{column}`")
+        text += "\n## Referenced by\n\n" + "\n".join(lines) + "\n"
+    return text
+
+def _render_shard(shard):
+    schema_name, table_names = shard
+    tables = _database.schemas[schema_name].tables
+    return [_write_page(markdown_page(schema_name, name), _table_page(schema_name, tables[name])) for name in table_names]
+
+def write_docs(database, output_dir, jobs=1, shard_size=500):
+    """
+    Writes Markdown documentation for a database: an index page, a page per schema and a page per table.
+
+    Table pages link to the pages of the tables their foreign keys reference, and list the columns
+    referencing them. Table pages are rendered in shards of `shard_size` tables, in parallel over
+    `jobs` worker processes. Each page's content hash is compared with the one recorded in the
+    manifest of the previous run, and only new or changed pages are written, so regenerating after a
+    small change rewrites only the pages it affects. Pages of removed tables and schemas are deleted.
+
+    Args:
+        database (Database): The database to document.
+        output_dir (str): The documentation root.
+        jobs (int, optional): The number of worker processes. Defaults to 1, to render in this process.
+        shard_size (int, optional): The number of tables rendered per task. Defaults to 500.
+
+    Returns:
+        DocsResult: What was written and removed.
+    """
+    start = time.perf_counter()
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("version") == MANIFEST_VERSION:
+            manifest = saved["pages"]
+
+    shards = []
+    for schema in database.schemas.values():
+        names = list(schema.tables)
+        shards.extend((schema.name, names[i:i + shard_size]) for i in range(0, len(names), shard_size))
+
+    _start_worker(database, manifest, output_dir)
+    try:
+        pages = [_write_page(markdown_page(), Translator(database).to_markdown())]
+        pages.extend(_write_page(markdown_page(schema.name), Translator(schema).to_markdown()) for schema in database.schemas.values())
+        if jobs > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_start_worker, initargs=(database, manifest, output_dir)) as executor:
+                for shard_pages in executor.map(_render_shard, shards):
+                    pages.extend(shard_pages)
+        else:
+            for shard in shards:
+                pages.extend(_render_shard(shard))
+    finally:
+        _start_worker(None, None, None)
+
+    result = DocsResult(pages=len(pages), written=[path for path, _, written in pages if written])
+    hashes = {path: digest for path, digest, _ in pages}
+    for path in manifest.keys() - hashes.keys():
+        try:
+            os.remove(os.path.join(output_dir, path))
+        except FileNotFoundError:
+            pass
+        result.removed.append(path)
+    for directory in {os.path.dirname(path) for path in result.removed} - {""}:
+        try:
+            os.rmdir(os.path.join(output_dir, directory))
+        except OSError:
+            pass
+    if result.written or result.removed or not manifest:
+        _replace(manifest_path, json.dumps({"version": MANIFEST_VERSION, "pages": hashes}))
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,251 @@
+import hashlib
+from collections import namedtuple
+from classes import Column, Database, Enum, Schema, Table
+
+# Tables, enums and views sharing a trie node beyond this many are split by their next name nibble.
+LEAF_SIZE = 16
+
+Difference = namedtuple("Difference", ["name", "old", "new"])
+Difference.__doc__ = """
+A structural difference between two models.
+
+Attributes:
+    name (str): The qualified name of the differing object, such as "schema.table.column".
+    old: The object in the old model, or None if it was added.
+    new: The object in the new model, or None if it was removed.
+"""
+
+class _Node:
+    # A node of the trie a schema's hash is built from. Leaves hold the (kind, name) -> digest items
+    # of at most LEAF_SIZE objects; inner nodes split them into up to 16 children by name hash.
+    __slots__ = ("digest", "items", "children")
+
+    def __init__(self, digest, items=None, children=None):
+        self.digest = digest
+        self.items = items
+        self.children = children
+
+def _digest(*fields):
+    return hashlib.blake2b(repr(fields).encode(), digest_size=16).digest()
+
+# Normalized type names by type as written. Keyed by the string, whose hash is cached, rather than
+# the DataType, whose dataclass hash is recomputed on every lookup.
+_type_names = {}
+
+def _type_name(data_type):
+    text = data_type.sql or data_type.dbml
+    name = _type_names.get(text)
+    if name is None:
+        name = _type_names[text] = " ".join(text.lower().split())
+    return name
+
+def _column_content(column, schema_name):
+    # The canonical content of a column. Foreign key targets are resolved relative to `schema_name`,
+    # and left unqualified if they are unqualified and the schema is not known.
+    targets = ()
+    if column.foreign_keys:
+        targets = tuple(sorted(
+            (".".join(filter(None, Database.foreign_key_target(schema_name, table_name))), column_name)
+            for foreign_key in column.foreign_keys
+            for table_name, column_name in zip(foreign_key.tables, foreign_key.columns)
+        ))
+    return (column.name, _type_name(column.data_type), column.nullable and not column.primary_key,
+            column.primary_key, column.default_value, column.unique, column.check, column.exclude, targets)
+
+def _column_key(column, schema_name):
+    # Columns are the leaves of the tree, so they cache their canonical content rather than a digest
+    # of it: comparing the tuples is as cheap as comparing digests, and skips hashing every column.
+    if column._merkle is None:
+        column._merkle = _column_content(column, schema_name)
+    return column._merkle
+
+def _table_hash(table, schema_name):
+    if table._merkle is None:
+        table._merkle = _digest(*(_column_key(column, schema_name) for column in table.columns.values()))
+    return table._merkle
+
+def _object_hash(kind, obj, schema_name):
+    if kind == "table":
+        return _table_hash(obj, schema_name)
+    elif kind == "enum":
+        return _digest(tuple(obj.values))
+    return _digest(" ".join((obj.sql or "").split()))
+
+def _empty(schema):
+    return not (schema.tables or schema.enums or schema.views)
+
+def _kinds(schema):
+    return (("table", schema.tables), ("enum", schema.enums), ("view", schema.views))
+
+def _schema_root(schema):
+    if schema._merkle is None:
+        items = []
+        for kind, objects in _kinds(schema):
+            for name, obj in objects.items():
+                key = (kind, name)
+                items.append((_key_digest(key), key, _object_hash(kind, obj, schema.name)))
+        schema._merkle = _build_node(items, 0)
+    return schema._merkle
+
+def _key_digest(key):
+    return hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+
+def _nibble(key_digest, depth):
+    return key_digest[depth // 2] >> 4 if depth % 2 == 0 else key_digest[depth // 2] & 15
+
+def _node_digest(node):
+    if node.items is not None:
+        return _digest(sorted(node.items.items()))
+    return _digest(sorted((nibble, child.digest) for nibble, child in node.children.items()))
+
+def _build_node(items, depth):
+    if len(items) <= LEAF_SIZE or depth == 16:
+        node = _Node(None, items={key: digest for _, key, digest in items})
+    else:
+        buckets = {}
+        for item in items:
+            buckets.setdefault(_nibble(item[0], depth), []).append(item)
+        node = _Node(None, children={nibble: _build_node(bucket, depth + 1) for nibble, bucket in buckets.items()})
+    node.digest = _node_digest(node)
+    return node
+
+def _update_path(root, key, digest):
+    # Replaces the digest of an existing object in a schema's trie and rehashes the nodes above it.
+    key_digest = _key_digest(key)
+    path = [root]
+    while path[-1].items is None:
+        node = path[-1].children.get(_nibble(key_digest, len(path) - 1))
+        if node is None:
+            return False
+        path.append(node)
+    if key not in path[-1].items:
+        return False
+    path[-1].items[key] = digest
+    for node in reversed(path):
+        node.digest = _node_digest(node)
+    return True
+
+def structural_hash(obj):
+    """
+    Returns the structural hash of a Database, Schema, Table or Column.
+
+    The hash covers what the object means to the database: names, types, nullability, keys, defaults,
+    constraints, enum values and view queries. It ignores notes, the database name, the spelling of
+    types and view queries beyond case and whitespace, whether a foreign key names its own schema,
+    empty schemas, and the order of tables, enums, views, schemas and foreign keys. Column order
+    counts.
+
+    Hashes are computed bottom-up and cached on the Columns, Tables, Schemas and Database, so a second
+    call costs nothing. The `Database` add and remove methods keep the cache up to date; after editing
+    objects in place, call `Database.touch`. A Table or Column that does not belong to a schema is hashed
+    without caching, since its foreign keys cannot be resolved until it is added to one.
+
+    Args:
+        obj (Union[Database, Schema, Table, Column]): The object to hash.
+
+    Returns:
+        bytes: A 16-byte digest, stable across processes.
+    """
+    if isinstance(obj, Database):
+        if obj._merkle is None:
+            obj._merkle = _digest(sorted((name, _schema_root(schema).digest) for name, schema in obj.schemas.items() if not _empty(schema)))
+        return obj._merkle
+    elif isinstance(obj, Schema):
+        return _schema_root(obj).digest
+    elif isinstance(obj, Table):
+        if obj.schema is None:
+            return _digest(*(_column_content(column, None) for column in obj.columns.values()))
+        return _table_hash(obj, obj.schema)
+    elif isinstance(obj, Column):
+        schema_name = obj.table.schema if obj.table is not None else None
+        if schema_name is None:
+            return _digest(_column_content(obj, None))
+        return _digest(_column_key(obj, schema_name))
+    else:
+        raise TypeError("Unsupported type for structural hashing")
+
+def update_object_hash(schema, obj):
+    """
+    Rehashes a table, enum or view of a schema and the nodes of the schema's trie above it.
+
+    Used by `Database.touch`, so invalidating after each edit is cheap even in a large schema.
+
+    Args:
+        schema (Schema): The schema holding the object, whose hash is cached.
+        obj (Union[Table, Enum, View]): The object, whose own cached hash was discarded.
+
+    Returns:
+        bool: Whether the trie was updated. If not, the schema's hash has to be discarded.
+    """
+    kind = "table" if isinstance(obj, Table) else "enum" if isinstance(obj, Enum) else "view"
+    return _update_path(schema._merkle, (kind, obj.name), _object_hash(kind, obj, schema.name))
+
+def differences(old, new):
+    """
+    Finds the objects that differ structurally between two databases.
+
+    Equal hashes prove equal subtrees, so only the branches whose hashes differ are visited: with
+    cached hashes, a change to one column of a 20000-table database is found by comparing a few dozen
+    hashes. Changed tables are narrowed down to their changed columns, unless only the column order
+    changed, in which case the table itself is reported.
+
+    Args:
+        old (Database): The old database.
+        new (Database): The new database.
+
+    Returns:
+        List[Difference]: The added, removed and changed schemas, tables, columns, enums and views,
+            by qualified name.
+    """
+    found = []
+    if structural_hash(old) == structural_hash(new):
+        return found
+    for schema_name in sorted(old.schemas.keys() | new.schemas.keys()):
+        old_schema, new_schema = old.schemas.get(schema_name), new.schemas.get(schema_name)
+        old_schema = None if old_schema is None or _empty(old_schema) else old_schema
+        new_schema = None if new_schema is None or _empty(new_schema) else new_schema
+        if old_schema is None and new_schema is None:
+            continue
+        if old_schema is None or new_schema is None:
+            found.append(Difference(schema_name, old_schema, new_schema))
+            continue
+        keys = []
+        _diff_nodes(_schema_root(old_schema), _schema_root(new_schema), keys)
+        for kind, name in sorted(keys):
+            old_obj = getattr(old_schema, kind + "s").get(name)
+            new_obj = getattr(new_schema, kind + "s").get(name)
+            qualified_name = f"{schema_name}.{name}"
+            if kind == "table" and old_obj is not None and new_obj is not None:
+                columns = _diff_columns(qualified_name, schema_name, old_obj, new_obj)
+                found.extend(columns or [Difference(qualified_name, old_obj, new_obj)])
+            else:
+                found.append(Difference(qualified_name, old_obj, new_obj))
+    return found
+
+def _diff_nodes(old, new, keys):
+    if old is not None and new is not None and old.digest == new.digest:
+        return
+    if old is None or new is None or old.items is not None or new.items is not None:
+        old_items, new_items = _items(old), _items(new)
+        keys.extend(key for key in old_items.keys() | new_items.keys() if old_items.get(key) != new_items.get(key))
+        return
+    for nibble in old.children.keys() | new.children.keys():
+        _diff_nodes(old.children.get(nibble), new.children.get(nibble), keys)
+
+def _items(node):
+    if node is None:
+        return {}
+    if node.items is not None:
+        return node.items
+    items = {}
+    for child in node.children.values():
+        items.update(_items(child))
+    return items
+
+def _diff_columns(table_name, schema_name, old_table, new_table):
+    found = []
+    for name in old_table.columns.keys() | new_table.columns.keys():
+        old_column, new_column = old_table.columns.get(name), new_table.columns.get(name)
+        if old_column is None or new_column is None or _column_key(old_column, schema_name) != _column_key(new_column, schema_name):
+            found.append(Difference(f"{table_name}.{name}", old_column, new_column))
+    return sorted(found, key=lambda difference: difference.name)
@@ -1,5 +1,18 @@
+import functools
+import hashlib
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+import lark
 from lark import Lark, Transformer, v_args
-from classes import Database, Schema, Table, Column, DataType, ForeignKey, View, Enum
+from classes import Database, Schema, Table, Column, ForeignKey, View, Enum, intern_data_type
+from profiling import count_database_objects, instrumented
+from parse.ddl_scanner import sqlalchemy_type_name
+
+# Bump when the Database built from the same DBML changes, so cached snapshots are not reused.
+PARSER_REVISION = 3
 
 # Defining the grammar
 dbml_grammar = """
@@ -10,15 +23,15 @@ dbml_grammar = """
     column: STRING data_type settings?
     data_type: STRING
     settings: "[" setting ("," setting)* "]"
-    setting: "pk" | "increment"
+    !setting: "pk" | "increment" | "not" "null"
     foreign_key: "Ref:" STRING "<" STRING
     view: "View" STRING "As" "SQL" MULTILINE_STRING "End"
     enum: "Enum" STRING "{" value ("," value)* "}"
     value: STRING
     SCHEMA_NAME: CNAME
+    MULTILINE_STRING: /'''[\s\S]*?'''/
     %import common.CNAME
-    %import common.STRING
-    %import common.MULTILINE_STRING
+    %import common.ESCAPED_STRING -> STRING
     %import common.WS
     %ignore WS
 """
@@ -26,7 +39,39 @@ dbml_grammar = """
 class DBMLTransformer(Transformer):
     """
     Transformer class for parsing DBML into Database, Schema, Table, Column, DataType, ForeignKey, and View objects.
+
+    Tables, views and enums are each returned wrapped in a Schema holding just that object, and
+    merged into the Database by `project`. The transformer keeps no state between calls, so it can
+    be run over a finished tree or passed to Lark to run inline during the LALR parse.
+
+    Attributes:
+        default_schema (str): The schema that enums without a schema prefix are placed in.
     """
+    default_schema = "public"
+
+    def STRING(self, token):
+        """
+        Transforms a quoted string token by removing its quotes.
+
+        Args:
+            token (Token): The parsed token.
+
+        Returns:
+            str: The unquoted string.
+        """
+        return token[1:-1]
+
+    def MULTILINE_STRING(self, token):
+        """
+        Transforms a triple-quoted string token by removing its quotes.
+
+        Args:
+            token (Token): The parsed token.
+
+        Returns:
+            str: The unquoted string.
+        """
+        return token[3:-3]
 
     def start(self, items):
         """
@@ -50,7 +95,15 @@ class DBMLTransformer(Transformer):
         Returns:
             Database: Transformed Database object.
         """
-        return Database(name=items[0], schemas=items[1:])
+        database = Database(name=items[0])
+        for fragment in items[1:]:
+            for table in fragment.tables.values():
+                database.add_table(table, fragment.name)
+            for enum in fragment.enums.values():
+                database.add_enum(enum, fragment.name)
+            for view in fragment.views.values():
+                database.add_view(view, fragment.name)
+        return database
     
     def table(self, items):
         """
@@ -62,20 +115,30 @@ class DBMLTransformer(Transformer):
         Returns:
             Schema: Transformed Schema object.
         """
-        schema_name, table_name = items[0].split(".")
-        if len(items[0].split(".")) != 2:
-            raise ValueError(f"Expected schema_name.table_name, got {items[0]}")
+        schema_name, table_name = items[0]
         columns = []
         foreign_keys = []
         for item in items[1:]:
             if isinstance(item, Column):
                 columns.append(item)
-            elif isinstance(item, ForeignKey):
+            else:
                 foreign_keys.append(item)
-        table = Table(name=table_name, columns={column.name: column for column in columns})
-        for fk in foreign_keys:
-            table.columns[fk.column].foreign_keys = [fk]
-        return Schema(name=schema_name, tables=[table])
+        table = Table(name=table_name, columns={column.name: column for column in columns}, schema=schema_name)
+        for column_name, fk in foreign_keys:
+            table.columns[column_name].foreign_keys = [fk]
+        return Schema(name=schema_name, tables={table_name: table})
+
+    def table_name(self, items):
+        """
+        Transforms the table name section of the DBML syntax.
+
+        Args:
+            items (list): List of parsed tokens.
+
+        Returns:
+            tuple: The schema name and the table name.
+        """
+        return sys.intern(str(items[0])), items[1]
     
     def column(self, items):
         """
@@ -87,7 +150,8 @@ class DBMLTransformer(Transformer):
         Returns:
             Column: Transformed Column object.
         """
-        return Column(name=items[0], data_type=DataType(dbml=items[1], sqlalchemy="", sql=""), nullable="not null" not in items[2:], primary_key="pk" in items[2:])
+        settings = items[2] if len(items) > 2 else []
+        return Column(name=sys.intern(items[0]), data_type=intern_data_type(dbml=items[1], sqlalchemy=sqlalchemy_type_name(items[1]), sql=items[1]), nullable="not null" not in settings and "pk" not in settings, primary_key="pk" in settings)
     
     def data_type(self, items):
         """
@@ -112,19 +176,34 @@ class DBMLTransformer(Transformer):
             list: Transformed list of settings.
         """
         return items
+
+    def setting(self, items):
+        """
+        Transforms a single setting of the DBML syntax.
+
+        Args:
+            items (list): List of parsed tokens.
+
+        Returns:
+            str: Transformed setting, such as "pk" or "not null".
+        """
+        return " ".join(items)
     
     def foreign_key(self, items):
         """
         Transforms the foreign key section of the DBML syntax into a ForeignKey object.
 
+        The referenced table may be qualified with its schema, as in "schema.table.column".
+
         Args:
             items (list): List of parsed tokens.
 
         Returns:
-            ForeignKey: Transformed ForeignKey object.
+            tuple: The name of the referencing column and the transformed ForeignKey object.
         """
         table, column = items[0].split(".")
-        return ForeignKey(table=table, column=column, ref_table=items[1].split(".")[0], ref_column=items[1].split(".")[1])
+        ref_table, _, ref_column = items[1].rpartition(".")
+        return column, ForeignKey(tables=[ref_table], columns=[ref_column])
     
     def view(self, items):
         """
@@ -134,10 +213,10 @@ class DBMLTransformer(Transformer):
             items (list): List of parsed tokens.
 
         Returns:
-            View: Transformed View object.
+            Schema: Schema object holding the transformed View object.
         """
         schema_name, view_name = items[0].split(".")
-        return View(name=view_name, sql=items[1])
+        return Schema(name=schema_name, views={view_name: View(name=view_name, sql=items[1])})
     
     def enum(self, items):
         """
@@ -147,19 +226,172 @@ class DBMLTransformer(Transformer):
             items (list): List of parsed tokens.
 
         Returns:
-            Enum: Transformed Enum object.
+            Schema: Schema object holding the transformed Enum object.
+        """
+        schema_name, _, enum_name = items[0].rpartition(".")
+        schema_name = schema_name or self.default_schema
+        return Schema(name=schema_name, enums={enum_name: Enum(name=enum_name, values=items[1:])})
+
+    def value(self, items):
         """
-        return Enum(name=items[0], values=items[1:])
+        Transforms an enum value of the DBML syntax.
+
+        Args:
+            items (list): List of parsed tokens.
+
+        Returns:
+            str: Transformed value.
+        """
+        return items[0]
+
+def default_cache_dir():
+    """
+    Returns the per-user directory for the compiled DBML parse tables.
+
+    The tables are loaded with pickle, so they are kept out of shared directories such as the system
+    temp directory, where another local user could plant a cache file.
+
+    Returns:
+        str: $XDG_CACHE_HOME/alkahest, or ~/.cache/alkahest when XDG_CACHE_HOME is not set.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "alkahest")
+
+def grammar_cache_path(cache_dir=None):
+    """
+    Returns the path of the on-disk cache for the compiled DBML parse tables.
+
+    The file name is keyed by a hash of the grammar, the Lark version and the Python version, so a
+    changed grammar or an upgraded Lark or Python never loads stale tables.
+
+    Args:
+        cache_dir (str, optional): The directory holding the cache. Defaults to `default_cache_dir()`.
+
+    Returns:
+        str: The path of the cache file.
+    """
+    file_name = f"alkahest_dbml_{grammar_hash()}_lark-{lark.__version__}_py{sys.version_info[0]}{sys.version_info[1]}.cache"
+    return os.path.join(cache_dir or default_cache_dir(), file_name)
 
-def create_parser():
+def grammar_hash():
+    """
+    Returns a short hash of the DBML grammar.
+
+    Returns:
+        str: The first 16 hex digits of the grammar's SHA-256.
+    """
+    return hashlib.sha256(dbml_grammar.encode("utf-8")).hexdigest()[:16]
+
+def parser_version():
+    """
+    Returns a string identifying everything that determines the Database parsed from a DBML string.
+
+    Returns:
+        str: The parser revision, grammar hash and Lark version.
+    """
+    return f"dbml-{PARSER_REVISION}-{grammar_hash()}-lark-{lark.__version__}"
+
+@instrumented("dbml.grammar")
+def create_parser(cache=True, cache_dir=None, transformer=None):
     """
     Creates a Lark parser for DBML.
 
+    Args:
+        cache (bool, optional): Whether to load the compiled parse tables from disk, compiling and
+            saving them on a miss. Defaults to True.
+        cache_dir (str, optional): The directory holding the cache. Defaults to `default_cache_dir()`,
+            which is created readable by the current user only. If it cannot be created, the tables
+            are compiled without a cache.
+        transformer (DBMLTransformer, optional): A transformer to run inline during the LALR parse.
+            When given, the parser returns the transformed Database directly and no Tree is built.
+
     Returns:
         Lark: The Lark parser for DBML.
     """
-    return Lark(dbml_grammar, start='start', parser='lalr')
+    if cache:
+        path = grammar_cache_path(cache_dir)
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        except OSError:
+            cache = False
+    if not cache:
+        return Lark(dbml_grammar, start='start', parser='lalr', transformer=transformer)
+    return Lark(dbml_grammar, start='start', parser='lalr', transformer=transformer, cache=path)
+
+@functools.lru_cache(maxsize=None)
+def get_parser(inline=False):
+    """
+    Returns a process-wide shared Lark parser for DBML, creating it on first use.
+
+    Lark does not promise that one parser can run on several threads at once, so threads should
+    take parsers from a ParserPool instead.
+
+    Args:
+        inline (bool, optional): Whether to return the parser that runs DBMLTransformer inline. Defaults to False.
+
+    Returns:
+        Lark: The shared Lark parser for DBML.
+    """
+    return create_parser(transformer=DBMLTransformer() if inline else None)
+
+class ParserPool:
+    """
+    A pool of inline DBML parsers, each with its own DBMLTransformer, for parsing on several threads.
 
+    A parser is used by one thread at a time and returned to the pool afterwards, so parsers and
+    their compiled tables are reused across calls. New parsers are created on demand, up to `size`,
+    after which callers wait for one to be returned.
+
+        pool = ParserPool(size=8)
+        with pool.parser() as parser:
+            database = load_dbml(dbml_string, parser)
+
+    Attributes:
+        size (int): The maximum number of parsers.
+        created (int): The number of parsers created so far.
+    """
+    def __init__(self, size=8):
+        """
+        Initializes an empty ParserPool.
+
+        Args:
+            size (int, optional): The maximum number of parsers. Defaults to 8.
+        """
+        self.size = size
+        self.created = 0
+        self._idle = queue.SimpleQueue()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def parser(self):
+        """
+        Lends a parser for the duration of a with block.
+
+        Yields:
+            Lark: A parser that runs a DBMLTransformer inline, for use with `load_dbml`.
+        """
+        try:
+            parser = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self.created < self.size
+                if create:
+                    self.created += 1
+            if not create:
+                parser = self._idle.get()
+            else:
+                try:
+                    parser = create_parser(transformer=DBMLTransformer())
+                except BaseException:
+                    with self._lock:
+                        self.created -= 1
+                    raise
+        try:
+            yield parser
+        finally:
+            self._idle.put(parser)
+
+@instrumented("dbml.parse")
 @v_args(inline=True)
 def parse_dbml(dbml_string, parser):
     """
@@ -174,6 +406,7 @@ def parse_dbml(dbml_string, parser):
     """
     return parser.parse(dbml_string)
 
+@instrumented("dbml.transform", count=count_database_objects)
 def transform_dbml(tree, transformer):
     """
     Transforms a parsed DBML tree into a Database object using a DBMLTransformer.
@@ -186,3 +419,19 @@ def transform_dbml(tree, transformer):
         Database: The resulting Database object after transforming the DBML tree.
     """
     return transformer.transform(tree)
+
+@instrumented("dbml.load", count=count_database_objects)
+def load_dbml(dbml_string, parser=None):
+    """
+    Parses a DBML string straight into a Database object in a single pass.
+
+    DBMLTransformer runs inline during the LALR parse, so no intermediate Tree is built.
+
+    Args:
+        dbml_string (str): The DBML string to parse.
+        parser (Lark, optional): A parser created with a DBMLTransformer. Defaults to the shared inline parser.
+
+    Returns:
+        Database: The resulting Database object.
+    """
+    return (parser or get_parser(inline=True)).parse(dbml_string)
@@ -0,0 +1,358 @@
+import re
+import sys
+from collections import namedtuple
+from classes import Column, ForeignKey, intern_data_type
+from profiling import instrumented
+
+# A statement recognised by the scanner. `kind` is "TABLE", "TYPE" or "VIEW", or None for a statement
+# that defines nothing Alkahest models. `body` holds the column and constraint definitions of a table,
+# the values of an enum, or the query of a view.
+ScannedStatement = namedtuple("ScannedStatement", ["kind", "schema", "name", "body"])
+IGNORED = ScannedStatement(None, None, None, None)
+
+_NAME = r'(?:"(?:[^"]|"")+"|[A-Za-z_][A-Za-z0-9_$]*)'
+_QUALIFIED_NAME = rf'{_NAME}(?:\s*\.\s*{_NAME})?'
+_FLAGS = re.IGNORECASE | re.DOTALL
+
+_LEADING_COMMENTS = re.compile(r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.DOTALL)
+_CREATE = re.compile(r"CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?(?:(?:TEMP|TEMPORARY|UNLOGGED|RECURSIVE)\s+)?(\w+)", _FLAGS)
+_CREATE_TABLE = re.compile(rf"CREATE\s+(?:(?:GLOBAL|LOCAL)\s+)?(?:(?:TEMP|TEMPORARY|UNLOGGED)\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?({_QUALIFIED_NAME})\s*\(", _FLAGS)
+_CREATE_ENUM = re.compile(rf"CREATE\s+TYPE\s+({_QUALIFIED_NAME})\s+AS\s+ENUM\s*\((.*)\)\s*;?\s*", _FLAGS)
+_CREATE_VIEW = re.compile(rf"CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:TEMP|TEMPORARY)\s+)?VIEW\s+({_QUALIFIED_NAME})\s+AS\s+(.*?)\s*;?\s*", _FLAGS)
+_ENUM_VALUES = re.compile(r"\s*'((?:[^']|'')*)'\s*(?:,|$)")
+_TABLE_END = re.compile(r"\s*;?\s*")
+
+_TOKEN = re.compile(r"""\s*("(?:[^"]|"")*"|'(?:[^']|'')*'|[A-Za-z_][A-Za-z0-9_$]*|::|\S)""")
+_COLUMN_CONSTRAINTS = {"CONSTRAINT", "NOT", "NULL", "PRIMARY", "UNIQUE", "DEFAULT", "REFERENCES", "CHECK", "COLLATE", "GENERATED"}
+_TABLE_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK", "EXCLUDE", "LIKE"}
+_MODELED_KINDS = {"TABLE", "TYPE", "VIEW", "MATERIALIZED"}
+
+# The SQLAlchemy type of each SQL type name, and whether it takes the SQL type's arguments.
+_SQLALCHEMY_TYPES = {
+    "smallint": ("SmallInteger", False), "int2": ("SmallInteger", False),
+    "integer": ("Integer", False), "int": ("Integer", False), "int4": ("Integer", False), "serial": ("Integer", False),
+    "bigint": ("BigInteger", False), "int8": ("BigInteger", False), "bigserial": ("BigInteger", False),
+    "numeric": ("Numeric", True), "decimal": ("Numeric", True),
+    "real": ("REAL", False), "float4": ("REAL", False),
+    "double precision": ("Double", False), "float8": ("Double", False), "float": ("Float", True),
+    "text": ("Text", False), "varchar": ("String", True), "character varying": ("String", True),
+    "char": ("CHAR", True), "character": ("CHAR", True),
+    "boolean": ("Boolean", False), "bool": ("Boolean", False),
+    "date": ("Date", False), "time": ("Time", False), "time without time zone": ("Time", False),
+    "time with time zone": ("Time(timezone=True)", False), "timetz": ("Time(timezone=True)", False),
+    "timestamp": ("DateTime", False), "timestamp without time zone": ("DateTime", False), "datetime": ("DateTime", False),
+    "timestamp with time zone": ("DateTime(timezone=True)", False), "timestamptz": ("DateTime(timezone=True)", False),
+    "interval": ("Interval", False), "uuid": ("Uuid", False), "json": ("JSON", False), "jsonb": ("JSONB", False),
+    "bytea": ("LargeBinary", False), "blob": ("LargeBinary", False),
+}
+_TYPE_ARGUMENTS = re.compile(r"\(([^)]*)\)")
+
+@instrumented("sql.scan")
+def scan_statement(text):
+    """
+    Recognises a single DDL statement with regular expressions, without tokenizing it.
+
+    Handles the common PostgreSQL forms of CREATE TABLE, CREATE TYPE ... AS ENUM and CREATE VIEW, and
+    statements that are not CREATE TABLE/TYPE/VIEW at all. Anything else, such as a table body with
+    comments or trailing table options, is left to the sqlparse path.
+
+    Args:
+    - text (str): The text of one statement, as yielded by `split_statements`.
+
+    Returns:
+    - ScannedStatement: The recognised statement, IGNORED if it defines nothing Alkahest models, or
+      None if it was not recognised.
+    """
+    start = _LEADING_COMMENTS.match(text).end()
+    create = _CREATE.match(text, start)
+    if create is None:
+        return None if text[start:start + 6].upper() == "CREATE" else IGNORED
+    if create.group(1).upper() not in _MODELED_KINDS:
+        return IGNORED
+
+    match = _CREATE_TABLE.match(text, start)
+    if match is not None:
+        end = _closing_parenthesis(text, match.end())
+        if end is None or "--" in text[match.end():end] or "/*" in text[match.end():end]:
+            return None
+        if _TABLE_END.fullmatch(text, end + 1) is None:
+            return None
+        schema, name = split_qualified_name(match.group(1))
+        return ScannedStatement("TABLE", schema, name, split_top_level(text[match.end():end]))
+
+    match = _CREATE_ENUM.fullmatch(text, start)
+    if match is not None:
+        values = parse_enum_values(match.group(2))
+        if values is None:
+            return None
+        schema, name = split_qualified_name(match.group(1))
+        return ScannedStatement("TYPE", schema, name, values)
+
+    match = _CREATE_VIEW.fullmatch(text, start)
+    if match is not None and "--" not in match.group(2) and "/*" not in match.group(2):
+        schema, name = split_qualified_name(match.group(1))
+        return ScannedStatement("VIEW", schema, name, match.group(2))
+    return None
+
+def _closing_parenthesis(text, pos):
+    # Index of the parenthesis closing the one just before `pos`, skipping quoted text.
+    depth = 1
+    for match in _TOKEN.finditer(text, pos):
+        token = match.group(1)
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                return match.start(1)
+    return None
+
+def unquote(name):
+    """
+    Returns an identifier without its double quotes, if it has any.
+    """
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name
+
+def split_qualified_name(text):
+    """
+    Splits a possibly schema-qualified name into its schema and name.
+
+    Returns:
+    - tuple: The unquoted schema name, or None if unqualified, and the unquoted name.
+    """
+    parts = [sys.intern(unquote(part)) for part in re.findall(_NAME, text)]
+    return (parts[0], parts[1]) if len(parts) == 2 else (None, parts[0])
+
+def sqlalchemy_type_name(type_text):
+    """
+    Returns the SQLAlchemy type expression for a SQL or DBML column type, such as "String(255)" for
+    varchar(255).
+
+    A type Alkahest has no mapping for, such as an enum, is returned as its unqualified name, which
+    is the name the SQLAlchemy output gives the enum.
+
+    Returns:
+    - str: The SQLAlchemy type expression.
+    """
+    text = " ".join(type_text.split())
+    if text.endswith("[]"):
+        return f"ARRAY({sqlalchemy_type_name(text[:-2])})"
+    mapped = _SQLALCHEMY_TYPES.get(_TYPE_ARGUMENTS.sub("", text).strip().lower())
+    if mapped is None:
+        names = re.findall(_NAME, text)
+        return unquote(names[-1]) if names else text
+    type_name, takes_arguments = mapped
+    arguments = _TYPE_ARGUMENTS.search(text)
+    if takes_arguments and arguments is not None:
+        return f"{type_name}({', '.join(argument.strip() for argument in arguments.group(1).split(','))})"
+    return type_name
+
+def split_top_level(text):
+    """
+    Splits the body of a CREATE TABLE at the commas that are not inside parentheses or quotes.
+
+    Returns:
+    - list: The column and constraint definitions.
+    """
+    definitions = []
+    depth = 0
+    start = 0
+    for match in _TOKEN.finditer(text):
+        token = match.group(1)
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif token == "," and depth == 0:
+            definitions.append(text[start:match.start(1)].strip())
+            start = match.end(1)
+    last = text[start:].strip()
+    if last:
+        definitions.append(last)
+    return definitions
+
+def parse_enum_values(text):
+    """
+    Extracts the values of an enum from the text between its parentheses.
+
+    Returns:
+    - list: The unquoted values, or None if the text is not a list of string literals.
+    """
+    values = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _ENUM_VALUES.match(text, pos)
+        if match is None:
+            return None
+        values.append(match.group(1).replace("''", "'"))
+        pos = match.end()
+    return values
+
+def build_columns(definitions, primary_key_of=None):
+    """
+    Builds the columns of a table from its column and constraint definitions.
+
+    Table constraints (PRIMARY KEY, UNIQUE and FOREIGN KEY) are applied to the columns they name. A
+    foreign key without a column list, such as "REFERENCES users", references the primary key of its
+    target, or "id" if that is not known.
+
+    Args:
+    - definitions (list): The definitions, as returned by `split_top_level`.
+    - primary_key_of (Callable[[str, dict], list], optional): Returns the primary key column names of
+      a referenced table, given its name as written and the columns of the table being built.
+      Defaults to None, for "id".
+
+    Returns:
+    - dict: A dictionary mapping column names to Column objects.
+    """
+    columns = {}
+    table_constraints = []
+    implicit = []
+    for definition in definitions:
+        tokens = _tokens(definition)
+        if not tokens:
+            continue
+        if tokens[0][0].upper() in _TABLE_CONSTRAINTS:
+            table_constraints.append((definition, tokens))
+        else:
+            column = _build_column(definition, tokens, implicit)
+            columns[column.name] = column
+    for definition, tokens in table_constraints:
+        _apply_table_constraint(columns, definition, tokens, implicit)
+    for foreign_keys in implicit:
+        keys = primary_key_of(foreign_keys[0].tables[0], columns) if primary_key_of is not None else None
+        for i, foreign_key in enumerate(foreign_keys):
+            foreign_key.columns = [keys[i] if keys and i < len(keys) else "id"]
+    return columns
+
+def primary_key(columns):
+    """
+    Returns the names of the primary key columns among `columns`, in order.
+    """
+    return [name for name, column in columns.items() if column.primary_key]
+
+def _tokens(text):
+    return [(match.group(1), match.start(1), match.end(1)) for match in _TOKEN.finditer(text)]
+
+def _upper(tokens, i):
+    return tokens[i][0].upper() if i < len(tokens) else None
+
+def _skip_group(tokens, i):
+    # Index just past the parenthesized group starting at `i`, or `i` if there is none.
+    if _upper(tokens, i) != "(":
+        return i
+    depth = 0
+    for j in range(i, len(tokens)):
+        depth += tokens[j][0] == "("
+        depth -= tokens[j][0] == ")"
+        if depth == 0:
+            return j + 1
+    return len(tokens)
+
+def _clause_end(tokens, i):
+    # Index of the next column constraint keyword outside parentheses, starting at `i`.
+    depth = 0
+    while i < len(tokens):
+        token = tokens[i][0]
+        if depth == 0 and token.upper() in _COLUMN_CONSTRAINTS:
+            return i
+        depth += token == "("
+        depth -= token == ")"
+        i += 1
+    return i
+
+def _text(definition, tokens, start, end):
+    return definition[tokens[start][1]:tokens[end - 1][2]] if end > start else ""
+
+def _names(definition, tokens, i):
+    # The unquoted names in the parenthesized list starting at `i`, and the index past it.
+    end = _skip_group(tokens, i)
+    return [unquote(token[0]) for token in tokens[i + 1:end - 1] if token[0] != ","], end
+
+def _build_column(definition, tokens, implicit):
+    name = sys.intern(unquote(tokens[0][0]))
+    i = _clause_end(tokens, 1)
+    type_text = " ".join(_text(definition, tokens, 1, i).split())
+    column = Column(name=name, data_type=intern_data_type(dbml=type_text, sqlalchemy=sqlalchemy_type_name(type_text), sql=type_text))
+    while i < len(tokens):
+        word = _upper(tokens, i)
+        if word == "NOT" and _upper(tokens, i + 1) == "NULL":
+            column.nullable = False
+            i += 2
+        elif word == "NULL":
+            column.nullable = True
+            i += 1
+        elif word == "PRIMARY":
+            column.primary_key = True
+            column.nullable = False
+            i += 2
+        elif word == "UNIQUE":
+            column.unique = True
+            i += 1
+        elif word == "DEFAULT":
+            end = _clause_end(tokens, i + 2)
+            column.default_value = _text(definition, tokens, i + 1, end)
+            i = end
+        elif word == "CHECK":
+            end = _skip_group(tokens, i + 1)
+            column.check = _text(definition, tokens, i + 2, end - 1)
+            i = end
+        elif word == "REFERENCES":
+            i = _apply_references({name: column}, [name], definition, tokens, i + 1, implicit)
+        else:
+            i = _clause_end(tokens, i + 1)
+    return column
+
+def _apply_references(columns, names, definition, tokens, i, implicit):
+    # Parses "table [(columns)] [MATCH ...] [ON DELETE|UPDATE action] ..." starting at `i`, adds a
+    # foreign key to each of the named columns and returns the index past the clause. Foreign keys
+    # without a column list are added to `implicit`, for build_columns to point at the primary key.
+    end = i + 3 if _upper(tokens, i + 1) == "." else i + 1
+    schema, table = split_qualified_name(_text(definition, tokens, i, end))
+    ref_table = f"{schema}.{table}" if schema else table
+    ref_columns, i = _names(definition, tokens, end)
+    foreign_keys = []
+    for name, ref_column in zip(names, ref_columns or [None] * len(names)):
+        column = columns.get(name)
+        if column is not None:
+            foreign_key = ForeignKey(tables=[ref_table], columns=[ref_column])
+            column.foreign_keys = (column.foreign_keys or []) + [foreign_key]
+            foreign_keys.append(foreign_key)
+    if not ref_columns and foreign_keys:
+        implicit.append(foreign_keys)
+    while i < len(tokens):
+        word = _upper(tokens, i)
+        if word == "MATCH":
+            i += 2
+        elif word == "ON":
+            i += 4 if _upper(tokens, i + 2) in ("SET", "NO") else 3
+        elif word == "DEFERRABLE":
+            i += 1
+        elif word == "NOT" and _upper(tokens, i + 1) == "DEFERRABLE":
+            i += 2
+        elif word == "INITIALLY":
+            i += 2
+        else:
+            break
+    return i
+
+def _apply_table_constraint(columns, definition, tokens, implicit):
+    i = 2 if _upper(tokens, 0) == "CONSTRAINT" else 0
+    word = _upper(tokens, i)
+    if word == "PRIMARY":
+        names, _ = _names(definition, tokens, i + 2)
+        for name in names:
+            if name in columns:
+                columns[name].primary_key = True
+                columns[name].nullable = False
+    elif word == "UNIQUE":
+        names, _ = _names(definition, tokens, i + 1)
+        if len(names) == 1 and names[0] in columns:
+            columns[names[0]].unique = True
+    elif word == "FOREIGN" and _upper(tokens, i + 1) == "KEY":
+        names, i = _names(definition, tokens, i + 2)
+        if _upper(tokens, i) == "REFERENCES":
+            _apply_references(columns, names, definition, tokens, i + 1, implicit)
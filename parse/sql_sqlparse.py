@@ -1,104 +1,218 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 import sqlparse
-from sqlparse.sql import Identifier, Function, Parenthesis
-from sqlparse.tokens import Keyword, DML
-from classes import Database, Schema, Table, Column, DataType, Enum, View, ForeignKey
+from sqlparse.tokens import Comment
+from classes import Database, Schema, Table, Enum, View
+from profiling import count_database_objects, instrumented
+from parse.ddl_scanner import ScannedStatement, scan_statement, build_columns, parse_enum_values, primary_key, split_qualified_name, split_top_level
+
+# Bump when the Database built from the same SQL changes, so cached snapshots are not reused.
+PARSER_REVISION = 4
+
+# Everything that can open or close a region in which a semicolon does not end a statement.
+_STATEMENT_DELIMITERS = re.compile(r"--|/\*|'|\"|\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$|;")
+_REGION_CLOSERS = {"/*": "*/"}
+
+# Bounds for the amount of SQL text (in characters) handed to a worker at once.
+MIN_CHUNK_SIZE = 64 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+def split_statements(stream):
+    """
+    Split SQL text into statements without tokenizing it.
+
+    The stream is read line by line, so only the statement being assembled is held in memory.
+    Semicolons inside string literals, quoted identifiers, comments and dollar-quoted bodies
+    do not end a statement.
+
+    Args:
+    - stream (Iterable[str]): A text stream, or any iterable of lines.
+
+    Yields:
+    - str: The text of each statement, including its terminating semicolon.
+    """
+    buffer = []
+    closer = None  # The delimiter that ends the quoted or commented region we are in, if any.
+    for line in stream:
+        start = pos = 0
+        while True:
+            if closer is None:
+                match = _STATEMENT_DELIMITERS.search(line, pos)
+                if match is None:
+                    break
+                token = match.group()
+                pos = match.end()
+                if token == ";":
+                    buffer.append(line[start:pos])
+                    statement = "".join(buffer)
+                    buffer = []
+                    start = pos
+                    if statement.strip():
+                        yield statement
+                elif token == "--":
+                    break
+                else:
+                    closer = _REGION_CLOSERS.get(token, token)
+            else:
+                end = line.find(closer, pos)
+                if end == -1:
+                    break
+                pos = end + len(closer)
+                closer = None
+        buffer.append(line[start:])
+    statement = "".join(buffer)
+    if statement.strip():
+        yield statement
 
 class SQLtoAlkahest:
-    def __init__(self, sql_string, default_schema="public"):
+    def __init__(self, sql_string, default_schema="public", fast=True):
         """
         Initialize the SQLtoAlkahest parser.
         
         Args:
         - sql_string (str): The SQL string to be parsed.
         - default_schema (str, optional): The default schema to use if not provided. Defaults to "public".
+        - fast (bool, optional): Whether to recognise common statements with `scan_statement` before
+          falling back to sqlparse. Defaults to True.
         """
         self.sql_string = sql_string
-        self.statements = sqlparse.parse(sql_string)
+        self.fast = fast
+        self._statements = None
         self.database = Database()  # Create a new Database object to store the parsed schema
-        self.current_schema = self.database.schemas.setdefault(default_schema, Schema(name=default_schema))
+        self.current_schema = self.database.add_schema(Schema(name=default_schema))
 
+    @property
+    def statements(self):
+        """
+        The sqlparse statements of the SQL string, tokenized on first access.
+        """
+        if self._statements is None:
+            self._statements = _tokenize(self.sql_string)
+        return self._statements
+
+    @instrumented("sql.parse")
     def parse(self):
         """
         Parse the SQL statements.
         """
-        for statement in self.statements:
-            if statement.get_type() == "CREATE":
-                if "TABLE" in statement.value:
-                    self.handle_create_table(statement)
-                elif "TYPE" in statement.value:
-                    self.handle_create_type(statement)
-                elif "VIEW" in statement.value:
-                    self.handle_create_view(statement)
+        if self.fast:
+            self.parse_stream(self.sql_string.splitlines(keepends=True))
+        else:
+            for statement in self.statements:
+                self.handle_statement(statement)
 
-    def handle_create_table(self, statement):
+    def parse_stream(self, stream):
         """
-        Handle CREATE TABLE statements.
-        
+        Parse SQL statements from a text stream one at a time.
+
+        Each statement is handed to the Database and dropped before the next one is read, so peak
+        memory is bound by the largest statement rather than the whole stream.
+
         Args:
-        - statement (sqlparse.sql.Statement): The SQL statement to be parsed.
+        - stream (Iterable[str]): The text stream to be parsed.
         """
-        table_name = None
-        columns = []
-        for token in statement.tokens:
-            if token.ttype is sqlparse.tokens.Name:
-                table_name = token.value
-            elif isinstance(token, sqlparse.sql.Parenthesis):
-                columns = self.process_columns(token)
-        
-        table = Table(name=table_name, columns=columns)
-        self.current_schema.tables[table_name] = table
+        for statement_text in split_statements(stream):
+            self.handle_statement_text(statement_text)
 
-    def process_columns(self, token):
+    def handle_statement_text(self, statement_text):
         """
-        Extract column details from a given Parenthesis token.
-        
+        Parse the text of a single SQL statement.
+
+        With `fast` set, the statement is first matched by `scan_statement`, and only tokenized with
+        sqlparse if the scanner does not recognise it.
+
         Args:
-        - token (sqlparse.sql.Parenthesis): The token to be processed.
-
-        Returns:
-        - list: A list of Column objects.
-        """
-        columns = []
-        for item in token.get_sublists():
-            if isinstance(item, sqlparse.sql.Identifier):
-                column_name = item.get_real_name()
-                data_type = item.get_parent_name().split()[0]  # Get the first word of the parent name as the data type
-                
-                if "REFERENCES" in item.get_parent_name():
-                    ref_tables_columns = item.get_parent_name().split("REFERENCES ")[-1].split(", ")
-                    ref_tables = [table_column.split()[0] for table_column in ref_tables_columns]
-                    ref_columns = [table_column.split()[1] for table_column in ref_tables_columns]
-                    foreign_key = ForeignKey(tables=ref_tables, columns=ref_columns)
-                else:
-                    foreign_key = None
-                
-                columns.append(Column(name=column_name, data_type=DataType(dbml=data_type, sqlalchemy="", sql=""), foreign_key=foreign_key))
-        return columns
+        - statement_text (str): The text of the statement.
+        """
+        if self.fast:
+            scanned = scan_statement(statement_text)
+            if scanned is not None:
+                self.add_statement(scanned)
+                return
+        for statement in _tokenize(statement_text):
+            self.handle_statement(statement)
 
-    def handle_foreign_key(self, identifier):
+    @instrumented("sql.add_statement")
+    def add_statement(self, scanned):
         """
-        Handle FOREIGN KEY constraints.
+        Add the object defined by a recognised statement to the Database.
+
+        Args:
+        - scanned (ScannedStatement): The statement, from `scan_statement` or one of the handlers.
+        """
+        schema_name = scanned.schema or self.current_schema.name
+        if scanned.kind == "TABLE":
+            def primary_key_of(ref_table, columns):
+                # A table can only reference itself or a table created before it.
+                ref_schema, _, ref_name = ref_table.rpartition(".")
+                ref_schema = ref_schema or schema_name
+                if (ref_schema, ref_name) == (schema_name, scanned.name):
+                    return primary_key(columns)
+                target = self.database.schemas.get(ref_schema)
+                target = target.tables.get(ref_name) if target is not None else None
+                return primary_key(target.columns) if target is not None else None
+            table = Table(name=scanned.name, columns=build_columns(scanned.body, primary_key_of))
+            self.database.add_table(table, schema_name)
+        elif scanned.kind == "TYPE":
+            self.database.add_enum(Enum(name=scanned.name, values=scanned.body), schema_name)
+        elif scanned.kind == "VIEW":
+            self.database.add_view(View(name=scanned.name, sql=scanned.body), schema_name)
+
+    def handle_statement(self, statement):
+        """
+        Dispatch a single SQL statement to its handler.
+
+        Args:
+        - statement (sqlparse.sql.Statement): The SQL statement to be parsed.
+        """
+        kind, _ = _created_kind(_leaf_values(statement))
+        if kind == "TABLE":
+            self.handle_create_table(statement)
+        elif kind == "TYPE":
+            self.handle_create_type(statement)
+        elif kind == "VIEW":
+            self.handle_create_view(statement)
+
+    @instrumented("sql.handle_create_table")
+    def handle_create_table(self, statement):
+        """
+        Handle CREATE TABLE statements.
         
         Args:
-        - identifier (sqlparse.sql.Identifier): The identifier containing the foreign key information.
+        - statement (sqlparse.sql.Statement): The SQL statement to be parsed.
         """
-        fk_info = identifier.value.partition("FOREIGN KEY")[-1].strip()
-        table_name, column_name = fk_info.strip("()").split()
-        foreign_key = ForeignKey(table=table_name, column=column_name)
-        self.current_schema.tables[table_name].columns[column_name].foreign_key = foreign_key
+        values = _leaf_values(statement)
+        _, i = _created_kind(values)
+        schema, name, i = _qualified_name(values, _skip_words(values, i, {"IF", "NOT", "EXISTS"}))
+        i = _skip_whitespace(values, i)
+        definitions = []
+        if i < len(values) and values[i] == "(":
+            definitions = split_top_level("".join(values[i + 1:_closing_parenthesis(values, i)]))
+        self.add_statement(ScannedStatement("TABLE", schema, name, definitions))
 
+    @instrumented("sql.handle_create_type")
     def handle_create_type(self, statement):
         """
-        Handle CREATE TYPE (enums) statements.
+        Handle CREATE TYPE (enums) statements. Other kinds of types are ignored.
         
         Args:
         - statement (sqlparse.sql.Statement): The SQL statement to be parsed.
         """
-        enum_name = next(token for token in statement.tokens if isinstance(token, Identifier)).get_real_name()
-        enum_values = next(token.value for token in statement.tokens if isinstance(token, Parenthesis))
-        enum = Enum(name=enum_name, values=enum_values)
-        self.current_schema.enums[enum_name] = enum
+        values = _leaf_values(statement)
+        _, i = _created_kind(values)
+        schema, name, i = _qualified_name(values, i)
+        words = []
+        while i < len(values) and values[i] != "(":
+            words.extend(values[i].upper().split())
+            i += 1
+        if words != ["AS", "ENUM"]:
+            return
+        enum_values = parse_enum_values("".join(values[i + 1:_closing_parenthesis(values, i)]))
+        if enum_values is not None:
+            self.add_statement(ScannedStatement("TYPE", schema, name, enum_values))
 
+    @instrumented("sql.handle_create_view")
     def handle_create_view(self, statement):
         """
         Handle CREATE VIEW statements.
@@ -106,7 +220,200 @@ class SQLtoAlkahest:
         Args:
         - statement (sqlparse.sql.Statement): The SQL statement to be parsed.
         """
-        view_name = next(token for token in statement.tokens if isinstance(token, Identifier)).get_real_name()
-        sql_query = " ".join(token.value for token in statement.tokens if not isinstance(token, (Identifier, Keyword.DDL)))
-        view = View(name=view_name, sql=sql_query)
-        self.current_schema.views[view_name] = view
+        values = _leaf_values(statement)
+        _, i = _created_kind(values)
+        schema, name, i = _qualified_name(values, i)
+        depth = 0
+        while i < len(values) and not (depth == 0 and values[i].upper() == "AS"):
+            depth += values[i] == "("
+            depth -= values[i] == ")"
+            i += 1
+        sql_query = "".join(values[i + 1:]).strip()
+        if sql_query.endswith(";"):
+            sql_query = sql_query[:-1].rstrip()
+        self.add_statement(ScannedStatement("VIEW", schema, name, sql_query))
+
+@instrumented("sql.tokenize")
+def _tokenize(sql_string):
+    """
+    Tokenizes SQL text into sqlparse statements.
+    """
+    return sqlparse.parse(sql_string)
+
+# Keywords that can come between CREATE and the kind of object created.
+_CREATE_MODIFIERS = {"OR", "REPLACE", "GLOBAL", "LOCAL", "TEMP", "TEMPORARY", "UNLOGGED", "RECURSIVE", "MATERIALIZED"}
+
+def _leaf_values(statement):
+    """
+    Returns the values of the leaf tokens of a statement, with comments replaced by a space.
+    """
+    return [" " if token.ttype in Comment else token.value for token in statement.flatten()]
+
+def _skip_whitespace(values, i):
+    while i < len(values) and values[i].isspace():
+        i += 1
+    return i
+
+def _skip_words(values, i, words):
+    """
+    Returns the index of the first token from `i` on that is neither whitespace nor made of `words`.
+
+    sqlparse yields some keyword sequences, such as "IF NOT EXISTS", as a single token.
+    """
+    i = _skip_whitespace(values, i)
+    while i < len(values) and set(values[i].upper().split()) <= words:
+        i = _skip_whitespace(values, i + 1)
+    return i
+
+def _created_kind(values):
+    """
+    Returns the kind of object ("TABLE", "TYPE" or "VIEW") a statement creates, or None, and the
+    index of the token after the kind keyword.
+    """
+    i = _skip_whitespace(values, 0)
+    words = values[i].upper().split() if i < len(values) else []
+    if words[:1] != ["CREATE"]:
+        return None, i
+    words = [word for word in words[1:] if word not in _CREATE_MODIFIERS]
+    while not words:
+        i = _skip_whitespace(values, i + 1)
+        if i == len(values):
+            return None, i
+        words = [word for word in values[i].upper().split() if word not in _CREATE_MODIFIERS]
+    return (words[0] if words[0] in ("TABLE", "TYPE", "VIEW") else None), i + 1
+
+def _qualified_name(values, i):
+    """
+    Returns the schema and name of the possibly qualified name starting at `i`, and the index after it.
+    """
+    i = _skip_whitespace(values, i)
+    name = values[i]
+    j = _skip_whitespace(values, i + 1)
+    if j < len(values) and values[j] == ".":
+        i = _skip_whitespace(values, j + 1)
+        name = f"{name}.{values[i]}"
+    schema, name = split_qualified_name(name)
+    return schema, name, i + 1
+
+def _closing_parenthesis(values, i):
+    """
+    Returns the index of the parenthesis closing the one at `i`.
+    """
+    depth = 0
+    for j in range(i, len(values)):
+        depth += values[j] == "("
+        depth -= values[j] == ")"
+        if depth == 0:
+            return j
+    return len(values)
+
+def parser_version():
+    """
+    Returns a string identifying everything that determines the Database parsed from a SQL string.
+
+    Returns:
+    - str: The parser revision and sqlparse version.
+    """
+    return f"sql-{PARSER_REVISION}-sqlparse-{sqlparse.__version__}"
+
+@instrumented("sql.parse", count=count_database_objects)
+def parse_sql_stream(source, default_schema="public", encoding="utf-8"):
+    """
+    Parse a SQL file or text stream into a Database without loading it whole.
+
+    Args:
+    - source (str, os.PathLike or TextIO): The path of the SQL file, or an open text stream.
+    - default_schema (str, optional): The default schema to use if not provided. Defaults to "public".
+    - encoding (str, optional): The encoding used when `source` is a path. Defaults to "utf-8".
+
+    Returns:
+    - Database: The parsed database.
+    """
+    parser = SQLtoAlkahest("", default_schema=default_schema)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=encoding) as stream:
+            parser.parse_stream(stream)
+    else:
+        parser.parse_stream(source)
+    return parser.database
+
+def parse_sql_parallel(source, default_schema="public", workers=None, chunk_size=None, encoding="utf-8"):
+    """
+    Parse a SQL file or text stream into a Database using a pool of worker processes.
+
+    The text is split at statement boundaries with `split_statements`, grouped into chunks of
+    roughly `chunk_size` characters and tokenized in parallel. Chunks are merged in source order,
+    so the result is the same as a serial parse.
+
+    Args:
+    - source (str, os.PathLike or TextIO): The path of the SQL file, or an open text stream.
+    - default_schema (str, optional): The default schema to use if not provided. Defaults to "public".
+    - workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+    - chunk_size (int, optional): The target chunk size in characters. Defaults to a quarter of
+      each worker's share of the file when its size is known, and DEFAULT_CHUNK_SIZE otherwise.
+    - encoding (str, optional): The encoding used when `source` is a path. Defaults to "utf-8".
+
+    Returns:
+    - Database: The parsed database.
+    """
+    workers = workers or os.cpu_count() or 1
+    if isinstance(source, (str, os.PathLike)):
+        if chunk_size is None:
+            chunk_size = max(MIN_CHUNK_SIZE, os.path.getsize(source) // (workers * 4))
+        with open(source, encoding=encoding) as stream:
+            return _parse_chunks(stream, default_schema, workers, chunk_size)
+    return _parse_chunks(source, default_schema, workers, chunk_size or DEFAULT_CHUNK_SIZE)
+
+def _parse_chunks(stream, default_schema, workers, chunk_size):
+    """
+    Parse the chunks of a stream in a process pool and merge the results in order.
+    """
+    chunks = _chunk_statements(stream, chunk_size)
+    if workers == 1:
+        databases = (_parse_chunk(chunk, default_schema) for chunk in chunks)
+        return _merge_databases(databases, default_schema)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        databases = executor.map(_parse_chunk, chunks, [default_schema] * len(chunks))
+        return _merge_databases(databases, default_schema)
+
+def _chunk_statements(stream, chunk_size):
+    """
+    Group the statements of a stream into chunks of at least `chunk_size` characters.
+    """
+    chunks = []
+    chunk = []
+    size = 0
+    for statement in split_statements(stream):
+        chunk.append(statement)
+        size += len(statement)
+        if size >= chunk_size:
+            chunks.append("".join(chunk))
+            chunk = []
+            size = 0
+    if chunk:
+        chunks.append("".join(chunk))
+    return chunks
+
+def _parse_chunk(sql_string, default_schema):
+    """
+    Parse one chunk of SQL statements in a worker process.
+    """
+    parser = SQLtoAlkahest(sql_string, default_schema=default_schema)
+    parser.parse()
+    return parser.database
+
+def _merge_databases(databases, default_schema):
+    """
+    Merge per-chunk databases into one, later definitions replacing earlier ones as in a serial parse.
+    """
+    merged = Database()
+    merged.add_schema(Schema(name=default_schema))
+    for database in databases:
+        for name, schema in database.schemas.items():
+            for table in schema.tables.values():
+                merged.add_table(table, name)
+            for enum in schema.enums.values():
+                merged.add_enum(enum, name)
+            for view in schema.views.values():
+                merged.add_view(view, name)
+    return merged
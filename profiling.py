@@ -0,0 +1,226 @@
+import functools
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+# The callbacks notified at the end of every phase. Instrumented functions skip all bookkeeping while
+# this is empty, so instrumentation costs one list check per call when nobody is listening.
+_listeners = []
+
+# The phases being measured while memory is traced, innermost last.
+_memory_stack = []
+_memory_tracers = 0
+
+@dataclass(slots=True)
+class PhaseStats:
+    """
+    The measurements collected for one phase.
+
+    Times are inclusive: a phase running inside another counts towards both.
+
+    Attributes:
+        calls: The number of times the phase ran.
+        seconds: The total wall time.
+        objects: The total number of objects the phase produced, where it reports them.
+        peak_bytes: The highest traced memory above the start of any one run, if memory was traced.
+    """
+    calls: int = 0
+    seconds: float = 0.0
+    objects: int = 0
+    peak_bytes: int = 0
+
+    def add(self, seconds, objects=0, peak_bytes=0, calls=1):
+        self.calls += calls
+        self.seconds += seconds
+        self.objects += objects
+        self.peak_bytes = max(self.peak_bytes, peak_bytes)
+
+class Phase:
+    """
+    Measures one run of a named phase and notifies the listeners when it ends.
+
+    Use as a context manager around code that is not a function of its own, and set `objects` to the
+    number of objects it produced, if that is meaningful.
+
+    Attributes:
+        name (str): The name of the phase, such as "sql.tokenize".
+        objects (int): The number of objects produced.
+    """
+    __slots__ = ("name", "objects", "_start", "_memory_start", "_peak")
+
+    def __init__(self, name):
+        self.name = name
+        self.objects = 0
+
+    def __enter__(self):
+        if _memory_tracers:
+            current, peak = tracemalloc.get_traced_memory()
+            if _memory_stack:
+                _memory_stack[-1]._peak = max(_memory_stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._memory_start = self._peak = current
+            _memory_stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self._start
+        peak_bytes = 0
+        if _memory_stack and _memory_stack[-1] is self:
+            _memory_stack.pop()
+            peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            if _memory_stack:
+                _memory_stack[-1]._peak = max(_memory_stack[-1]._peak, peak)
+            peak_bytes = peak - self._memory_start
+        for listener in list(_listeners):
+            listener(self.name, seconds, self.objects, peak_bytes)
+
+def phase(name):
+    """
+    Returns a context manager measuring a block of code as a run of the named phase.
+
+    Args:
+        name (str): The name of the phase.
+
+    Returns:
+        Phase: The context manager.
+    """
+    return Phase(name)
+
+def instrumented(name, count=None):
+    """
+    Decorates a function so that each call is measured as a run of the named phase.
+
+    Args:
+        name (str): The name of the phase.
+        count (Callable[[Any], int], optional): Returns the number of objects in the function's result.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _listeners:
+                return function(*args, **kwargs)
+            with Phase(name) as measured:
+                result = function(*args, **kwargs)
+                if count is not None:
+                    measured.objects = count(result)
+            return result
+        return wrapper
+    return decorator
+
+def add_listener(listener):
+    """
+    Starts calling `listener(name, seconds, objects, peak_bytes)` at the end of every phase.
+    """
+    _listeners.append(listener)
+
+def remove_listener(listener):
+    """
+    Stops calling a listener added with `add_listener`.
+    """
+    _listeners.remove(listener)
+
+def count_database_objects(database):
+    """
+    Returns the number of schemas, tables, columns, enums and views in a Database.
+    """
+    return sum(
+        1 + len(schema.enums) + len(schema.views) + sum(1 + len(table.columns) for table in schema.tables.values())
+        for schema in database.schemas.values()
+    )
+
+class Profile:
+    """
+    Collects the measurements of every phase that runs while it is active.
+
+    Use as a context manager, or call `start` and `stop`:
+
+        with Profile() as profile:
+            load_dbml(dbml_string)
+        print(profile.report())
+
+    Memory tracing with tracemalloc slows everything down several times, so it is off by default,
+    and its peaks are only meaningful for phases running on one thread.
+
+    Attributes:
+        phases (Dict[str, PhaseStats]): The measurements of each phase, by name.
+        trace_memory (bool): Whether tracemalloc peaks are recorded.
+    """
+    def __init__(self, trace_memory=False):
+        """
+        Initializes an inactive Profile.
+
+        Args:
+            trace_memory (bool, optional): Whether to record tracemalloc peaks. Defaults to False.
+        """
+        self.phases = {}
+        self.trace_memory = trace_memory
+        self._started_tracemalloc = False
+
+    def __call__(self, name, seconds, objects, peak_bytes):
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        stats.add(seconds, objects, peak_bytes)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Starts collecting measurements.
+        """
+        global _memory_tracers
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            _memory_tracers += 1
+        add_listener(self)
+
+    def stop(self):
+        """
+        Stops collecting measurements.
+        """
+        global _memory_tracers
+        remove_listener(self)
+        if self.trace_memory:
+            _memory_tracers -= 1
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def merge(self, phases):
+        """
+        Adds the measurements of another profile, such as one collected in a worker process.
+
+        Args:
+            phases (Dict[str, PhaseStats]): The other profile's `phases`.
+        """
+        for name, other in phases.items():
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats()
+            stats.add(other.seconds, other.objects, other.peak_bytes, calls=other.calls)
+
+    def report(self):
+        """
+        Formats the measurements as a table, slowest phase first.
+
+        Returns:
+            str: The report.
+        """
+        lines = [f"{'phase':<28} {'calls':>8} {'total ms':>11} {'mean ms':>9} {'objects':>9}" + (f" {'peak KiB':>10}" if self.trace_memory else "")]
+        for name, stats in sorted(self.phases.items(), key=lambda item: -item[1].seconds):
+            line = f"{name:<28} {stats.calls:>8} {stats.seconds * 1000:>11.2f} {stats.seconds * 1000 / stats.calls:>9.3f} {stats.objects:>9}"
+            if self.trace_memory:
+                line += f" {stats.peak_bytes / 1024:>10.1f}"
+            lines.append(line)
+        return "\n".join(lines)
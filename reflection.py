@@ -0,0 +1,163 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+import sqlalchemy
+from classes import Column, Database, Enum, ForeignKey, Table, View
+from sqlalchemy_metadata import RawType, model_data_type
+
+# Schemas holding the database's own catalog rather than user objects.
+SYSTEM_SCHEMAS = {"information_schema", "pg_catalog", "pg_toast", "sys", "mysql", "performance_schema"}
+
+# The statement around a view's query, which some dialects such as SQLite return with the definition.
+_VIEW_PREFIX = re.compile(r"\A\s*CREATE\s.*?\bVIEW\b.*?\bAS\b\s*", re.IGNORECASE | re.DOTALL)
+
+def reflect_database(url, schemas=None, name=None, default_schema="public", workers=1, views=True):
+    """
+    Builds a Database from the tables, views and enums of a live database.
+
+    Each schema is read with one batched Inspector call per kind of object (columns, primary keys,
+    foreign keys, unique constraints, indexes, comments) rather than one call per table, which
+    dialects with a set-based catalog like PostgreSQL answer with a single query each. View
+    definitions are read one view at a time. SQLite's Inspector runs several queries per table, so
+    SQLite schemas are read with one query per kind of object over its pragma functions instead, and
+    their column types are kept as declared. With more than one worker, schemas are read concurrently, each over its own pooled
+    connection, and the Database is then built from the results on the calling thread.
+
+    Args:
+        url (Union[str, sqlalchemy.engine.Engine]): The connection URL, such as "sqlite:///app.db", or an
+            Engine to reuse, which is left open.
+        schemas (List[str], optional): The schemas to read. Defaults to every non-system schema.
+        name (str, optional): The name of the database. Defaults to None.
+        default_schema (str, optional): The name given to the connection's default schema, such as
+            "main" in SQLite. Defaults to "public".
+        workers (int, optional): The number of schemas to read concurrently. Defaults to 1.
+        views (bool, optional): Whether to read views. Defaults to True.
+
+    Returns:
+        Database: The database.
+    """
+    engine = url if isinstance(url, sqlalchemy.engine.Engine) else sqlalchemy.create_engine(url)
+    try:
+        with engine.connect() as connection:
+            inspector = sqlalchemy.inspect(connection)
+            dialect_default = inspector.default_schema_name
+            if schemas is None:
+                schemas = [schema for schema in inspector.get_schema_names() if schema not in SYSTEM_SCHEMAS]
+            enums = inspector.get_enums(schema="*") if hasattr(inspector, "get_enums") else []
+        schema_args = [None if schema in (None, dialect_default) else schema for schema in schemas]
+        read = lambda schema: _read_schema(engine, schema, views)
+        if workers > 1 and len(schema_args) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(read, schema_args))
+        else:
+            results = [read(schema) for schema in schema_args]
+    finally:
+        if engine is not url:
+            engine.dispose()
+
+    model_schema = lambda schema: default_schema if schema in (None, dialect_default) else schema
+    database = Database(name=name)
+    for enum in enums:
+        database.add_enum(Enum(name=enum["name"], values=list(enum["labels"])), model_schema(enum["schema"]))
+    data_types = {}
+    for schema, result in zip(schema_args, results):
+        _add_schema(database, model_schema(schema), result, model_schema, data_types)
+    return database
+
+def _read_schema(engine, schema, views):
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            return _read_sqlite_schema(connection, schema, views)
+        inspector = sqlalchemy.inspect(connection)
+        result = {
+            "columns": inspector.get_multi_columns(schema=schema),
+            "primary_keys": inspector.get_multi_pk_constraint(schema=schema),
+            "foreign_keys": inspector.get_multi_foreign_keys(schema=schema),
+            "unique": inspector.get_multi_unique_constraints(schema=schema),
+            # SQLite reports inline UNIQUE columns only through the indexes it creates for them.
+            "indexes": inspector.get_multi_indexes(schema=schema, **({"include_auto_indexes": True} if engine.dialect.name == "sqlite" else {})),
+        }
+        try:
+            result["comments"] = inspector.get_multi_table_comment(schema=schema)
+        except NotImplementedError:
+            result["comments"] = {}
+        result["views"] = {view: inspector.get_view_definition(view, schema=schema) for view in inspector.get_view_names(schema=schema)} if views else {}
+    return result
+
+def _read_sqlite_schema(connection, schema, views):
+    # The same results as _read_schema, from one query per kind of object joining each table in
+    # sqlite_master with the pragma table-valued functions.
+    schema_name = schema or "main"
+    tables = '"{}".sqlite_master AS m'.format(schema_name.replace('"', '""'))
+    schema_arg = "'{}'".format(schema_name.replace("'", "''"))
+    only_tables = "m.type = 'table' AND m.name NOT LIKE 'sqlite\\_%' ESCAPE '\\'"
+    cursor = connection.connection.cursor()
+    run = lambda sql: cursor.execute(sql).fetchall()
+    raw_types = {}
+    result = {"columns": {}, "primary_keys": {}, "foreign_keys": {}, "unique": {}, "indexes": {}, "comments": {}, "views": {}}
+
+    primary_keys = {}
+    for table, column, declared, not_null, default, position in run(
+            f"SELECT m.name, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk FROM {tables}, pragma_table_info(m.name, {schema_arg}) AS p "
+            f"WHERE {only_tables} ORDER BY m.name, p.cid"):
+        key = (schema, table)
+        result["columns"].setdefault(key, []).append({"name": column, "type": raw_types.get(declared) or raw_types.setdefault(declared, RawType(declared)), "nullable": not not_null, "default": default})
+        if position:
+            primary_keys.setdefault(key, []).append((position, column))
+    for key, columns in primary_keys.items():
+        result["primary_keys"][key] = {"constrained_columns": [column for _, column in sorted(columns)]}
+
+    foreign_keys = {}
+    for table, number, target, column, target_column in run(
+            f"SELECT m.name, f.id, f.\"table\", f.\"from\", f.\"to\" FROM {tables}, pragma_foreign_key_list(m.name, {schema_arg}) AS f "
+            f"WHERE {only_tables} ORDER BY m.name, f.id, f.seq"):
+        foreign_key = foreign_keys.get((table, number))
+        if foreign_key is None:
+            foreign_key = foreign_keys[table, number] = {"referred_schema": schema, "referred_table": target, "constrained_columns": [], "referred_columns": []}
+            result["foreign_keys"].setdefault((schema, table), []).append(foreign_key)
+        foreign_key["constrained_columns"].append(column)
+        # A foreign key without target columns references the primary key of its target.
+        foreign_key["referred_columns"].append(target_column)
+    for foreign_key in foreign_keys.values():
+        if None in foreign_key["referred_columns"]:
+            foreign_key["referred_columns"] = result["primary_keys"].get((schema, foreign_key["referred_table"]), {}).get("constrained_columns", [])
+
+    indexes = {}
+    for table, index, column in run(
+            f"SELECT m.name, i.name, c.name FROM {tables}, pragma_index_list(m.name, {schema_arg}) AS i, pragma_index_info(i.name, {schema_arg}) AS c "
+            f"WHERE {only_tables} AND i.\"unique\" AND i.origin != 'pk'"):
+        indexes.setdefault((table, index), []).append(column)
+    for (table, index), columns in indexes.items():
+        result["indexes"].setdefault((schema, table), []).append({"name": index, "column_names": columns, "unique": True})
+
+    if views:
+        result["views"] = dict(run(f"SELECT m.name, m.sql FROM {tables} WHERE m.type = 'view'"))
+    cursor.close()
+    return result
+
+def _add_schema(database, schema_name, result, model_schema, data_types):
+    for key, reflected_columns in result["columns"].items():
+        primary_key = set(result["primary_keys"].get(key, {}).get("constrained_columns") or ())
+        unique = {constraint["column_names"][0] for constraint in result["unique"].get(key, ()) if len(constraint["column_names"]) == 1}
+        unique.update(index["column_names"][0] for index in result["indexes"].get(key, ()) if index["unique"] and len(index["column_names"]) == 1)
+        foreign_keys = {}
+        for foreign_key in result["foreign_keys"].get(key, ()):
+            target_schema = model_schema(foreign_key["referred_schema"])
+            target = foreign_key["referred_table"] if target_schema == schema_name else f"{target_schema}.{foreign_key['referred_table']}"
+            for column_name, target_column in zip(foreign_key["constrained_columns"], foreign_key["referred_columns"]):
+                foreign_keys.setdefault(column_name, []).append(ForeignKey(tables=[target], columns=[target_column]))
+        table = Table(name=key[1], notes=result["comments"].get(key, {}).get("text"))
+        for reflected in reflected_columns:
+            column_name = reflected["name"]
+            table.columns[column_name] = Column(
+                name=column_name,
+                data_type=model_data_type(reflected["type"], database, schema_name, data_types),
+                nullable=bool(reflected["nullable"]),
+                primary_key=column_name in primary_key,
+                default_value=reflected.get("default"),
+                unique=column_name in unique,
+                foreign_keys=foreign_keys.get(column_name),
+                notes=reflected.get("comment"),
+            )
+        database.add_table(table, schema_name)
+    for view_name, definition in result["views"].items():
+        database.add_view(View(name=view_name, sql=_VIEW_PREFIX.sub("", definition)), schema_name)
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from operator import attrgetter
+from classes import Table, View, Enum
+
+# Bump when the fingerprint or the rendered output changes, so persisted caches are not reused.
+CACHE_VERSION = 6
+
+_column_fields = attrgetter("name", "data_type.dbml", "data_type.sqlalchemy", "data_type.sql", "nullable",
+                            "primary_key", "default_value", "unique", "check", "exclude", "notes")
+
+def _column_content(column):
+    # Cached on the column, like its structural hash; see `Table.invalidate` for in-place edits.
+    content = column._fingerprint
+    if content is None:
+        content = _column_fields(column)
+        if column.foreign_keys:
+            content += (tuple((tuple(fk.tables or ()), tuple(fk.columns or ())) for fk in column.foreign_keys),)
+        column._fingerprint = content
+    return content
+
+def fingerprint(obj):
+    """
+    Computes a content fingerprint of a Table, Enum or View.
+
+    The fingerprint covers every field a rendering can depend on, so two objects with the same
+    fingerprint render to the same text in any output format. Enums and Views are fingerprinted by a
+    tuple of plain values, which is hashed and compared in C and can be pickled with the cache.
+
+    A Table is fingerprinted by a 16-byte digest of that tuple, cached on the table along with the
+    tuples of its Columns, so re-rendering an unchanged table neither revisits its columns nor
+    rehashes their content. The `Database` add methods discard the cache where a table changes
+    schema; after editing a Table or its Columns in place, call `Database.touch`, or
+    `Table.invalidate` for a table outside a Database.
+
+    Args:
+        obj (Table, Enum or View): The object to fingerprint.
+
+    Returns:
+        Union[tuple, bytes]: The object's content, or for a Table its digest.
+    """
+    if isinstance(obj, Table):
+        digest = obj._fingerprint
+        if digest is None:
+            content = ("Table", obj.name, obj.schema, obj.notes, tuple(map(_column_content, obj.columns.values())))
+            digest = obj._fingerprint = hashlib.blake2b(repr(content).encode(), digest_size=16).digest()
+        return digest
+    elif isinstance(obj, View):
+        return ("View", obj.name, obj.sql, obj.notes, tuple(map(_column_content, obj.columns)))
+    elif isinstance(obj, Enum):
+        return ("Enum", obj.name, tuple(obj.values))
+    else:
+        raise TypeError("Unsupported type for fingerprinting")
+
+class RenderCache:
+    """
+    A bounded cache of rendered Table, Enum and View fragments for the Translator.
+
+    Fragments are keyed by output format and content fingerprint, so an unchanged object reuses its
+    text and an edited one misses. Least recently used entries are evicted once the cache is full.
+
+    Attributes:
+        max_entries (int): The maximum number of fragments kept.
+        path (Optional[str]): The file the cache is loaded from and saved to, if persisted.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to render.
+    """
+    cached_types = (Table, View, Enum)
+
+    def __init__(self, max_entries=100_000, path=None):
+        """
+        Initializes a RenderCache, loading it from `path` if that file exists.
+
+        Args:
+            max_entries (int, optional): The maximum number of fragments kept. Defaults to 100000.
+            path (str, optional): The file to persist the cache to. Defaults to None, for an in-memory cache.
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, output_format, obj):
+        """
+        Returns the cache key of an object rendered in an output format.
+        """
+        return output_format, fingerprint(obj)
+
+    def get(self, key):
+        """
+        Returns the fragment cached under `key`, or None on a miss.
+        """
+        text = self.entries.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        """
+        Caches a fragment under `key`, evicting the least recently used fragments if the cache is full.
+        """
+        self.entries[key] = text
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        """
+        Loads the cache from `path`, ignoring files written by another cache version.
+        """
+        with open(self.path, "rb") as f:
+            version, entries = pickle.load(f)
+        if version != CACHE_VERSION:
+            return
+        for key, text in entries:
+            self.put(key, text)
+
+    def save(self):
+        """
+        Saves the cache to `path`, replacing the file atomically.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+            pickle.dump((CACHE_VERSION, list(self.entries.items())), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, self.path)
@@ -0,0 +1,175 @@
+import dataclasses
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import tempfile
+from operator import attrgetter
+from classes import Column, ForeignKey, Relationship, Table, Enum, View, Schema, Database
+from parse import dbml_lark, sql_sqlparse
+
+# The constructor arguments of each model class, in order.
+_INIT_NAMES = {
+    cls: tuple(f.name for f in dataclasses.fields(cls) if f.init)
+    for cls in (Column, ForeignKey, Relationship, Table, Enum, View, Schema, Database)
+}
+_INIT_FIELDS = {cls: attrgetter(*names) for cls, names in _INIT_NAMES.items()}
+
+# Snapshot files start with this header, followed by a pickle of the Database. Model objects are
+# pickled as positional constructor arguments, so the header includes a signature of the classes'
+# fields and a snapshot written before a field was added, removed or reordered is not loaded.
+MAGIC = b"ALKS"
+FORMAT_VERSION = 1
+LAYOUT = hashlib.blake2b(repr([(cls.__name__, names) for cls, names in _INIT_NAMES.items()]).encode(), digest_size=8).digest()
+HEADER = MAGIC + bytes([FORMAT_VERSION]) + LAYOUT
+
+class _SnapshotPickler(pickle.Pickler):
+    """
+    Pickles model objects as their class and constructor arguments.
+
+    This is about twice as fast to load as the default state dictionaries of slotted classes, and a
+    Database rebuilds its indexes on construction, so they do not need to be stored.
+    """
+    def reducer_override(self, obj):
+        fields = _INIT_FIELDS.get(type(obj))
+        # A column pointing back at its table is part of a cycle, which only the default reduction handles.
+        if fields is None or getattr(obj, "table", None) is not None:
+            return NotImplemented
+        return type(obj), fields(obj)
+
+def save_snapshot(database, path):
+    """
+    Saves a Database to a binary snapshot file.
+
+    The whole Database -> Schema -> Table -> Column graph is written in one pass. Objects referenced
+    more than once, such as interned DataTypes, are stored once and stay shared when loaded. The file
+    is replaced atomically.
+
+    Args:
+        database (Database): The database to save.
+        path (str): The path of the snapshot file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as f:
+        f.write(HEADER)
+        _SnapshotPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(database)
+    os.replace(f.name, path)
+
+def load_snapshot(path):
+    """
+    Loads a Database from a binary snapshot file.
+
+    The file is memory-mapped and unpickled straight from the mapping, without reading it into an
+    intermediate buffer. Snapshots are only meant to be read from a cache directory you control,
+    since unpickling runs code named in the file.
+
+    Args:
+        path (str): The path of the snapshot file.
+
+    Returns:
+        Database: The loaded database.
+
+    Raises:
+        ValueError: If the file is not a snapshot of the current format version and model layout.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if mapped[:len(HEADER)] != HEADER:
+            raise ValueError(f"Not an Alkahest snapshot of format version {FORMAT_VERSION} and the current model layout: {path}")
+        with memoryview(mapped) as view:
+            return pickle.loads(view[len(HEADER):])
+
+class SnapshotCache:
+    """
+    A directory of Database snapshots keyed by the content hash of their source and the parser version.
+
+    A source file that has not changed since it was last parsed by the same parser is loaded from its
+    snapshot instead of being parsed again.
+
+    Attributes:
+        cache_dir (str): The directory holding the snapshots.
+        hits (int): The number of loads served from a snapshot.
+        misses (int): The number of loads that had to parse.
+    """
+    def __init__(self, cache_dir):
+        """
+        Initializes a SnapshotCache, creating the directory if needed.
+
+        Args:
+            cache_dir (str): The directory holding the snapshots.
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, source, parser_version):
+        """
+        Returns the snapshot path for a source text and parser version.
+
+        Args:
+            source (bytes): The raw contents of the source file.
+            parser_version (str): A string identifying the parser, such as `dbml_lark.parser_version()`.
+
+        Returns:
+            str: The path of the snapshot file.
+        """
+        digest = hashlib.sha256(parser_version.encode("utf-8") + b"\0" + source).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.alks")
+
+    def load(self, source_path, parser_version, parse, encoding="utf-8"):
+        """
+        Loads the Database for a source file, from its snapshot on a hit or by parsing it on a miss.
+
+        Args:
+            source_path (str): The path of the DBML or SQL file.
+            parser_version (str): A string identifying the parser.
+            parse (Callable[[str], Database]): Parses the decoded source text on a miss.
+            encoding (str, optional): The encoding of the source file. Defaults to "utf-8".
+
+        Returns:
+            Database: The database.
+        """
+        with open(source_path, "rb") as f:
+            source = f.read()
+        snapshot_path = self.path_for(source, parser_version)
+        try:
+            database = load_snapshot(snapshot_path)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            database = None
+        if database is not None:
+            self.hits += 1
+            return database
+        self.misses += 1
+        database = parse(source.decode(encoding))
+        save_snapshot(database, snapshot_path)
+        return database
+
+def load_dbml_file(path, cache_dir):
+    """
+    Loads a DBML file into a Database, using a snapshot cache.
+
+    Args:
+        path (str): The path of the DBML file.
+        cache_dir (str): The directory holding the snapshots.
+
+    Returns:
+        Database: The database.
+    """
+    return SnapshotCache(cache_dir).load(path, dbml_lark.parser_version(), dbml_lark.load_dbml)
+
+def load_sql_file(path, cache_dir, default_schema="public"):
+    """
+    Loads a SQL file into a Database, using a snapshot cache.
+
+    Args:
+        path (str): The path of the SQL file.
+        cache_dir (str): The directory holding the snapshots.
+        default_schema (str, optional): The default schema to use if not provided. Defaults to "public".
+
+    Returns:
+        Database: The database.
+    """
+    def parse(sql_string):
+        return sql_sqlparse.parse_sql_stream(io.StringIO(sql_string), default_schema=default_schema)
+    return SnapshotCache(cache_dir).load(path, f"{sql_sqlparse.parser_version()}-{default_schema}", parse)
@@ -0,0 +1,209 @@
+import ast
+import functools
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import UserDefinedType
+from classes import Column, Database, Enum, ForeignKey, Table, intern_data_type
+from parse.ddl_scanner import sqlalchemy_type_name
+
+class RawType(UserDefinedType):
+    """
+    A SQLAlchemy type standing for a column type Alkahest has no mapping for, rendered as written.
+
+    Attributes:
+        text (str): The type as written in SQL.
+    """
+    cache_ok = True
+
+    def __init__(self, text):
+        self.text = text
+
+    def get_col_spec(self, **kw):
+        return self.text
+
+    def __repr__(self):
+        return f"RawType({self.text!r})"
+
+@functools.lru_cache(maxsize=None)
+def sqlalchemy_type(data_type):
+    """
+    Returns the SQLAlchemy type for a DataType, creating it on first use.
+
+    The `sqlalchemy` field is used when it names a SQLAlchemy type, and the SQL or DBML type name
+    otherwise. DataTypes are interned and immutable, so each distinct type is mapped once and the
+    resulting type object is shared by every column using it.
+
+    Args:
+        data_type (DataType): The data type.
+
+    Returns:
+        sqlalchemy.types.TypeEngine: The SQLAlchemy type. Unknown types map to a RawType.
+    """
+    sa_type = _type_from_expression(data_type.sqlalchemy)
+    return sa_type if sa_type is not None else _type_from_sql(data_type.sql or data_type.dbml)
+
+def _type_from_sql(text):
+    # SQL and DBML types are mapped to SQLAlchemy ones as in the SQLAlchemy output of the parsers.
+    text = " ".join(text.split())
+    if text.endswith("[]"):
+        return sqlalchemy.ARRAY(_type_from_sql(text[:-2]))
+    sa_type = _type_from_expression(sqlalchemy_type_name(text))
+    return sa_type if sa_type is not None else RawType(text)
+
+def _type_from_expression(expression):
+    # The type a SQLAlchemy type expression such as "String(255)" builds, or None if it is not one.
+    try:
+        return _build_type(ast.parse(expression.strip(), mode="eval").body)
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+def _build_type(node):
+    arguments, keywords = [], {}
+    if isinstance(node, ast.Call):
+        arguments = [_build_type(argument) if isinstance(argument, (ast.Name, ast.Call)) else ast.literal_eval(argument) for argument in node.args]
+        keywords = {keyword.arg: ast.literal_eval(keyword.value) for keyword in node.keywords}
+        node = node.func
+    if not isinstance(node, ast.Name):
+        raise ValueError(f"Not a SQLAlchemy type: {ast.unparse(node)}")
+    type_class = getattr(sqlalchemy, node.id, None) or getattr(postgresql, node.id, None)
+    if not (isinstance(type_class, type) and issubclass(type_class, sqlalchemy.types.TypeEngine)):
+        raise ValueError(f"Not a SQLAlchemy type: {node.id}")
+    return type_class(*arguments, **keywords)
+
+def to_metadata(obj, metadata=None, default_schema="public"):
+    """
+    Builds SQLAlchemy Table objects for the tables of a Database or Schema.
+
+    Enums become named SQLAlchemy Enums used by the columns of that type. Views have no SQLAlchemy
+    Table equivalent and are left out.
+
+    Args:
+        obj (Union[Database, Schema]): The database or schema.
+        metadata (sqlalchemy.MetaData, optional): The MetaData to add the tables to. Defaults to a new one.
+        default_schema (str, optional): The schema whose tables get no schema in SQLAlchemy, so they
+            live in the connection's default schema. Defaults to "public".
+
+    Returns:
+        sqlalchemy.MetaData: The MetaData holding the tables.
+    """
+    metadata = sqlalchemy.MetaData() if metadata is None else metadata
+    schemas = obj.schemas.values() if isinstance(obj, Database) else [obj]
+    enums = {}
+    for schema in schemas:
+        schema_arg = None if schema.name == default_schema else schema.name
+        for enum in schema.enums.values():
+            enums[f"{schema.name}.{enum.name}"] = sqlalchemy.Enum(*enum.values, name=enum.name, schema=schema_arg, metadata=metadata)
+    for schema in schemas:
+        schema_arg = None if schema.name == default_schema else schema.name
+        for table in schema.tables.values():
+            columns = [_sqlalchemy_column(schema.name, column, enums, default_schema) for column in table.columns.values()]
+            sqlalchemy.Table(table.name, metadata, *columns, schema=schema_arg, comment=table.notes)
+    return metadata
+
+def _sqlalchemy_column(schema_name, column, enums, default_schema):
+    type_name = column.data_type.sql or column.data_type.dbml
+    column_type = enums.get(type_name if "." in type_name else f"{schema_name}.{type_name}") or sqlalchemy_type(column.data_type)
+    arguments = []
+    for foreign_key in column.foreign_keys or ():
+        for table_name, column_name in zip(foreign_key.tables, foreign_key.columns):
+            target_schema, target_table = Database.foreign_key_target(schema_name, table_name)
+            table_name = target_table if target_schema == default_schema else f"{target_schema}.{target_table}"
+            arguments.append(sqlalchemy.ForeignKey(f"{table_name}.{column_name}"))
+    if column.check:
+        arguments.append(sqlalchemy.CheckConstraint(column.check))
+    return sqlalchemy.Column(
+        column.name, column_type, *arguments,
+        primary_key=column.primary_key,
+        nullable=column.nullable,
+        unique=column.unique or None,
+        server_default=sqlalchemy.text(column.default_value) if column.default_value is not None else None,
+        comment=column.notes,
+    )
+
+def from_metadata(metadata, name=None, default_schema="public"):
+    """
+    Builds a Database from the tables of a SQLAlchemy MetaData.
+
+    Named SQLAlchemy Enums become Enums in the schema of the first table using them. Each distinct
+    SQLAlchemy type is mapped to a DataType once.
+
+    Args:
+        metadata (sqlalchemy.MetaData): The MetaData.
+        name (str, optional): The name of the database. Defaults to None.
+        default_schema (str, optional): The schema for tables without one. Defaults to "public".
+
+    Returns:
+        Database: The database.
+    """
+    database = Database(name=name)
+    data_types = {}
+    for sa_table in metadata.tables.values():
+        schema_name = sa_table.schema or default_schema
+        unique = {constraint.columns.keys()[0] for constraint in sa_table.constraints
+                  if isinstance(constraint, sqlalchemy.UniqueConstraint) and len(constraint.columns) == 1}
+        table = Table(name=sa_table.name, notes=sa_table.comment)
+        for sa_column in sa_table.columns:
+            data_type = model_data_type(sa_column.type, database, schema_name, data_types)
+            server_default = sa_column.server_default
+            default_value = getattr(server_default, "arg", None)
+            table.columns[sa_column.name] = Column(
+                name=sa_column.name,
+                data_type=data_type,
+                nullable=bool(sa_column.nullable),
+                primary_key=sa_column.primary_key,
+                default_value=getattr(default_value, "text", default_value),
+                unique=bool(sa_column.unique) or sa_column.name in unique,
+                foreign_keys=[_model_foreign_key(fk, schema_name, default_schema) for fk in sa_column.foreign_keys] or None,
+                notes=sa_column.comment,
+            )
+        database.add_table(table, schema_name)
+    return database
+
+def model_data_type(sa_type, database, schema_name, cache):
+    """
+    Returns the DataType for the SQLAlchemy type of a column.
+
+    A named SQLAlchemy Enum is added to the database as an Enum, if it is not there yet, and the
+    DataType names it. Other types are compiled with the PostgreSQL dialect once per distinct type.
+
+    Args:
+        sa_type (sqlalchemy.types.TypeEngine): The SQLAlchemy type.
+        database (Database): The database being built, to add enums to.
+        schema_name (str): The name of the schema of the column's table.
+        cache (Dict[str, DataType]): The DataTypes found so far, by the repr of their SQLAlchemy type.
+
+    Returns:
+        DataType: The data type.
+    """
+    if isinstance(sa_type, sqlalchemy.Enum) and sa_type.name:
+        return _enum_data_type(database, sa_type, schema_name)
+    key = repr(sa_type)
+    data_type = cache.get(key)
+    if data_type is None:
+        data_type = cache[key] = _data_type(sa_type)
+    return data_type
+
+def _data_type(sa_type):
+    if isinstance(sa_type, RawType):
+        return intern_data_type(dbml=sa_type.text, sqlalchemy=sqlalchemy_type_name(sa_type.text), sql=sa_type.text)
+    try:
+        sql = sa_type.compile(dialect=postgresql.dialect()).lower()
+    except sqlalchemy.exc.CompileError:
+        sql = ""
+    return intern_data_type(dbml=sql, sqlalchemy=repr(sa_type), sql=sql)
+
+def _enum_data_type(database, sa_enum, schema_name):
+    # SQLAlchemy names are quoted_name, a str subclass that sys.intern rejects.
+    enum_name = str(sa_enum.name)
+    enum_schema = str(sa_enum.schema or schema_name)
+    schema = database.schemas.get(enum_schema)
+    if schema is None or enum_name not in schema.enums:
+        database.add_enum(Enum(name=enum_name, values=list(sa_enum.enums)), enum_schema)
+    name = enum_name if enum_schema == schema_name else f"{enum_schema}.{enum_name}"
+    return intern_data_type(dbml=name, sqlalchemy=name, sql=name)
+
+def _model_foreign_key(sa_foreign_key, schema_name, default_schema):
+    table_name, _, column_name = sa_foreign_key.target_fullname.rpartition(".")
+    if "." not in table_name and schema_name != default_schema:
+        table_name = f"{default_schema}.{table_name}"
+    return ForeignKey(tables=[table_name], columns=[column_name])
@@ -1,19 +1,65 @@
+import dataclasses
+import hashlib
+import io
+import re
+from classes import DataType, Column, Table, Schema, Database, View, Enum
+from dependencies import CreationPlan, plan_creation
+from profiling import instrumented
+
 class Translator:
     """
     The Translator class provides methods to translate Alkahest objects into their respective representations
-    in DBML, SQL, and SQLAlchemy.
+    in DBML, SQL, SQLAlchemy and Markdown.
+
+    Each `to_*` method has a `write_*` counterpart that emits the same text incrementally to a text stream,
+    schema by schema and table by table, instead of building it in memory.
+
+    Output is produced by writer functions looked up by the exact type of each node in a per-format
+    registry. Use `Translator.register` to add writers for your own node types or output formats.
+
+    Given a RenderCache, rendered tables, enums and views are reused for as long as their content is
+    unchanged, so re-translating a large database after a small edit only renders the edited objects.
 
     Attributes:
         obj (Object): The Alkahest object to be translated.
+        cache (Optional[RenderCache]): The cache of rendered fragments, if any.
+        writers (dict): Maps each output format to a dictionary of node types and their writer functions.
     """
-    def __init__(self, obj):
+    writers = {"dbml": {}, "sqlalchemy": {}, "sql": {}, "markdown": {}}
+
+    def __init__(self, obj, cache=None):
         """
         Initializes a Translator object with the given Alkahest object.
 
         Args:
             obj (Object): The Alkahest object to be translated.
+            cache (RenderCache, optional): A cache of rendered fragments to reuse. Defaults to None.
         """
         self.obj = obj
+        self.cache = cache
+        # The format of the last `write` and its writers, so that `write_node` skips the format lookup.
+        self._output_format = None
+        self._registry = None
+
+    @classmethod
+    def register(cls, output_format, node_type):
+        """
+        Registers a writer function for a node type in an output format, creating the format if needed.
+
+        The writer is called as `writer(translator, obj, fp)` and writes the representation of `obj`
+        to `fp`, using `translator.write_node(output_format, child, fp)` for any child nodes.
+
+        Args:
+            output_format (str): The name of the output format, such as "sql".
+            node_type (type): The class of the nodes handled by the writer.
+
+        Returns:
+            Callable: A decorator registering the writer function and returning it unchanged.
+        """
+        def decorator(writer):
+            cls.writers.setdefault(output_format, {})[node_type] = writer
+            return writer
+        return decorator
 
     def to_dbml(self):
         """
@@ -22,30 +68,7 @@ class Translator:
         Returns:
             str: The DBML representation of the Alkahest object.
         """
-        if isinstance(self.obj, DataType):
-            return self.obj.dbml
-        elif isinstance(self.obj, Column):
-            null_str = ' [not null]' if not self.obj.nullable else ''
-            pk_str = ' [pk]' if self.obj.primary_key else ''
-            fk_str = f' [ref: > {self.obj.foreign_key.table}.{self.obj.foreign_key.column}]' if self.obj.foreign_key else ''
-            return f'"{self.obj.name}" {self.obj.data_type.dbml}{null_str}{pk_str}{fk_str}'
-        elif isinstance(self.obj, Table):
-            columns_dbml = "\n".join(self.to_dbml(column) for column in self.obj.columns.values())
-            return f'Table "{self.obj.name}" {{\n{columns_dbml}\n}}'
-        elif isinstance(self.obj, Schema):
-            enums_dbml = "\n".join(self.to_dbml(enum) for enum in self.obj.enums.values())
-            tables_dbml = "\n".join(self.to_dbml(table) for table in self.obj.tables.values())
-            return f'Schema "{self.obj.name}" {{\n{enums_dbml}\n{tables_dbml}\n}}'
-        elif isinstance(self.obj, Database):
-            schemas_dbml = "\n".join(self.to_dbml(schema) for schema in self.obj.schemas.values())
-            return f'Database "{self.obj.name}" {{\n{schemas_dbml}\n}}'
-        elif isinstance(self.obj, View):
-            return f'View "{self.obj.name}" As SQL\n{self.obj.sql}\nEnd'
-        elif isinstance(self.obj, Enum):
-            values_dbml = ", ".join(f'"{value}"' for value in self.obj.values)
-            return f'Enum "{self.obj.name}" {{ {values_dbml} }}'
-        else:
-            raise TypeError("Unsupported type for translation")
+        return self.render("dbml")
 
     def to_sqlalchemy(self):
         """
@@ -54,30 +77,7 @@ class Translator:
         Returns:
             str: The SQLAlchemy representation of the Alkahest object.
         """
-        if isinstance(self.obj, DataType):
-            return self.obj.sqlalchemy
-        elif isinstance(self.obj, Column):
-            null_str = ', nullable=False' if not self.obj.nullable else ''
-            pk_str = ', primary_key=True' if self.obj.primary_key else ''
-            fk_str = f', ForeignKey("{self.obj.foreign_key.table}.{self.obj.foreign_key.column}")' if self.obj.foreign_key else ''
-            return f'{self.obj.name} = Column({self.obj.data_type.sqlalchemy}{null_str}{pk_str}{fk_str})'
-        elif isinstance(self.obj, Table):
-            columns_sqlalchemy = ",\n".join(self.to_sqlalchemy(column) for column in self.obj.columns.values())
-            return f'class {self.obj.name}(Base):\n    __tablename__ = "{self.obj.name}"\n{columns_sqlalchemy}'
-        elif isinstance(self.obj, Schema):
-            enums_sqlalchemy = "\n".join(self.to_sqlalchemy(enum) for enum in self.obj.enums.values())
-            tables_sqlalchemy = "\n".join(self.to_sqlalchemy(table) for table in self.obj.tables.values())
-            return f'{enums_sqlalchemy}\n{tables_sqlalchemy}'
-        elif isinstance(self.obj, Database):
-            schemas_sqlalchemy = "\n".join(self.to_sqlalchemy(schema) for schema in self.obj.schemas.values())
-            return f'{schemas_sqlalchemy}'
-        elif isinstance(self.obj, View):
-            return f'# No SQLAlchemy equivalent for View. Consider creating a SQLAlchemy select statement for "{self.obj.name}" view instead.'
-        elif isinstance(self.obj, Enum):
-            values_sqlalchemy = ", ".join(f'"{value}"' for value in self.obj.values)
-            return f'{self.obj.name} = Enum({values_sqlalchemy})'
-        else:
-            raise TypeError("Unsupported type for translation")
+        return self.render("sqlalchemy")
 
     def to_sql(self):
         """
@@ -86,27 +86,394 @@ class Translator:
         Returns:
             str: The SQL representation of the Alkahest object.
         """
-        if isinstance(self.obj, DataType):
-            return self.obj.sql
-        elif isinstance(self.obj, Column):
-            null_str = ' NOT NULL' if not self.obj.nullable else ''
-            pk_str = ' PRIMARY KEY' if self.obj.primary_key else ''
-            fk_str = f' REFERENCES {self.obj.foreign_key.table}({self.obj.foreign_key.column})' if self.obj.foreign_key else ''
-            return f'"{self.obj.name}" {self.obj.data_type.sql}{null_str}{pk_str}{fk_str}'
-        elif isinstance(self.obj, Table):
-            columns_sql = ",\n".join(self.to_sql(column) for column in self.obj.columns.values())
-            return f'CREATE TABLE "{self.obj.name}" (\n{columns_sql}\n);'
-        elif isinstance(self.obj, Schema):
-            enums_sql = "\n".join(self.to_sql(enum) for enum in self.obj.enums.values())
-            tables_sql = "\n".join(self.to_sql(table) for table in self.obj.tables.values())
-            return f'{enums_sql}\n{tables_sql}'
-        elif isinstance(self.obj, Database):
-            schemas_sql = "\n".join(self.to_sql(schema) for schema in self.obj.schemas.values())
-            return f'{schemas_sql}'
-        elif isinstance(self.obj, View):
-            return self.obj.sql
-        elif isinstance(self.obj, Enum):
-            values_sql = ", ".join(f"'{value}'" for value in self.obj.values)
-            return f'CREATE TYPE {self.obj.name} AS ENUM ({values_sql});'
+        return self.render("sql")
+
+    def to_markdown(self):
+        """
+        Translates the Alkahest object into a Markdown documentation page.
+
+        A Database renders as the index page, a Schema as its schema page and a Table as its own page,
+        with links laid out as described in `markdown_page`.
+
+        Returns:
+            str: The Markdown representation of the Alkahest object.
+        """
+        return self.render("markdown")
+
+    def render(self, output_format):
+        """
+        Translates the Alkahest object into the given output format.
+
+        Args:
+            output_format (str): The name of a registered output format.
+
+        Returns:
+            str: The representation of the Alkahest object.
+        """
+        buffer = io.StringIO()
+        self.write(output_format, fp=buffer)
+        return buffer.getvalue()
+
+    @instrumented("translator.write")
+    def write(self, output_format, fp):
+        """
+        Writes the representation of the Alkahest object in the given output format to a text stream.
+
+        Args:
+            output_format (str): The name of a registered output format.
+            fp (TextIO): The stream to write to.
+        """
+        if output_format not in self.writers:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self._output_format, self._registry = output_format, self.writers[output_format]
+        self.write_node(output_format, self.obj, fp)
+
+    def write_node(self, output_format, obj, fp):
+        """
+        Writes the representation of a single node to a text stream using its registered writer.
+
+        Args:
+            output_format (str): The name of a registered output format.
+            obj (Object): The node to be translated.
+            fp (TextIO): The stream to write to.
+        """
+        registry = self._registry if output_format is self._output_format else self.writers[output_format]
+        try:
+            writer = registry[type(obj)]
+        except KeyError:
+            writer = self._resolve_writer(registry, type(obj))
+        if self.cache is None:
+            writer(self, obj, fp)
+        elif isinstance(obj, self.cache.cached_types):
+            self._write_cached(output_format, writer, obj, fp)
+        else:
+            writer(self, obj, fp)
+
+    def write_dbml(self, fp):
+        """
+        Writes the DBML representation of the Alkahest object to a text stream.
+
+        Args:
+            fp (TextIO): The stream to write to.
+        """
+        self.write("dbml", fp)
+
+    def write_sqlalchemy(self, fp):
+        """
+        Writes the SQLAlchemy representation of the Alkahest object to a text stream.
+
+        Args:
+            fp (TextIO): The stream to write to.
+        """
+        self.write("sqlalchemy", fp)
+
+    def write_sql(self, fp):
+        """
+        Writes the SQL representation of the Alkahest object to a text stream.
+
+        Args:
+            fp (TextIO): The stream to write to.
+        """
+        self.write("sql", fp)
+
+    def write_markdown(self, fp):
+        """
+        Writes the Markdown representation of the Alkahest object to a text stream.
+
+        Args:
+            fp (TextIO): The stream to write to.
+        """
+        self.write("markdown", fp)
+
+    def write_joined(self, output_format, objs, separator, fp):
+        """
+        Writes a sequence of nodes to a text stream, separated by `separator`.
+
+        Args:
+            output_format (str): The name of a registered output format.
+            objs (Iterable): The nodes to be translated.
+            separator (str): The text written between consecutive nodes.
+            fp (TextIO): The stream to write to.
+        """
+        for i, obj in enumerate(objs):
+            if i:
+                fp.write(separator)
+            self.write_node(output_format, obj, fp)
+
+    def _write_cached(self, output_format, writer, obj, fp):
+        key = self.cache.key(output_format, obj)
+        text = self.cache.get(key)
+        if text is None:
+            buffer = io.StringIO()
+            writer(self, obj, buffer)
+            text = buffer.getvalue()
+            self.cache.put(key, text)
+        fp.write(text)
+
+    def _resolve_writer(self, registry, node_type):
+        # Fall back to the nearest registered base class, and remember it for the exact type.
+        for base in node_type.__mro__[1:]:
+            if base in registry:
+                registry[node_type] = registry[base]
+                return registry[base]
+        raise TypeError("Unsupported type for translation")
+
+def _qualified(schema_name, name):
+    return f'"{schema_name}"."{name}"' if schema_name else f'"{name}"'
+
+def _foreign_key_targets(column):
+    for foreign_key in column.foreign_keys or ():
+        yield from zip(foreign_key.tables, foreign_key.columns)
+
+@Translator.register("dbml", DataType)
+def _data_type_to_dbml(translator, obj, fp):
+    fp.write(obj.dbml)
+
+@Translator.register("dbml", Column)
+def _column_to_dbml(translator, obj, fp):
+    null_str = ' [not null]' if not obj.nullable and not obj.primary_key else ''
+    pk_str = ' [pk]' if obj.primary_key else ''
+    fk_str = ''.join(f' [ref: > {table}.{column}]' for table, column in _foreign_key_targets(obj))
+    fp.write(f'"{obj.name}" {obj.data_type.dbml}{null_str}{pk_str}{fk_str}')
+
+@Translator.register("dbml", Table)
+def _table_to_dbml(translator, obj, fp):
+    fp.write(f'Table "{obj.name}" {{\n')
+    translator.write_joined("dbml", obj.columns.values(), "\n", fp)
+    fp.write('\n}')
+
+@Translator.register("dbml", Schema)
+def _schema_to_dbml(translator, obj, fp):
+    fp.write(f'Schema "{obj.name}" {{\n')
+    translator.write_joined("dbml", obj.enums.values(), "\n", fp)
+    fp.write('\n')
+    translator.write_joined("dbml", obj.tables.values(), "\n", fp)
+    fp.write('\n}')
+
+@Translator.register("dbml", Database)
+def _database_to_dbml(translator, obj, fp):
+    fp.write(f'Database "{obj.name}" {{\n')
+    translator.write_joined("dbml", obj.schemas.values(), "\n", fp)
+    fp.write('\n}')
+
+@Translator.register("dbml", View)
+def _view_to_dbml(translator, obj, fp):
+    fp.write(f'View "{obj.name}" As SQL\n{obj.sql}\nEnd')
+
+@Translator.register("dbml", Enum)
+def _enum_to_dbml(translator, obj, fp):
+    values_dbml = ", ".join(f'"{value}"' for value in obj.values)
+    fp.write(f'Enum "{obj.name}" {{ {values_dbml} }}')
+
+@Translator.register("sqlalchemy", DataType)
+def _data_type_to_sqlalchemy(translator, obj, fp):
+    fp.write(obj.sqlalchemy)
+
+@Translator.register("sqlalchemy", Column)
+def _column_to_sqlalchemy(translator, obj, fp):
+    null_str = ', nullable=False' if not obj.nullable and not obj.primary_key else ''
+    pk_str = ', primary_key=True' if obj.primary_key else ''
+    fk_str = ''.join(f', ForeignKey("{table}.{column}")' for table, column in _foreign_key_targets(obj))
+    fp.write(f'{obj.name} = Column({obj.data_type.sqlalchemy}{null_str}{pk_str}{fk_str})')
+
+@Translator.register("sqlalchemy", Table)
+def _table_to_sqlalchemy(translator, obj, fp):
+    fp.write(f'class {obj.name}(Base):\n    __tablename__ = "{obj.name}"\n')
+    translator.write_joined("sqlalchemy", obj.columns.values(), ",\n", fp)
+
+@Translator.register("sqlalchemy", Schema)
+def _schema_to_sqlalchemy(translator, obj, fp):
+    translator.write_joined("sqlalchemy", obj.enums.values(), "\n", fp)
+    fp.write('\n')
+    translator.write_joined("sqlalchemy", obj.tables.values(), "\n", fp)
+
+@Translator.register("sqlalchemy", Database)
+def _database_to_sqlalchemy(translator, obj, fp):
+    translator.write_joined("sqlalchemy", obj.schemas.values(), "\n", fp)
+
+@Translator.register("sqlalchemy", View)
+def _view_to_sqlalchemy(translator, obj, fp):
+    fp.write(f'# No SQLAlchemy equivalent for View. Consider creating a SQLAlchemy select statement for "{obj.name}" view instead.')
+
+@Translator.register("sqlalchemy", Enum)
+def _enum_to_sqlalchemy(translator, obj, fp):
+    values_sqlalchemy = ", ".join(f'"{value}"' for value in obj.values)
+    fp.write(f'{obj.name} = Enum({values_sqlalchemy})')
+
+@Translator.register("sql", DataType)
+def _data_type_to_sql(translator, obj, fp):
+    fp.write(obj.sql)
+
+@Translator.register("sql", Column)
+def _column_to_sql(translator, obj, fp):
+    _write_column_sql(obj, None, fp)
+
+def _write_column_sql(obj, schema_name, fp):
+    # Foreign keys are resolved relative to `schema_name`, the schema of the column's table if known.
+    null_str = ' NOT NULL' if not obj.nullable and not obj.primary_key else ''
+    default_str = f' DEFAULT {obj.default_value}' if obj.default_value is not None else ''
+    pk_str = ' PRIMARY KEY' if obj.primary_key else ''
+    unique_str = ' UNIQUE' if obj.unique and not obj.primary_key else ''
+    check_str = f' CHECK ({obj.check})' if obj.check else ''
+    fk_str = ''.join(f' REFERENCES {_qualified(*Database.foreign_key_target(schema_name, table))}("{column}")' for table, column in _foreign_key_targets(obj))
+    fp.write(f'"{obj.name}" {obj.data_type.sql}{null_str}{default_str}{pk_str}{unique_str}{check_str}{fk_str}')
+
+@Translator.register("sql", Table)
+def _table_to_sql(translator, obj, fp):
+    fp.write(f'CREATE TABLE {_qualified(obj.schema, obj.name)} (\n')
+    for i, column in enumerate(obj.columns.values()):
+        if i:
+            fp.write(",\n")
+        _write_column_sql(column, obj.schema, fp)
+    fp.write('\n);')
+
+@Translator.register("sql", Schema)
+def _schema_to_sql(translator, obj, fp):
+    translator.write_node("sql", plan_creation(obj), fp)
+
+@Translator.register("sql", Database)
+def _database_to_sql(translator, obj, fp):
+    translator.write_node("sql", plan_creation(obj), fp)
+
+@Translator.register("sql", CreationPlan)
+def _creation_plan_to_sql(translator, obj, fp):
+    first = True
+    for schema_name, item in obj:
+        if not first:
+            fp.write('\n')
+        first = False
+        if isinstance(item, View):
+            fp.write(f'CREATE VIEW {_qualified(schema_name, item.name)} AS {item.sql.strip().rstrip(";")};')
+        elif isinstance(item, Enum):
+            values_sql = ", ".join(f"'{value}'" for value in item.values)
+            fp.write(f'CREATE TYPE {_qualified(schema_name, item.name)} AS ENUM ({values_sql});')
+        elif item.schema != schema_name:
+            # A table of a Schema that was not built through a Database does not know its schema.
+            translator.write_node("sql", dataclasses.replace(item, schema=schema_name), fp)
         else:
-            raise TypeError("Unsupported type for translation")
+            translator.write_node("sql", item, fp)
+    for foreign_key in obj.deferred:
+        if not first:
+            fp.write('\n')
+        first = False
+        target = _qualified(foreign_key.target_schema, foreign_key.target_table.rpartition(".")[2])
+        fp.write(f'ALTER TABLE {_qualified(foreign_key.schema, foreign_key.table)} ADD FOREIGN KEY ("{foreign_key.column}") '
+                 f'REFERENCES {target}("{foreign_key.target_column}");')
+
+@Translator.register("sql", View)
+def _view_to_sql(translator, obj, fp):
+    fp.write(obj.sql)
+
+@Translator.register("sql", Enum)
+def _enum_to_sql(translator, obj, fp):
+    values_sql = ", ".join(f"'{value}'" for value in obj.values)
+    fp.write(f'CREATE TYPE {obj.name} AS ENUM ({values_sql});')
+
+def markdown_page(schema_name=None, table_name=None):
+    """
+    Returns the path of a Markdown documentation page, relative to the documentation root.
+
+    The database is documented in "index.md", each schema in "<schema>.md" and each table in
+    "<schema>/<table>.md". Characters that are unsafe in file names are replaced with "_", and a name
+    that had to be changed gets a short hash of the original, so "x y" and "x_y" get distinct pages.
+
+    Args:
+        schema_name (str, optional): The schema, for a schema or table page. Defaults to None.
+        table_name (str, optional): The table, for a table page. Defaults to None.
+
+    Returns:
+        str: The page path, with "/" separators.
+    """
+    if schema_name is None:
+        return "index.md"
+    if table_name is None:
+        return f"{_page_name(schema_name)}.md"
+    return f"{_page_name(schema_name)}/{_page_name(table_name)}.md"
+
+# Characters replaced with "_" in page file names.
+_UNSAFE_PAGE_CHARACTERS = re.compile(r"[^\w.-]")
+
+def _page_name(name):
+    page_name = _UNSAFE_PAGE_CHARACTERS.sub("_", name)
+    # Leading dots would make hidden or parent directory names, and "index" is the database page.
+    if page_name == name and not name.startswith(".") and name != "index":
+        return name
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{page_name.lstrip('.') or '_'}-{digest}"
+
+def _markdown_cell(text):
+    return "" if text is None else str(text).replace("|", "\\|").replace("\n", "<br>")
+
+def _markdown_table_link(target):
+    # A link from a table page to the page of a table named in a foreign key. Unqualified tables are
+    # in the same schema, whose pages share a directory.
+    schema_name, table_name = Database.foreign_key_target(None, target)
+    path = f"../{markdown_page(schema_name, table_name)}" if schema_name else f"{_page_name(table_name)}.md"
+    return f"[{target}]({path})"
+
+@Translator.register("markdown", DataType)
+def _data_type_to_markdown(translator, obj, fp):
+    fp.write(f"`{obj.dbml or obj.sql}`")
+
+@Translator.register("markdown", Column)
+def _column_to_markdown(translator, obj, fp):
+    keys = ", ".join(key for key, present in (("PK", obj.primary_key), ("unique", obj.unique)) if present)
+    references = "<br>".join(f"{_markdown_table_link(table)} `{column}`" for table, column in _foreign_key_targets(obj))
+    default = f"`{_markdown_cell(obj.default_value)}`" if obj.default_value is not None else ""
+    fp.write(f"| `{obj.name}` | ")
+    translator.write_node("markdown", obj.data_type, fp)
+    fp.write(f" | {'yes' if obj.nullable else 'no'} | {default} | {keys} | {references} | {_markdown_cell(obj.notes)} |")
+
+@Translator.register("markdown", Table)
+def _table_to_markdown(translator, obj, fp):
+    if obj.schema:
+        fp.write(f"# Table `{obj.schema}.{obj.name}`\n\nIn schema [{obj.schema}](../{markdown_page(obj.schema)}).\n\n")
+    else:
+        fp.write(f"# Table `{obj.name}`\n\n")
+    if obj.notes:
+        fp.write(f"{obj.notes}\n\n")
+    fp.write("| Column | Type | Nullable | Default | Key | References | Notes |\n")
+    fp.write("| --- | --- | --- | --- | --- | --- | --- |\n")
+    for column in obj.columns.values():
+        translator.write_node("markdown", column, fp)
+        fp.write("\n")
+
+@Translator.register("markdown", Schema)
+def _schema_to_markdown(translator, obj, fp):
+    fp.write(f"# Schema `{obj.name}`\n\n[Database](index.md)\n\n")
+    if obj.notes:
+        fp.write(f"{obj.notes}\n\n")
+    if obj.tables:
+        fp.write("## Tables\n\n| Table | Columns | Notes |\n| --- | --- | --- |\n")
+        for table in obj.tables.values():
+            notes = table.notes.strip().split("\n", 1)[0] if table.notes else ""
+            fp.write(f"| [{table.name}]({markdown_page(obj.name, table.name)}) | {len(table.columns)} | {_markdown_cell(notes)} |\n")
+        fp.write("\n")
+    if obj.enums:
+        fp.write("## Enums\n\n")
+        translator.write_joined("markdown", obj.enums.values(), "\n", fp)
+        fp.write("\n\n")
+    if obj.views:
+        fp.write("## Views\n\n")
+        translator.write_joined("markdown", obj.views.values(), "\n", fp)
+
+@Translator.register("markdown", Database)
+def _database_to_markdown(translator, obj, fp):
+    fp.write(f"# Database `{obj.name}`\n\n" if obj.name else "# Database\n\n")
+    if obj.notes:
+        fp.write(f"{obj.notes}\n\n")
+    fp.write("| Schema | Tables | Enums | Views |\n| --- | --- | --- | --- |\n")
+    for schema in obj.schemas.values():
+        fp.write(f"| [{schema.name}]({markdown_page(schema.name)}) | {len(schema.tables)} | {len(schema.enums)} | {len(schema.views)} |\n")
+
+@Translator.register("markdown", View)
+def _view_to_markdown(translator, obj, fp):
+    fp.write(f"### `{obj.name}`\n\n")
+    if obj.notes:
+        fp.write(f"{obj.notes}\n\n")
+    fp.write(f"```sql\n{(obj.sql or '').strip()}\n```\n")
+
+@Translator.register("markdown", Enum)
+def _enum_to_markdown(translator, obj, fp):
+    values_markdown = ", ".join(f"`{value}`" for value in obj.values)
+    fp.write(f"- `{obj.name}`: {values_markdown}")
@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+from classes import Database
+from cli import find_sources, is_up_to_date, load_source, output_path, write_outputs
+from render_cache import RenderCache
+
+@dataclass(slots=True)
+class SyncResult:
+    """
+    What one synchronisation of a Watcher did.
+
+    Attributes:
+        changed: The source files that were added or modified.
+        removed: The source files that were deleted.
+        failed: The error each source file that could not be parsed failed with.
+        written: The output files that were written.
+        seconds: The wall time of the synchronisation.
+    """
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failed: Dict[str, Exception] = field(default_factory=dict)
+    written: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+class Watcher:
+    """
+    Keeps the outputs of a tree of .dbml and .sql files in sync with the files as they change.
+
+    The tree is polled for changed modification times and sizes. When a change is seen, the Watcher
+    waits until the tree has been stable for `debounce` seconds, so that a burst of saves is handled
+    at once, then re-parses only the files that changed, patches them into `database` and rewrites
+    only their outputs. Rendered tables, enums and views are kept in a RenderCache, so the parts of a
+    changed file that did not change are not rendered again.
+
+    Attributes:
+        patterns (List[str]): The files, glob patterns and directories watched.
+        output_formats (List[str]): The output formats written for each source file.
+        output_dir (Optional[str]): The directory outputs are written to, or None for next to each source.
+        default_schema (str): The schema for unqualified SQL objects.
+        interval (float): The number of seconds between polls.
+        debounce (float): The number of seconds the tree has to be stable before it is synchronised.
+        database (Database): The objects of all source files. Where two files define the same object,
+            the one parsed last wins, and when that file is deleted or stops defining it, the copy of
+            the one parsed last among the others takes its place.
+        databases (Dict[str, Database]): The Database parsed from each source file.
+        cache (RenderCache): The rendered fragments shared by all outputs.
+    """
+    def __init__(self, patterns, output_formats, output_dir=None, default_schema="public", interval=0.5, debounce=0.1):
+        """
+        Initializes a Watcher. Nothing is read until `sync` or `run` is called.
+
+        Args:
+            patterns (List[str]): The files, glob patterns and directories to watch.
+            output_formats (List[str]): The output formats to write for each source file.
+            output_dir (str, optional): The directory to write outputs to. Defaults to next to each source.
+            default_schema (str, optional): The schema for unqualified SQL objects. Defaults to "public".
+            interval (float, optional): The number of seconds between polls. Defaults to 0.5.
+            debounce (float, optional): The number of seconds the tree has to be stable. Defaults to 0.1.
+        """
+        self.patterns = patterns
+        self.output_formats = output_formats
+        self.output_dir = output_dir
+        self.default_schema = default_schema
+        self.interval = interval
+        self.debounce = debounce
+        self.database = Database()
+        self.databases = {}
+        self.cache = RenderCache()
+        self._state = {}
+        self._relative = {}
+        self._absolute = {}
+        self._sources = set()
+        self._written = set()
+        self._owners = {}
+        self._synced = False
+
+    def scan(self):
+        """
+        Lists the source files and their modification times and sizes.
+
+        Files the Watcher writes are not sources, even where they match the watched patterns, such as
+        the .sql outputs next to .dbml sources in a watched directory.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: The modification time in nanoseconds and size of each source file.
+        """
+        state = {}
+        sources = set()
+        for path, relative in find_sources(self.patterns):
+            absolute = self._absolute.get(path)
+            if absolute is None:
+                absolute = self._absolute[path] = os.path.abspath(path)
+            if absolute in self._written:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            state[path] = (stat.st_mtime_ns, stat.st_size)
+            self._relative[path] = relative
+            sources.add(absolute)
+        self._sources = sources
+        for path in state.keys() - self._state.keys():
+            self._written.update(map(os.path.abspath, self._outputs(path).values()))
+        return state
+
+    def sync(self, state=None):
+        """
+        Brings `database` and the outputs in line with the source files.
+
+        The first synchronisation parses every file but only writes outputs that are older than their
+        source. Later ones only parse the files whose modification time or size changed since the
+        previous one. A file that fails to parse keeps its previous objects and outputs.
+
+        Args:
+            state (Dict[str, Tuple[int, int]], optional): The result of `scan`. Defaults to scanning now.
+
+        Returns:
+            SyncResult: What was done.
+        """
+        start = time.perf_counter()
+        state = self.scan() if state is None else state
+        result = SyncResult(
+            changed=[path for path, stamp in state.items() if self._state.get(path) != stamp],
+            removed=[path for path in self._state if path not in state],
+        )
+        for path in result.removed:
+            self._unmerge(path)
+            for output in self._outputs(path).values():
+                if os.path.exists(output):
+                    os.remove(output)
+                self._written.discard(os.path.abspath(output))
+        for path in result.changed:
+            try:
+                database = load_source(path, self.default_schema)
+            except Exception as e:
+                result.failed[path] = e
+                continue
+            self._unmerge(path)
+            self._merge(path, database)
+            outputs = self._outputs(path)
+            if not self._synced:
+                outputs = {fmt: output for fmt, output in outputs.items() if not is_up_to_date(path, output)}
+            write_outputs(database, outputs, cache=self.cache)
+            result.written.extend(outputs.values())
+        self._state = state
+        self._synced = True
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def run(self, on_sync=None, stop=None):
+        """
+        Synchronises once, then polls the tree and synchronises after every change until stopped.
+
+        Args:
+            on_sync (Callable[[SyncResult], None], optional): Called after each synchronisation.
+            stop (threading.Event, optional): Ends the loop when set. Defaults to running forever.
+        """
+        stop = stop or threading.Event()
+        result = self.sync()
+        if on_sync is not None:
+            on_sync(result)
+        while not stop.wait(self.interval):
+            state = self.scan()
+            while state != self._state and not stop.wait(self.debounce):
+                settled = self.scan()
+                if settled == state:
+                    result = self.sync(state)
+                    if on_sync is not None:
+                        on_sync(result)
+                    break
+                state = settled
+
+    def _outputs(self, path):
+        # Like plan_conversions, never overwrites a source file.
+        relative = self._relative.get(path, os.path.basename(path))
+        outputs = {fmt: output_path(path, relative, fmt, self.output_dir) for fmt in self.output_formats}
+        return {fmt: output for fmt, output in outputs.items()
+                if os.path.abspath(output) != os.path.abspath(path) and os.path.abspath(output) not in self._sources}
+
+    def _merge(self, path, database):
+        self.databases[path] = database
+        for schema_name, schema in database.schemas.items():
+            for table in schema.tables.values():
+                self.database.add_table(table, schema_name)
+                self._owners["table", schema_name, table.name] = path
+            for enum in schema.enums.values():
+                self.database.add_enum(enum, schema_name)
+                self._owners["enum", schema_name, enum.name] = path
+            for view in schema.views.values():
+                self.database.add_view(view, schema_name)
+                self._owners["view", schema_name, view.name] = path
+
+    def _unmerge(self, path):
+        database = self.databases.pop(path, None)
+        if database is None:
+            return
+        removers = {"table": self.database.remove_table, "enum": self.database.remove_enum, "view": self.database.remove_view}
+        adders = {"table": self.database.add_table, "enum": self.database.add_enum, "view": self.database.add_view}
+        for schema_name, schema in database.schemas.items():
+            for kind, names in (("table", schema.tables), ("enum", schema.enums), ("view", schema.views)):
+                for name in names:
+                    if self._owners.get((kind, schema_name, name)) != path:
+                        continue
+                    other, item = self._defined_elsewhere(kind, schema_name, name)
+                    if other is None:
+                        del self._owners[kind, schema_name, name]
+                        removers[kind](schema_name, name)
+                    else:
+                        self._owners[kind, schema_name, name] = other
+                        adders[kind](item, schema_name)
+            merged = self.database.schemas.get(schema_name)
+            if merged is not None and not (merged.tables or merged.enums or merged.views):
+                self.database.remove_schema(schema_name)
+
+    def _defined_elsewhere(self, kind, schema_name, name):
+        # The last parsed of the other files defining an object, and its copy, or (None, None).
+        for other in reversed(self.databases):
+            schema = self.databases[other].schemas.get(schema_name)
+            items = getattr(schema, kind + "s") if schema is not None else {}
+            if name in items:
+                return other, items[name]
+        return None, None